@@ -1,11 +1,27 @@
 import aiohttp
 import asyncio
 import json
-from datetime import datetime, timedelta
-from typing import List, Dict, Any
+from datetime import datetime, timezone
+from typing import List, Dict, Any, Optional
 from models.schemas import PoliticalRisk
+from agents.article_dedup import ArticleDeduplicator
+from agents.risk_keyword_matcher import RiskKeywordMatcher
+from database.news_cache_store import NewsCacheStore
+from utils.cache import TTLCache
+from utils.provider_guard import ProviderGuard
 import os
 
+# Query parameters that carry API keys and are left out of news cache keys
+NEWS_CREDENTIAL_PARAMS = ("apikey", "token")
+
+# Risk keywords to look for in news
+RISK_KEYWORDS = (
+    "tariff", "sanctions", "strike", "protest", "trade war",
+    "embargo", "political unrest", "election", "policy change",
+    "regulatory", "export ban", "import restriction", "currency",
+    "inflation", "recession", "conflict", "tension"
+)
+
 class PoliticalRiskAgent:
     def __init__(self):
         # Free news API endpoints
@@ -13,68 +29,472 @@ class PoliticalRiskAgent:
         self.gnews_api_key = os.getenv("GNEWS_API_KEY", "your-gnews-key")
         
         # Risk keywords to look for in news
-        self.risk_keywords = [
-            "tariff", "sanctions", "strike", "protest", "trade war",
-            "embargo", "political unrest", "election", "policy change",
-            "regulatory", "export ban", "import restriction", "currency",
-            "inflation", "recession", "conflict", "tension"
-        ]
+        self.risk_keywords = list(RISK_KEYWORDS)
+        # Score tiers, risk-type vocabularies and the watchlist compiled into one matcher
+        self.keyword_matcher = RiskKeywordMatcher(watchlist=self.risk_keywords)
+        # Collapses the same wire story reported by several providers before scoring
+        self.deduplicator = ArticleDeduplicator(
+            threshold=float(os.getenv("NEWS_DEDUP_THRESHOLD", "0.7"))
+        )
+        
+        # Shared HTTP session so news requests reuse pooled keep-alive connections.
+        # Opened on app startup (connect) and closed on shutdown (disconnect).
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.http_pool_limit = int(os.getenv("NEWS_HTTP_POOL_LIMIT", "100"))
+        self.http_pool_limit_per_host = int(os.getenv("NEWS_HTTP_POOL_LIMIT_PER_HOST", "20"))
+        self.http_dns_cache_ttl = int(os.getenv("NEWS_HTTP_DNS_CACHE_TTL", "300"))  # seconds
+        self.http_keepalive_timeout = float(os.getenv("NEWS_HTTP_KEEPALIVE_TIMEOUT", "30"))  # seconds
+        self.http_connect_timeout = float(os.getenv("NEWS_HTTP_CONNECT_TIMEOUT", "5"))  # seconds
+        self.http_total_timeout = float(os.getenv("NEWS_HTTP_TOTAL_TIMEOUT", "15"))  # seconds
+        
+        # Countries and providers are fetched concurrently; the semaphore caps
+        # requests in flight and each country gets a deadline for its providers.
+        self.max_concurrent_requests = int(os.getenv("NEWS_MAX_CONCURRENT_REQUESTS", "16"))
+        self.country_deadline = float(os.getenv("NEWS_COUNTRY_DEADLINE", "10"))  # seconds
+        self._request_slots = asyncio.Semaphore(self.max_concurrent_requests)
+        
+        # Per-provider circuit breaker and token bucket: failing or throttled
+        # providers are skipped at once (cache or sample data is used instead)
+        breaker = {
+            "burst": int(os.getenv("NEWS_RATE_LIMIT_BURST", "10")),
+            "failure_threshold": int(os.getenv("NEWS_CIRCUIT_FAILURE_THRESHOLD", "3")),
+            "cooldown_seconds": float(os.getenv("NEWS_CIRCUIT_COOLDOWN", "30")),
+            "max_wait_seconds": float(os.getenv("NEWS_RATE_LIMIT_MAX_WAIT", "1"))
+        }
+        self.provider_guards = {
+            "NewsData": ProviderGuard(
+                "NewsData",
+                requests_per_window=int(os.getenv("NEWSDATA_RATE_LIMIT", "30")),
+                window_seconds=float(os.getenv("NEWSDATA_RATE_WINDOW", "900")),
+                **breaker
+            ),
+            "GNews": ProviderGuard(
+                "GNews",
+                requests_per_window=int(os.getenv("GNEWS_RATE_LIMIT", "60")),
+                window_seconds=float(os.getenv("GNEWS_RATE_WINDOW", "60")),
+                **breaker
+            )
+        }
+        
+        # Provider responses keyed by (provider, country, query params). Entries
+        # older than news_cache_ttl are served stale while a background refresh
+        # runs; after news_cache_max_stale they are dropped.
+        self.news_cache_ttl = float(os.getenv("NEWS_CACHE_TTL", "900"))  # seconds
+        self.news_cache_max_stale = float(os.getenv("NEWS_CACHE_MAX_STALE", "86400"))  # seconds
+        self.news_cache = TTLCache(
+            maxsize=int(os.getenv("NEWS_CACHE_MAX_ENTRIES", "2048")),
+            ttl=self.news_cache_max_stale
+        )
+        # Analyzed risks per country, with the same freshness rules as the news cache
+        self.risk_cache = TTLCache(maxsize=1024, ttl=self.news_cache_max_stale)
+        # In-flight fetches per cache key, shared by concurrent misses and refreshes
+        self._news_fetches: Dict[tuple, asyncio.Task] = {}
+        self._country_refreshes: Dict[str, asyncio.Task] = {}
+        # Both caches are written through to SQLite and read back per key on a
+        # memory miss, so a restarted server serves what it already fetched
+        self.news_store = NewsCacheStore() if os.getenv("NEWS_CACHE_PERSIST", "1") != "0" else None
+        
+        # Incremental ingestion: per (provider, country) high-water marks, and
+        # how many analyzed risks to keep per country as new ones arrive
+        self._ingest_cursors: Dict[tuple, Dict[str, Any]] = {}
+        self.ingest_max_pages = int(os.getenv("NEWS_INGEST_MAX_PAGES", "3"))
+        self.ingest_max_risks_per_country = int(os.getenv("NEWS_INGEST_MAX_RISKS_PER_COUNTRY", "100"))
+        self.news_cache_metrics = {
+            "fresh_hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "refreshes": 0,
+            "refresh_failures": 0,
+            "restored_from_disk": 0,
+            "country_fresh_hits": 0,
+            "country_stale_hits": 0
+        }
+    
+    async def connect(self):
+        """Open the pooled HTTP session used for news provider requests"""
+        if self.session is not None and not self.session.closed:
+            return
+        connector = aiohttp.TCPConnector(
+            limit=self.http_pool_limit,
+            limit_per_host=self.http_pool_limit_per_host,
+            ttl_dns_cache=self.http_dns_cache_ttl,
+            keepalive_timeout=self.http_keepalive_timeout
+        )
+        timeout = aiohttp.ClientTimeout(
+            total=self.http_total_timeout,
+            sock_connect=self.http_connect_timeout
+        )
+        self.session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+        
+        # Drop persisted entries too old to serve; the rest load on demand
+        if self.news_store is not None:
+            await self._persist(self.news_store.purge, self.news_cache_max_stale)
+    
+    async def disconnect(self):
+        """Close the HTTP session and its pooled connections"""
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+        if self.news_store is not None:
+            await asyncio.to_thread(self.news_store.close)
+    
+    async def _persist(self, operation, *args):
+        """Run a blocking news store call off the event loop; storage errors never fail a request"""
+        try:
+            return await asyncio.to_thread(operation, *args)
+        except Exception as e:
+            print(f"News cache store error: {str(e)}")
+            return None
+    
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """The shared session, opened on first use if connect() was not called"""
+        if self.session is None or self.session.closed:
+            await self.connect()
+        return self.session
     
     async def analyze_risks(self, countries: List[str]) -> List[PoliticalRisk]:
-        """Analyze political risks for given countries"""
+        """Analyze political risks for given countries, fetching all countries concurrently"""
+        country_risks = await asyncio.gather(*(self._analyze_country(country) for country in countries))
+        
         all_risks = []
+        for risks in country_risks:
+            all_risks.extend(risks)
+        return all_risks
+    
+    async def _analyze_country(self, country: str) -> List[PoliticalRisk]:
+        """
+        Analyzed risks for one country. Recent results are served from the
+        risk cache (restored from disk after a restart); stale ones are served
+        while the country is re-analyzed in the background.
+        """
+        cached = self.risk_cache.get_with_age(country)
+        if cached is None and self.news_store is not None:
+            stored = await self._persist(self.news_store.get_country_risks, country)
+            if stored is not None and stored[1] <= self.news_cache_max_stale:
+                risks = [PoliticalRisk.model_validate(risk) for risk in stored[0]]
+                self.risk_cache.set(country, risks, age=stored[1])
+                self.news_cache_metrics["restored_from_disk"] += 1
+                cached = (risks, stored[1])
         
-        for country in countries:
-            try:
-                # Fetch news for each country
-                news_articles = await self._fetch_news_for_country(country)
-                
-                # Analyze articles for risk indicators
-                country_risks = await self._analyze_articles_for_risks(news_articles, country)
-                all_risks.extend(country_risks)
-                
-            except Exception as e:
-                print(f"Error analyzing risks for {country}: {str(e)}")
-                # Add a default risk entry if analysis fails
-                default_risk = PoliticalRisk(
-                    country=country,
-                    risk_type="Analysis Error",
-                    likelihood_score=1,
-                    reasoning=f"Unable to fetch current data: {str(e)}",
-                    publication_date=datetime.now().isoformat(),
-                    source_title="System Error",
-                    source_url=""
-                )
-                all_risks.append(default_risk)
+        if cached is not None:
+            risks, age = cached
+            if age <= self.news_cache_ttl:
+                self.news_cache_metrics["country_fresh_hits"] += 1
+            else:
+                self.news_cache_metrics["country_stale_hits"] += 1
+                if country not in self._country_refreshes:
+                    task = asyncio.ensure_future(self._refresh_country(country))
+                    task.add_done_callback(lambda t: t.cancelled() or t.exception())
+                    self._country_refreshes[country] = task
+            return list(risks)
         
-        return all_risks
+        return await self._analyze_country_live(country)
+    
+    async def _refresh_country(self, country: str):
+        try:
+            # Stale risks came from stale news: rescoring that news again would
+            # just re-stamp it as fresh, so wait for the providers instead
+            await self._analyze_country_live(country, revalidate=True)
+        finally:
+            self._country_refreshes.pop(country, None)
+    
+    async def _analyze_country_live(self, country: str, revalidate: bool = False) -> List[PoliticalRisk]:
+        """Fetch and analyze news for one country (revalidate: see _cached_fetch)"""
+        try:
+            # Fetch news for the country
+            news_articles, live = await self._fetch_news_with_status(country, revalidate)
+            news_articles = self.deduplicator.collapse(news_articles)
+            
+            # Analyze articles for risk indicators
+            risks = await self._analyze_articles_for_risks(news_articles, country)
+            
+            # Only results from provider data are cached, not the sample fallback
+            if live:
+                self.risk_cache.set(country, risks)
+                if self.news_store is not None:
+                    await self._persist(self.news_store.put_country_risks, country,
+                                        [risk.model_dump() for risk in risks])
+            return risks
+            
+        except Exception as e:
+            print(f"Error analyzing risks for {country}: {str(e)}")
+            # Add a default risk entry if analysis fails
+            default_risk = PoliticalRisk(
+                country=country,
+                risk_type="Analysis Error",
+                likelihood_score=1,
+                reasoning=f"Unable to fetch current data: {str(e)}",
+                publication_date=datetime.now().isoformat(),
+                source_title="System Error",
+                source_url=""
+            )
+            return [default_risk]
     
     async def _fetch_news_for_country(self, country: str) -> List[Dict[str, Any]]:
         """Fetch news articles for a specific country"""
-        articles = []
+        articles, _ = await self._fetch_news_with_status(country)
+        return articles
+    
+    async def _fetch_news_with_status(self, country: str, revalidate: bool = False) -> tuple:
+        """
+        Fetch news articles for a country from all providers at once.
+        Providers still pending at the country deadline are cancelled and the
+        articles that did arrive are used. revalidate: see _cached_fetch.
         
-        # Try NewsData.io first (free tier)
-        try:
-            newsdata_articles = await self._fetch_from_newsdata(country)
-            articles.extend(newsdata_articles)
-        except Exception as e:
-            print(f"NewsData.io error for {country}: {str(e)}")
+        Returns:
+            (articles, True if providers returned articles / False for sample data)
+        """
+        providers = {
+            "NewsData.io": (self._newsdata_request, self._fetch_from_newsdata),
+            "GNews": (self._gnews_request, self._fetch_from_gnews)
+        }
+        tasks = {
+            asyncio.ensure_future(self._cached_fetch(name, country, request(country)[1], fetch, revalidate)): name
+            for name, (request, fetch) in providers.items()
+        }
+        done, pending = await asyncio.wait(tasks, timeout=self.country_deadline)
         
-        # Try GNews as backup
-        try:
-            gnews_articles = await self._fetch_from_gnews(country)
-            articles.extend(gnews_articles)
-        except Exception as e:
-            print(f"GNews error for {country}: {str(e)}")
+        for task in pending:
+            task.cancel()
+            print(f"{tasks[task]} timed out for {country} after {self.country_deadline}s")
         
-        # If both APIs fail, return sample data
+        articles = []
+        # Provider order is kept so NewsData.io articles come first
+        for task, name in tasks.items():
+            if task not in done:
+                continue
+            try:
+                # Copies, since cached provider responses are shared
+                articles.extend({**article, "provider": name} for article in task.result())
+            except Exception as e:
+                print(f"{name} error for {country}: {str(e)}")
+        
+        # If every provider failed or came back empty, return sample data, which
+        # must not be cached or persisted as provider results
+        live = bool(articles)
         if not articles:
             articles = self._get_sample_news_data(country)
         
-        return articles
+        return articles, live
     
-    async def _fetch_from_newsdata(self, country: str) -> List[Dict[str, Any]]:
-        """Fetch news from NewsData.io API"""
+    async def ingest(self, countries: List[str]) -> Dict[str, Any]:
+        """
+        Incremental ingestion for many countries at once: fetch only articles
+        newer than each provider's cursor and fold their risks into the stored
+        per-country results. Countries that fail keep their previous cursors.
+        """
+        async def run(country: str):
+            try:
+                return country, await asyncio.wait_for(self.ingest_country(country), self.country_deadline)
+            except asyncio.TimeoutError:
+                return country, {"error": f"Timed out after {self.country_deadline}s"}
+            except Exception as e:
+                return country, {"error": str(e)}
+        
+        results = await asyncio.gather(*(run(country) for country in dict.fromkeys(countries)))
+        return dict(results)
+    
+    async def ingest_country(self, country: str) -> Dict[str, Any]:
+        """Fetch new articles for one country and update its stored risks incrementally"""
+        providers = {
+            "NewsData.io": self._ingest_newsdata,
+            "GNews": self._ingest_gnews
+        }
+        cursors = {name: await self._get_ingest_cursor(name, country) for name in providers}
+        fetched = await asyncio.gather(
+            *(ingest(country, cursors[name]) for name, ingest in providers.items()),
+            return_exceptions=True
+        )
+        
+        new_articles = []
+        provider_stats = {}
+        for (name, _), result in zip(providers.items(), fetched):
+            if isinstance(result, Exception):
+                provider_stats[name] = {"error": str(result)}
+                continue
+            articles, cursor = result
+            new_articles.extend({**article, "provider": name} for article in articles)
+            provider_stats[name] = {"new_articles": len(articles), "cursor": cursor.get("published_at")}
+        
+        if all(isinstance(result, Exception) for result in fetched):
+            raise Exception("; ".join(f"{name}: {stats['error']}" for name, stats in provider_stats.items()))
+        
+        new_articles = self.deduplicator.collapse(new_articles)
+        new_risks = await self._analyze_articles_for_risks(new_articles, country)
+        
+        # Fold new risks into the stored ones (newest first) instead of recomputing
+        existing = self.risk_cache.get(country)
+        if existing is None and self.news_store is not None:
+            stored = await self._persist(self.news_store.get_country_risks, country)
+            if stored is not None:
+                existing = [PoliticalRisk.model_validate(risk) for risk in stored[0]]
+        new_keys = {(risk.source_url, risk.source_title) for risk in new_risks}
+        risks = new_risks + [
+            risk for risk in (existing or []) if (risk.source_url, risk.source_title) not in new_keys
+        ]
+        risks = risks[:self.ingest_max_risks_per_country]
+        
+        self.risk_cache.set(country, risks)
+        if self.news_store is not None:
+            await self._persist(self.news_store.put_country_risks, country, [risk.model_dump() for risk in risks])
+        
+        # Cursors only advance once the new articles are reflected in stored risks
+        for (name, _), result in zip(providers.items(), fetched):
+            if not isinstance(result, Exception):
+                await self._set_ingest_cursor(name, country, result[1])
+        
+        return {
+            "new_articles": len(new_articles),
+            "new_risks": len(new_risks),
+            "total_risks": len(risks),
+            "providers": provider_stats
+        }
+    
+    async def _ingest_newsdata(self, country: str, cursor: Dict[str, Any]) -> tuple:
+        """
+        NewsData.io articles newer than the cursor. The latest-news endpoint has
+        no date filter, so pages (newest first, via the nextPage token) are
+        read until one reaches already-ingested articles.
+        """
+        url, params = self._newsdata_request(country)
+        articles = []
+        for _ in range(self.ingest_max_pages):
+            data = await self._limited(self._fetch_json("NewsData", url, params))
+            page = [_normalize_article(article) for article in data.get("results", [])]
+            fresh = _newer_than(page, cursor)
+            articles.extend(fresh)
+            if len(fresh) < len(page) or not data.get("nextPage"):
+                break
+            params = {**params, "page": data["nextPage"]}
+        return articles, _advance_cursor(cursor, articles)
+    
+    async def _ingest_gnews(self, country: str, cursor: Dict[str, Any]) -> tuple:
+        """GNews articles newer than the cursor, using the API's `from` filter"""
+        url, params = self._gnews_request(country)
+        if cursor.get("published_at"):
+            params = {**params, "from": cursor["published_at"].replace("+00:00", "Z")}
+        data = await self._limited(self._fetch_json("GNews", url, params))
+        page = [_normalize_article(article) for article in data.get("articles", [])]
+        articles = _newer_than(page, cursor)
+        return articles, _advance_cursor(cursor, articles)
+    
+    async def _get_ingest_cursor(self, provider: str, country: str) -> Dict[str, Any]:
+        key = (provider, country)
+        if key not in self._ingest_cursors:
+            stored = None
+            if self.news_store is not None:
+                stored = await self._persist(self.news_store.get_cursor, provider, country)
+            self._ingest_cursors[key] = stored or {}
+        return self._ingest_cursors[key]
+    
+    async def _set_ingest_cursor(self, provider: str, country: str, cursor: Dict[str, Any]):
+        self._ingest_cursors[(provider, country)] = cursor
+        if self.news_store is not None:
+            await self._persist(self.news_store.put_cursor, provider, country, cursor)
+    
+    def ingest_cursors(self) -> Dict[str, Dict[str, Any]]:
+        """Loaded high-water marks, keyed by provider/country"""
+        return {f"{provider}/{country}": cursor for (provider, country), cursor in self._ingest_cursors.items()}
+    
+    async def _limited(self, request):
+        """Await a provider request while holding one of the shared request slots"""
+        async with self._request_slots:
+            return await request
+    
+    async def _cached_fetch(self, provider: str, country: str, params: Dict[str, Any],
+                            fetch, revalidate: bool = False) -> List[Dict[str, Any]]:
+        """
+        Provider articles through the news cache (stale-while-revalidate).
+        Fresh entries are returned as is; stale ones are returned immediately
+        and refreshed in the background, or with revalidate, only once that
+        refresh has completed. Concurrent misses share one request.
+        """
+        key = (provider, country, tuple(sorted(
+            (name, value) for name, value in params.items() if name not in NEWS_CREDENTIAL_PARAMS
+        )))
+        
+        cached = self.news_cache.get_with_age(key)
+        if cached is None and self.news_store is not None:
+            stored = await self._persist(self.news_store.get_articles, key)
+            if stored is not None and stored[1] <= self.news_cache_max_stale:
+                self.news_cache.set(key, stored[0], age=stored[1])
+                self.news_cache_metrics["restored_from_disk"] += 1
+                cached = stored
+        
+        if cached is not None:
+            articles, age = cached
+            if age <= self.news_cache_ttl:
+                self.news_cache_metrics["fresh_hits"] += 1
+                return articles
+            if not revalidate:
+                self.news_cache_metrics["stale_hits"] += 1
+                if key not in self._news_fetches:
+                    self.news_cache_metrics["refreshes"] += 1
+                    self._start_news_fetch(key, country, fetch, refresh=True)
+                return articles
+        
+        if key in self._news_fetches:
+            self.news_cache_metrics["coalesced"] += 1
+        elif cached is not None:
+            self.news_cache_metrics["refreshes"] += 1
+            self._start_news_fetch(key, country, fetch, refresh=True)
+        else:
+            self.news_cache_metrics["misses"] += 1
+            self._start_news_fetch(key, country, fetch)
+        # Shielded so a country deadline does not cancel a fetch others share;
+        # it still completes and fills the cache
+        return await asyncio.shield(self._news_fetches[key])
+    
+    def _start_news_fetch(self, key: tuple, country: str, fetch, refresh: bool = False):
+        """Fetch a provider response into the news cache as a tracked task"""
+        async def run():
+            try:
+                articles = await self._limited(fetch(country))
+                self.news_cache.set(key, articles)
+                if self.news_store is not None:
+                    await self._persist(self.news_store.put_articles, key, articles)
+                return articles
+            except Exception:
+                if refresh:
+                    self.news_cache_metrics["refresh_failures"] += 1
+                raise
+            finally:
+                self._news_fetches.pop(key, None)
+        
+        task = asyncio.ensure_future(run())
+        # Background refreshes may fail with nobody awaiting them
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        self._news_fetches[key] = task
+    
+    def provider_status(self) -> Dict[str, Any]:
+        """Circuit state, token bucket and request counters per news provider"""
+        return {name: guard.stats() for name, guard in self.provider_guards.items()}
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        """News cache size, hit/miss/refresh counters and in-flight fetches"""
+        metrics = self.news_cache_metrics
+        lookups = metrics["fresh_hits"] + metrics["stale_hits"] + metrics["misses"] + metrics["coalesced"]
+        storage = self.news_cache.stats()
+        return {
+            "news_cache": {
+                "size": storage["size"],
+                "maxsize": storage["maxsize"],
+                "evictions": storage["evictions"],
+                "fresh_ttl_seconds": self.news_cache_ttl,
+                "max_stale_seconds": self.news_cache_max_stale,
+                **metrics,
+                "in_flight": len(self._news_fetches),
+                "country_risk_entries": len(self.risk_cache),
+                "persistent_store": self.news_store.path if self.news_store is not None else None,
+                "served_from_cache_rate": round(
+                    (metrics["fresh_hits"] + metrics["stale_hits"]) / lookups, 4
+                ) if lookups else 0.0
+            }
+        }
+    
+    def _newsdata_request(self, country: str) -> tuple:
+        """NewsData.io URL and query parameters for a country"""
         url = "https://newsdata.io/api/1/news"
         params = {
             "apikey": self.newsdata_api_key,
@@ -83,17 +503,10 @@ class PoliticalRiskAgent:
             "language": "en",
             "size": 10
         }
-        
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, params=params) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    return data.get("results", [])
-                else:
-                    raise Exception(f"NewsData API error: {response.status}")
+        return url, params
     
-    async def _fetch_from_gnews(self, country: str) -> List[Dict[str, Any]]:
-        """Fetch news from GNews API"""
+    def _gnews_request(self, country: str) -> tuple:
+        """GNews URL and query parameters for a country"""
         url = "https://gnews.io/api/v4/search"
         params = {
             "token": self.gnews_api_key,
@@ -102,14 +515,46 @@ class PoliticalRiskAgent:
             "country": country.lower(),
             "max": 10
         }
-        
-        async with aiohttp.ClientSession() as session:
+        return url, params
+    
+    async def _fetch_json(self, provider: str, url: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        GET a provider endpoint on the shared session and decode the JSON body.
+        Goes through the provider's guard: open circuits and exhausted quotas
+        raise ProviderUnavailable without sending anything.
+        """
+        guard = self.provider_guards[provider]
+        await guard.acquire()
+        try:
+            session = await self._get_session()
             async with session.get(url, params=params) as response:
                 if response.status == 200:
                     data = await response.json()
-                    return data.get("articles", [])
+                    guard.record_success(response.headers)
+                    return data
                 else:
-                    raise Exception(f"GNews API error: {response.status}")
+                    error = f"{provider} API error: {response.status}"
+                    guard.record_failure(error, response.status, response.headers)
+                    raise Exception(error)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            guard.record_failure(f"{provider} request failed: {type(e).__name__}: {e}")
+            raise
+        except (asyncio.CancelledError, Exception):
+            # Already recorded above, or cancelled/failed before an outcome: free any half-open trial
+            guard.release()
+            raise
+    
+    async def _fetch_from_newsdata(self, country: str) -> List[Dict[str, Any]]:
+        """Fetch news from NewsData.io API"""
+        url, params = self._newsdata_request(country)
+        data = await self._fetch_json("NewsData", url, params)
+        return data.get("results", [])
+    
+    async def _fetch_from_gnews(self, country: str) -> List[Dict[str, Any]]:
+        """Fetch news from GNews API"""
+        url, params = self._gnews_request(country)
+        data = await self._fetch_json("GNews", url, params)
+        return data.get("articles", [])
     
     def _get_sample_news_data(self, country: str) -> List[Dict[str, Any]]:
         """Return sample news data when APIs are unavailable"""
@@ -168,82 +613,201 @@ class PoliticalRiskAgent:
         risks = []
         
         for article in articles:
-            # Extract text content
-            content = ""
-            if "content" in article:
-                content = article["content"]
-            elif "description" in article:
-                content = article["description"]
-            elif "title" in article:
-                content = article["title"]
-            
-            # Check for risk keywords
-            risk_score = self._calculate_risk_score(content)
-            
-            if risk_score > 0:
-                risk_type = self._identify_risk_type(content)
-                reasoning = self._generate_reasoning(content, risk_type)
-                
-                risk = PoliticalRisk(
-                    country=country,
-                    risk_type=risk_type,
-                    likelihood_score=risk_score,
-                    reasoning=reasoning,
-                    publication_date=article.get("pubDate", datetime.now().isoformat()),
-                    source_title=article.get("title", "Unknown"),
-                    source_url=article.get("link", "")
-                )
+            risk = self.score_article(article, country)
+            if risk is not None:
                 risks.append(risk)
         
         return risks
     
+    def score_article(self, article: Dict[str, Any], country: str) -> Optional[PoliticalRisk]:
+        """PoliticalRisk for one article, or None if it has no risk indicators"""
+        return self._score_content(
+            country, _article_content(article), article.get("title", "Unknown"),
+            article.get("pubDate", datetime.now().isoformat()), article.get("link", ""),
+            article.get("sources")
+        )
+    
+    def _score_content(self, country: str, content: str, title: str,
+                       publication_date: str, link: str,
+                       sources: Optional[List[Dict[str, str]]] = None) -> Optional[PoliticalRisk]:
+        return _score_content(self.keyword_matcher, country, content, title, publication_date, link, sources)
+    
+    def score_article_columns(self, columns: Dict[str, List[Any]]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Score a columnar batch of articles (see article_columns).
+        Returns one PoliticalRisk dict, or None when there is no risk, per row.
+        """
+        return score_article_columns(self.keyword_matcher, columns)
+    
     def _calculate_risk_score(self, content: str) -> int:
         """Calculate risk score based on content analysis"""
-        content_lower = content.lower()
-        score = 0
-        
-        # Check for high-risk keywords
-        high_risk_keywords = ["strike", "protest", "conflict", "war", "embargo", "sanctions"]
-        for keyword in high_risk_keywords:
-            if keyword in content_lower:
-                score += 3
-        
-        # Check for medium-risk keywords
-        medium_risk_keywords = ["tariff", "policy change", "regulation", "delay", "disruption"]
-        for keyword in medium_risk_keywords:
-            if keyword in content_lower:
-                score += 2
-        
-        # Check for low-risk keywords
-        low_risk_keywords = ["trade", "economic", "business", "manufacturing"]
-        for keyword in low_risk_keywords:
-            if keyword in content_lower:
-                score += 1
-        
-        # Cap at 5
-        return min(score, 5)
+        return self.keyword_matcher.score(content)
     
     def _identify_risk_type(self, content: str) -> str:
         """Identify the type of political risk"""
-        content_lower = content.lower()
-        
-        if any(word in content_lower for word in ["strike", "protest", "unrest"]):
-            return "Labor Disputes"
-        elif any(word in content_lower for word in ["tariff", "trade", "export", "import"]):
-            return "Trade Policy"
-        elif any(word in content_lower for word in ["sanctions", "embargo", "ban"]):
-            return "Economic Sanctions"
-        elif any(word in content_lower for word in ["regulation", "policy", "law"]):
-            return "Regulatory Changes"
-        elif any(word in content_lower for word in ["election", "political", "government"]):
-            return "Political Instability"
-        else:
-            return "General Economic Risk"
+        return self.keyword_matcher.classify(content)
     
     def _generate_reasoning(self, content: str, risk_type: str) -> str:
         """Generate reasoning for the risk assessment"""
-        # Extract key phrases from content
-        sentences = content.split('.')[:2]  # Take first two sentences
-        key_info = '. '.join(sentences).strip()
-        
-        return f"Based on recent news: {key_info}. Risk type identified as {risk_type}."
+        return _generate_reasoning(content, risk_type)
+
+
+def _generate_reasoning(content: str, risk_type: str) -> str:
+    # Extract key phrases from content
+    sentences = content.split('.')[:2]  # Take first two sentences
+    key_info = '. '.join(sentences).strip()
+    
+    return f"Based on recent news: {key_info}. Risk type identified as {risk_type}."
+
+
+def _score_content(matcher: RiskKeywordMatcher, country: str, content: str, title: str,
+                   publication_date: str, link: str,
+                   sources: Optional[List[Dict[str, str]]] = None) -> Optional[PoliticalRisk]:
+    """PoliticalRisk for one article's text, or None if it has no risk indicators"""
+    # Score and classify in one keyword pass
+    match = matcher.match(content, details=False)
+    risk_score = match["score"]
+    if risk_score <= 0:
+        return None
+    
+    risk_type = match["risk_type"]
+    return PoliticalRisk(
+        country=country,
+        risk_type=risk_type,
+        likelihood_score=risk_score,
+        reasoning=_generate_reasoning(content, risk_type),
+        publication_date=publication_date,
+        source_title=title,
+        source_url=link,
+        sources=sources
+    )
+
+
+def score_article_columns(matcher: RiskKeywordMatcher, columns: Dict[str, List[Any]]) -> List[Optional[Dict[str, Any]]]:
+    """One PoliticalRisk dict, or None when there is no risk, per row of an article_columns batch"""
+    return [
+        risk.model_dump() if risk is not None else None
+        for risk in map(
+            lambda *row: _score_content(matcher, *row),
+            columns["country"], columns["content"], columns["title"],
+            columns["publication_date"], columns["link"]
+        )
+    ]
+
+
+def _article_content(article: Dict[str, Any]) -> str:
+    """Text scored for an article: content, else description, else title"""
+    for field in ("content", "description", "title"):
+        if article.get(field) is not None:
+            return article[field]
+    return ""
+
+
+def _normalize_article(article: Dict[str, Any]) -> Dict[str, Any]:
+    """Provider article with the NewsData-style "link" and "pubDate" keys filled in"""
+    article = dict(article)
+    if not article.get("link") and article.get("url"):
+        article["link"] = article["url"]
+    if not article.get("pubDate") and article.get("publishedAt"):
+        article["pubDate"] = article["publishedAt"]
+    return article
+
+
+def _published_at(article: Dict[str, Any]) -> Optional[str]:
+    """Publication time as an ISO 8601 UTC string, or None if missing/unparseable"""
+    value = article.get("pubDate")
+    if not value:
+        return None
+    try:
+        published = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if published.tzinfo is None:
+        published = published.replace(tzinfo=timezone.utc)  # NewsData dates are UTC
+    return published.astimezone(timezone.utc).isoformat()
+
+
+def _article_id(article: Dict[str, Any]) -> str:
+    return article.get("article_id") or article.get("link") or article.get("title") or ""
+
+
+def _newer_than(articles: List[Dict[str, Any]], cursor: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Articles past the cursor: published after its high-water mark, or at the
+    same instant but not among the ids already seen there. Undated articles
+    count as new unless their id was seen at the mark.
+    """
+    mark = cursor.get("published_at")
+    seen = set(cursor.get("seen_ids", []))
+    fresh = []
+    for article in articles:
+        published = _published_at(article)
+        if mark is None or published is None or published > mark:
+            if _article_id(article) not in seen:
+                fresh.append(article)
+        elif published == mark and _article_id(article) not in seen:
+            fresh.append(article)
+    return fresh
+
+
+def _advance_cursor(cursor: Dict[str, Any], articles: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Cursor moved to the newest publication time among the new articles"""
+    mark = cursor.get("published_at")
+    seen = list(cursor.get("seen_ids", []))
+    for article in articles:
+        published = _published_at(article)
+        if published is None:
+            continue
+        if mark is None or published > mark:
+            mark, seen = published, [_article_id(article)]
+        elif published == mark:
+            seen.append(_article_id(article))
+    return {"published_at": mark, "seen_ids": seen} if mark else dict(cursor)
+
+
+ARTICLE_COLUMNS = ("country", "content", "title", "publication_date", "link")
+# Article fields read by the scorer; each must be a string when present
+ARTICLE_TEXT_FIELDS = ("title", "content", "description", "pubDate", "link", "country")
+
+
+def article_error(article: Any) -> Optional[str]:
+    """Why an article cannot be scored, or None if it can"""
+    if not isinstance(article, dict):
+        return "article must be a JSON object"
+    for field in ARTICLE_TEXT_FIELDS:
+        value = article.get(field)
+        if value is not None and not isinstance(value, str):
+            return f"{field} must be a string, got {type(value).__name__}"
+    return None
+
+
+def article_columns(articles: List[Dict[str, Any]], default_country: str = "") -> Dict[str, List[Any]]:
+    """
+    Split provider-shaped article dicts into parallel columns for batch
+    scoring; a per-article "country" overrides default_country.
+    """
+    now = datetime.now().isoformat()
+    columns: Dict[str, List[Any]] = {name: [] for name in ARTICLE_COLUMNS}
+    for article in articles:
+        columns["country"].append(article.get("country") or default_country)
+        columns["content"].append(_article_content(article))
+        columns["title"].append(_or_default(article.get("title"), "Unknown"))
+        columns["publication_date"].append(_or_default(article.get("pubDate"), now))
+        columns["link"].append(_or_default(article.get("link"), ""))
+    return columns
+
+
+def _or_default(value: Any, default: Any) -> Any:
+    return default if value is None else value
+
+
+# Keyword matcher owned by each process-pool worker, compiled on first use.
+# Scoring needs nothing else, so workers do not build a full agent.
+_worker_matcher: Optional[RiskKeywordMatcher] = None
+
+def score_articles_in_worker(columns: Dict[str, List[Any]]) -> List[Optional[Dict[str, Any]]]:
+    """Process-pool entry point: score a columnar article batch with this process's matcher"""
+    global _worker_matcher
+    if _worker_matcher is None:
+        _worker_matcher = RiskKeywordMatcher(watchlist=RISK_KEYWORDS)
+    return score_article_columns(_worker_matcher, columns)
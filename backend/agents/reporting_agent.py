@@ -272,21 +272,23 @@ class ReportingAgent:
         
         # Add schedule risks to world data
         for risk in schedule_risks:
-            if risk.country not in world_data:
-                world_data[risk.country] = {
-                    "risk_level": 0,
-                    "risk_factors": [],
-                    "last_updated": datetime.now().isoformat()
-                }
-            
-            world_data[risk.country]["risk_level"] = max(
-                world_data[risk.country]["risk_level"], 
-                risk.risk_level
-            )
-            world_data[risk.country]["risk_factors"].extend(risk.risk_factors)
+            self._add_schedule_world_risk(world_data, risk.country, risk.risk_level, risk.risk_factors)
         
         return world_data
     
+    def _add_schedule_world_risk(self, world_data: Dict[str, Any], country: str,
+                                 risk_level: int, risk_factors: List[str]):
+        """Fold schedule risk for a country into world risk data"""
+        if country not in world_data:
+            world_data[country] = {
+                "risk_level": 0,
+                "risk_factors": [],
+                "last_updated": datetime.now().isoformat()
+            }
+        
+        world_data[country]["risk_level"] = max(world_data[country]["risk_level"], risk_level)
+        world_data[country]["risk_factors"].extend(risk_factors)
+    
     async def _generate_route_pdf(self, report: RiskReport, filepath: str) -> str:
         """Generate PDF for route analysis reports"""
         doc = SimpleDocTemplate(
@@ -0,0 +1,117 @@
+"""
+Keyword matcher for political risk scoring.
+
+Every keyword from the score tiers, the risk-type vocabularies and the
+watchlist is compiled into one deduplicated vocabulary. An article is
+lowercased once and checked against each distinct keyword at most once;
+score, risk type and the matched spans all come from that single pass.
+
+CPython's substring search runs in C, and for a vocabulary this size it
+beats both a pure-Python Aho-Corasick automaton and a combined regex.
+
+Matching is plain substring matching, the same as the original scoring
+rules, so "war" also matches inside "software".
+"""
+
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+# (points, keywords): each keyword present adds its points once
+RISK_SCORE_TIERS: Tuple[Tuple[int, Tuple[str, ...]], ...] = (
+    (3, ("strike", "protest", "conflict", "war", "embargo", "sanctions")),
+    (2, ("tariff", "policy change", "regulation", "delay", "disruption")),
+    (1, ("trade", "economic", "business", "manufacturing")),
+)
+MAX_RISK_SCORE = 5
+
+# Checked in priority order: the first type with any keyword present wins
+RISK_TYPE_VOCABULARY: Tuple[Tuple[str, Tuple[str, ...]], ...] = (
+    ("Labor Disputes", ("strike", "protest", "unrest")),
+    ("Trade Policy", ("tariff", "trade", "export", "import")),
+    ("Economic Sanctions", ("sanctions", "embargo", "ban")),
+    ("Regulatory Changes", ("regulation", "policy", "law")),
+    ("Political Instability", ("election", "political", "government")),
+)
+DEFAULT_RISK_TYPE = "General Economic Risk"
+
+
+class RiskKeywordMatcher:
+    """Scores and classifies article text against the compiled keyword vocabulary"""
+
+    def __init__(self, score_tiers: Sequence = RISK_SCORE_TIERS,
+                 type_vocabulary: Sequence = RISK_TYPE_VOCABULARY,
+                 watchlist: Iterable[str] = ()):
+        self.type_names = [name for name, _ in type_vocabulary]
+        self.watchlist = tuple(dict.fromkeys(keyword.lower() for keyword in watchlist))
+
+        self._points: Dict[str, int] = {}
+        self._type_rank: Dict[str, int] = {}
+        for points, keywords in score_tiers:
+            for keyword in keywords:
+                self._points[keyword] = self._points.get(keyword, 0) + points
+        for rank, (_, keywords) in enumerate(type_vocabulary):
+            for keyword in keywords:
+                self._type_rank[keyword] = min(self._type_rank.get(keyword, rank), rank)
+
+        # Tier keywords are always checked (each adds points). Type-only
+        # keywords are checked in priority order and only while they could
+        # still beat the best type already found. Details check everything.
+        self._tier_keywords = tuple(self._points)
+        self._type_only = tuple(sorted(
+            ((keyword, rank) for keyword, rank in self._type_rank.items() if keyword not in self._points),
+            key=lambda item: item[1]
+        ))
+        self.keywords = tuple(dict.fromkeys([*self._points, *self._type_rank, *self.watchlist]))
+        self._watched = set(self.watchlist)
+
+    def match(self, content: str, details: bool = True) -> Dict[str, Any]:
+        """
+        Score, risk type and matched keywords for one article.
+
+        Returns:
+            {"score", "risk_type"}, plus "keywords", "watchlist" and "spans" with
+            details. Spans are (start, end, keyword) offsets into content.lower(),
+            in text order.
+        """
+        text = (content or "").lower()
+        found = [keyword for keyword in self._tier_keywords if keyword in text]
+
+        score = 0
+        rank = len(self.type_names)
+        for keyword in found:
+            score += self._points[keyword]
+            rank = min(rank, self._type_rank.get(keyword, rank))
+        for keyword, keyword_rank in self._type_only:
+            if keyword_rank >= rank:
+                break
+            if keyword in text:
+                rank = keyword_rank
+                break
+
+        result = {
+            "score": min(score, MAX_RISK_SCORE),
+            "risk_type": self.type_names[rank] if rank < len(self.type_names) else DEFAULT_RISK_TYPE,
+        }
+        if details:
+            found += [keyword for keyword in self.keywords[len(self._tier_keywords):] if keyword in text]
+            result["keywords"] = found
+            result["watchlist"] = [keyword for keyword in found if keyword in self._watched]
+            result["spans"] = self._spans(text, found)
+        return result
+
+    @staticmethod
+    def _spans(text: str, keywords: List[str]) -> List[Tuple[int, int, str]]:
+        """Every (possibly overlapping) occurrence of the matched keywords"""
+        spans = []
+        for keyword in keywords:
+            start = text.find(keyword)
+            while start != -1:
+                spans.append((start, start + len(keyword), keyword))
+                start = text.find(keyword, start + 1)
+        spans.sort()
+        return spans
+
+    def score(self, content: str) -> int:
+        return self.match(content, details=False)["score"]
+
+    def classify(self, content: str) -> str:
+        return self.match(content, details=False)["risk_type"]
@@ -0,0 +1,252 @@
+"""
+Waypoint ordering solver for multi-port routes.
+
+Works on a square weight matrix where row/column 0 is the origin, the last
+row/column is the destination and everything in between is a waypoint.
+Small instances are solved exactly with Held-Karp dynamic programming;
+larger ones start from nearest-neighbour and are improved with 2-opt and
+Or-opt moves until no move helps or the time budget runs out.
+k_best_open_paths ranks the next-best distinct orders with Yen-style
+spur searches on top of the same solver.
+"""
+
+import heapq
+import time
+from typing import Dict, List, Tuple
+import numpy as np
+
+# Held-Karp is O(2^n * n^2); 12 waypoints stays comfortably under ~100ms
+EXACT_WAYPOINT_LIMIT = 12
+DEFAULT_TIME_BUDGET_MS = 250
+OR_OPT_SEGMENT_LENGTHS = (1, 2, 3)
+
+
+def path_cost(weights: np.ndarray, path: List[int]) -> float:
+    """Total weight of visiting the matrix indices in the given order"""
+    p = np.asarray(path, dtype=int)
+    return float(weights[p[:-1], p[1:]].sum())
+
+
+def held_karp(weights: np.ndarray) -> List[int]:
+    """
+    Exact shortest open path from index 0 to index n-1 visiting every
+    index in between exactly once.
+    """
+    n = len(weights)
+    m = n - 2
+    if m <= 0:
+        return list(range(n))
+
+    mid = weights[1:-1, 1:-1]
+    size = 1 << m
+    dp = np.full((size, m), np.inf)
+    parent = np.full((size, m), -1, dtype=int)
+
+    for j in range(m):
+        dp[1 << j, j] = weights[0, j + 1]
+
+    bits = np.arange(m)
+    for mask in range(1, size):
+        js = bits[(mask >> bits) & 1 == 1]
+        if len(js) < 2:
+            continue
+        prevs = mask ^ (1 << js)
+        # candidates[a, k] = best path over prevs[a] ending at k, then k -> js[a]
+        candidates = dp[prevs, :] + mid[:, js].T
+        best = np.argmin(candidates, axis=1)
+        dp[mask, js] = candidates[np.arange(len(js)), best]
+        parent[mask, js] = best
+
+    full = size - 1
+    last = int(np.argmin(dp[full, :] + weights[1:-1, -1]))
+
+    order = []
+    mask = full
+    while last != -1:
+        order.append(last + 1)
+        prev = parent[mask, last]
+        mask ^= 1 << last
+        last = int(prev)
+
+    return [0] + order[::-1] + [n - 1]
+
+
+def nearest_neighbour(weights: np.ndarray) -> List[int]:
+    """Greedy open path from index 0 to index n-1"""
+    n = len(weights)
+    visited = np.zeros(n, dtype=bool)
+    visited[0] = visited[n - 1] = True
+    path = [0]
+    current = 0
+    for _ in range(n - 2):
+        row = np.where(visited, np.inf, weights[current])
+        current = int(np.argmin(row))
+        visited[current] = True
+        path.append(current)
+    path.append(n - 1)
+    return path
+
+
+def _two_opt_pass(weights: np.ndarray, path: List[int], deadline: float) -> bool:
+    """Apply the first improving 2-opt reversal for each i. Returns True if improved."""
+    improved = False
+    p = np.asarray(path, dtype=int)
+    n = len(p)
+    for i in range(n - 3):
+        if time.perf_counter() > deadline:
+            break
+        # Reverse p[i+1 .. j] for every j >= i+2, endpoints stay fixed
+        js = np.arange(i + 2, n - 1)
+        delta = (weights[p[i], p[js]] + weights[p[i + 1], p[js + 1]]
+                 - weights[p[i], p[i + 1]] - weights[p[js], p[js + 1]])
+        k = int(np.argmin(delta))
+        if delta[k] < -1e-9:
+            j = int(js[k])
+            p[i + 1:j + 1] = p[i + 1:j + 1][::-1]
+            improved = True
+    path[:] = p.tolist()
+    return improved
+
+
+def _or_opt_pass(weights: np.ndarray, path: List[int], deadline: float) -> bool:
+    """Relocate short segments to a better position. Returns True if improved."""
+    improved = False
+    for length in OR_OPT_SEGMENT_LENGTHS:
+        i = 1
+        while i + length < len(path):
+            if time.perf_counter() > deadline:
+                return improved
+            seg = path[i:i + length]
+            before, after = path[i - 1], path[i + length]
+            removal_gain = (weights[before, seg[0]] + weights[seg[-1], after]
+                            - weights[before, after])
+
+            rest = path[:i] + path[i + length:]
+            best_delta, best_pos, best_reversed = -1e-9, None, False
+            for pos in range(len(rest) - 1):
+                a, b = rest[pos], rest[pos + 1]
+                base = weights[a, b]
+                forward = weights[a, seg[0]] + weights[seg[-1], b] - base - removal_gain
+                backward = weights[a, seg[-1]] + weights[seg[0], b] - base - removal_gain
+                if forward < best_delta:
+                    best_delta, best_pos, best_reversed = forward, pos, False
+                if backward < best_delta:
+                    best_delta, best_pos, best_reversed = backward, pos, True
+
+            if best_pos is not None:
+                moved = seg[::-1] if best_reversed else seg
+                path[:] = rest[:best_pos + 1] + moved + rest[best_pos + 1:]
+                improved = True
+            else:
+                i += 1
+    return improved
+
+
+def local_search(weights: np.ndarray, path: List[int], deadline: float) -> List[int]:
+    """Improve a path with 2-opt and Or-opt until a local optimum or the deadline"""
+    path = list(path)
+    while time.perf_counter() < deadline:
+        improved = _two_opt_pass(weights, path, deadline)
+        improved = _or_opt_pass(weights, path, deadline) or improved
+        if not improved:
+            break
+    return path
+
+
+def solve_open_path(weights: np.ndarray,
+                    time_budget_ms: float = DEFAULT_TIME_BUDGET_MS,
+                    exact_limit: int = EXACT_WAYPOINT_LIMIT) -> Tuple[List[int], Dict]:
+    """
+    Find a low-cost visiting order with fixed start (index 0) and end (index n-1).
+    Instances with at most exact_limit waypoints are solved exactly.
+
+    Returns:
+        (path of matrix indices, solver stats)
+    """
+    started = time.perf_counter()
+    deadline = started + time_budget_ms / 1000.0
+    waypoint_count = max(len(weights) - 2, 0)
+
+    greedy = nearest_neighbour(weights)
+    greedy_cost = path_cost(weights, greedy)
+
+    if waypoint_count <= exact_limit:
+        path = held_karp(weights)
+        method = "held_karp"
+    else:
+        path = local_search(weights, greedy, deadline)
+        method = "two_opt_or_opt"
+
+    cost = path_cost(weights, path)
+    return path, {
+        "method": method,
+        "exact": method == "held_karp",
+        "objective_value": round(cost, 4),
+        "greedy_objective_value": round(greedy_cost, 4),
+        "improvement_pct": round((greedy_cost - cost) / greedy_cost * 100, 2) if greedy_cost > 0 else 0.0,
+        "solve_time_ms": round((time.perf_counter() - started) * 1000, 2),
+        "time_budget_ms": time_budget_ms,
+    }
+
+
+def k_best_open_paths(weights: np.ndarray, k: int,
+                      time_budget_ms: float = DEFAULT_TIME_BUDGET_MS,
+                      exact_limit: int = EXACT_WAYPOINT_LIMIT) -> List[Tuple[List[int], float]]:
+    """
+    Up to k distinct open paths from index 0 to index n-1, cheapest first.
+
+    Yen/Lawler scheme over visiting orders: for each path found, every prefix
+    is kept fixed, the next stop used by earlier paths sharing that prefix is
+    banned, and the rest is completed by the solver. Exact while the spur
+    problems fit Held-Karp; otherwise as good as the local search.
+
+    Returns:
+        [(path of matrix indices, total weight), ...]
+    """
+    started = time.perf_counter()
+    deadline = started + time_budget_ms / 1000.0
+    n = len(weights)
+    # Half the budget for the best path, the rest shared by the spur searches
+    spur_budget_ms = time_budget_ms / 2 / max(k * n, 1)
+
+    first, _ = solve_open_path(weights, time_budget_ms / 2, exact_limit)
+    found = [first]
+    seen = {tuple(first)}
+    candidates: List[tuple] = []  # heap of (cost, path)
+
+    while len(found) < k and time.perf_counter() < deadline:
+        last = found[-1]
+        # Spur after position i; at least two waypoints must remain to reorder
+        for i in range(n - 3):
+            if time.perf_counter() > deadline:
+                break
+            prefix = last[:i + 1]
+            banned = {path[i + 1] for path in found if path[:i + 1] == prefix}
+            used = set(prefix)
+            remaining = [v for v in range(1, n - 1) if v not in used]
+            if all(v in banned for v in remaining):
+                continue
+
+            sub = [prefix[-1]] + remaining + [n - 1]
+            sub_weights = weights[np.ix_(sub, sub)].copy()
+            # Any path through an unbanned first stop beats every banned one
+            penalty = float(np.abs(sub_weights).sum()) + 1.0
+            for j, v in enumerate(sub):
+                if v in banned:
+                    sub_weights[0, j] += penalty
+
+            spur, _ = solve_open_path(sub_weights, spur_budget_ms, exact_limit)
+            if sub[spur[1]] in banned:
+                continue
+            path = prefix + [sub[j] for j in spur[1:]]
+            if tuple(path) not in seen:
+                seen.add(tuple(path))
+                heapq.heappush(candidates, (path_cost(weights, path), path))
+
+        if not candidates:
+            break
+        _, path = heapq.heappop(candidates)
+        found.append(path)
+
+    # Heuristic spurs can beat the first path, so rank by actual cost
+    return sorted(((path, path_cost(weights, path)) for path in found), key=lambda item: item[1])
@@ -1,4 +1,6 @@
 import math
+import time
+import numpy as np
 from typing import List, Dict, Tuple, Optional
 from datetime import datetime, timedelta
 import sys
@@ -6,7 +8,78 @@ import os
 
 # Add parent directory to path to import ports data
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from data.ports import MAJOR_PORTS, CANALS, get_port_by_name
+from data.ports import MAJOR_PORTS, CANALS, get_port_by_name, normalize_port_name, get_port_table_version
+from data.distance_matrix import PortDistanceMatrix
+from data.spatial_index import PortSpatialIndex
+from data.sea_lane_graph import SeaLaneGraph
+from agents.route_order_solver import solve_open_path, k_best_open_paths, path_cost, DEFAULT_TIME_BUDGET_MS
+from agents.route_simulator import simulate_legs
+from utils.cache import TTLCache
+
+MAX_ALTERNATIVES = 3
+ALTERNATIVES_TIME_BUDGET_MS = 150
+# Spur searches are run many times per route, so solve only small ones exactly
+ALTERNATIVES_EXACT_LIMIT = 8
+
+# Objective weightings (time, cost, risk) solved per profile to seed the Pareto front
+PARETO_SCALARIZATIONS = [
+    (1, 0, 0), (0, 1, 0), (0, 0, 1),
+    (1, 1, 0), (1, 0, 1), (0, 1, 1), (1, 1, 1)
+]
+# Many solves run per request, so keep the exact solver to smaller instances
+PARETO_EXACT_LIMIT = 8
+
+
+def _pareto_filter(candidates: List[Dict], objectives: Tuple[str, ...]) -> List[Dict]:
+    """Candidates not dominated on the given (minimised) objectives; duplicates collapse"""
+    front = []
+    seen = set()
+    for candidate in candidates:
+        values = tuple(candidate[o] for o in objectives)
+        if values in seen:
+            continue
+        dominated = any(
+            all(other[o] <= candidate[o] for o in objectives) and
+            any(other[o] < candidate[o] for o in objectives)
+            for other in candidates
+        )
+        if not dominated:
+            seen.add(values)
+            front.append(candidate)
+    return front
+
+
+def _normalized(matrix: np.ndarray) -> np.ndarray:
+    """Scale a weight matrix by its mean so different units can be summed"""
+    scale = matrix.mean()
+    return matrix / scale if scale > 0 else matrix
+
+
+# Cached legs and routes are handed out as copies whose nested lists and
+# dicts are copied too, so callers may change any part of them. Copying just
+# the known mutable fields is far cheaper than copy.deepcopy.
+def _copy_leg(leg: Dict) -> Dict:
+    return {
+        **leg,
+        "canals": list(leg["canals"]),
+        "route_path": list(leg["route_path"]),
+        "polyline": [dict(point) for point in leg["polyline"]],
+        "coordinates": {end: dict(coords) for end, coords in leg["coordinates"].items()}
+    }
+
+
+def _copy_route(route: Dict) -> Dict:
+    copied = {
+        **route,
+        "ports": list(route["ports"]),
+        "legs": [_copy_leg(leg) for leg in route["legs"]],
+        "summary": {**route["summary"], "canals_used": list(route["summary"]["canals_used"])},
+        "alternatives": [_copy_route(alt) for alt in route["alternatives"]]
+    }
+    if "deltas" in route:
+        copied["deltas"] = dict(route["deltas"])
+    return copied
+
 
 class RoutePlannerAgent:
     """
@@ -20,6 +93,13 @@ class RoutePlannerAgent:
         self.base_ship_speed = 20  # knots
         self.base_fuel_cost_per_nm = 2.5  # USD per nautical mile
         
+        # All-pairs port distances, computed once and refreshed on port table changes
+        self.distance_matrix = PortDistanceMatrix()
+        # Ball tree over port coordinates for nearest/within-radius queries
+        self.spatial_index = PortSpatialIndex()
+        # Ports, chokepoints and canals joined by sea lanes; A* paths are cached
+        self.sea_lanes = SeaLaneGraph()
+        
         # Optimization multipliers
         self.optimization_profiles = {
             "fastest": {
@@ -48,6 +128,24 @@ class RoutePlannerAgent:
             }
         }
         
+        # What the waypoint ordering solver minimises for each profile
+        self.ordering_objectives = {
+            "fastest": "time",
+            "cheapest": "cost",
+            "balanced": "time_and_cost",
+            "safest": "risk_weighted_distance"
+        }
+        self.leg_risk_weights = {"low": 1.0, "medium": 1.25, "high": 1.6}
+        # Additive per-leg risk used as the risk objective of Pareto search
+        self.leg_risk_scores = {"low": 1, "medium": 2, "high": 3}
+        
+        # Planned routes keyed by (normalized ports, profile) and legs keyed by
+        # (from, to, profile). Both are dropped when ports, canals or profiles change.
+        self.route_cache = TTLCache(maxsize=512, ttl=6 * 3600)
+        self.leg_cache = TTLCache(maxsize=8192, ttl=6 * 3600)
+        self._cache_version = None
+        self._profiles_version = 0
+        
     def calculate_distance(self, coord1: Dict, coord2: Dict) -> float:
         """
         Calculate great circle distance between two coordinates in nautical miles.
@@ -67,6 +165,52 @@ class RoutePlannerAgent:
         
         return c * r
     
+    def port_route(self, port1: Dict, port2: Dict) -> Dict:
+        """
+        Sea-lane route between two port records: distance, canals transited and
+        polyline. Falls back to the great-circle matrix and the canal region
+        check if the sea-lane graph has no path.
+        """
+        route = self.sea_lanes.route(port1["name"], port2["name"])
+        if route:
+            return {
+                "distance_nm": route["distance_nm"],
+                "canals": [{**self.canals[name], "name": name} for name in route["canals"]],
+                "path": list(route["path"]),
+                "polyline": [{"lat": lat, "lon": lon} for lat, lon in route["polyline"]]
+            }
+        
+        distance = self.distance_matrix.distance(port1["name"], port2["name"])
+        if distance is None:
+            distance = self.calculate_distance(port1["coordinates"], port2["coordinates"])
+        canal_info = self._check_canal_crossing(port1["coordinates"], port2["coordinates"])
+        return {
+            "distance_nm": distance,
+            "canals": [canal_info] if canal_info else [],
+            "path": [port1["name"], port2["name"]],
+            "polyline": [dict(port1["coordinates"]), dict(port2["coordinates"])]
+        }
+    
+    def port_distance(self, port1: Dict, port2: Dict) -> float:
+        """Sailing distance in nautical miles between two port records"""
+        return self.port_route(port1, port2)["distance_nm"]
+    
+    def mark_profiles_changed(self):
+        """Signal that optimization_profiles was modified in place"""
+        self._profiles_version += 1
+    
+    def _check_cache_version(self):
+        """Drop cached routes and legs if ports, canals or optimization profiles changed"""
+        version = (get_port_table_version(), self._profiles_version)
+        if version != self._cache_version:
+            self.route_cache.clear()
+            self.leg_cache.clear()
+            self._cache_version = version
+    
+    def cache_stats(self) -> Dict:
+        """Hit/miss counters for the route and leg caches"""
+        return {"routes": self.route_cache.stats(), "legs": self.leg_cache.stats()}
+    
     def calculate_route_leg(self, port1_name: str, port2_name: str, optimization: str = "balanced") -> Optional[Dict]:
         """Calculate details for a single leg of the route"""
         port1 = get_port_by_name(port1_name)
@@ -75,6 +219,19 @@ class RoutePlannerAgent:
         if not port1 or not port2:
             return None
         
+        self._check_cache_version()
+        key = (port1["name"], port2["name"], optimization)
+        cached = self.leg_cache.get(key)
+        if cached is None:
+            cached = self._compute_route_leg(port1, port2, optimization)
+            self.leg_cache.set(key, cached)
+        
+        leg = _copy_leg(cached)
+        leg.update({"from": port1_name, "to": port2_name})
+        return leg
+    
+    def _compute_route_leg(self, port1: Dict, port2: Dict, optimization: str) -> Dict:
+        """Leg details for two resolved port records"""
         # Get optimization profile
         profile = self.optimization_profiles.get(optimization, self.optimization_profiles["balanced"])
         
@@ -82,7 +239,8 @@ class RoutePlannerAgent:
         ship_speed = self.base_ship_speed * profile["speed_multiplier"]
         fuel_cost_per_nm = self.base_fuel_cost_per_nm * profile["fuel_cost_multiplier"]
         
-        distance = self.calculate_distance(port1["coordinates"], port2["coordinates"])
+        sea_route = self.port_route(port1, port2)
+        distance = sea_route["distance_nm"]
         transit_time_hours = distance / ship_speed
         transit_time_days = transit_time_hours / 24
         
@@ -94,20 +252,17 @@ class RoutePlannerAgent:
         fuel_cost = distance * fuel_cost_per_nm
         port_fees = 15000 + 12000  # Simplified port fees for departure and arrival
         
-        # Check if route crosses major canals
-        canal_info = self._check_canal_crossing(port1["coordinates"], port2["coordinates"])
-        canal_cost = 0
-        canal_time = 0
-        if canal_info:
-            canal_cost = canal_info["avg_toll"]
-            canal_time = canal_info["avg_transit_time"]
-            total_time_days += canal_time
+        # Canals transited on the sea-lane path
+        canals = sea_route["canals"]
+        canal_cost = sum(canal["avg_toll"] for canal in canals)
+        canal_time = sum(canal["avg_transit_time"] for canal in canals)
+        total_time_days += canal_time
         
         total_cost = fuel_cost + port_fees + canal_cost
         
         return {
-            "from": port1_name,
-            "to": port2_name,
+            "from": port1["name"],
+            "to": port2["name"],
             "from_country": port1["country"],
             "to_country": port2["country"],
             "distance_nm": round(distance, 2),
@@ -118,20 +273,24 @@ class RoutePlannerAgent:
             "fuel_cost_usd": round(fuel_cost, 2),
             "port_fees_usd": port_fees,
             "canal_cost_usd": canal_cost,
-            "canal_name": canal_info["name"] if canal_info else None,
+            "canal_name": " and ".join(canal["name"] for canal in canals) or None,
+            "canals": [canal["name"] for canal in canals],
             "total_cost_usd": round(total_cost, 2),
             "ship_speed_knots": round(ship_speed, 1),
             "optimization_applied": optimization,
             "coordinates": {
-                "from": port1["coordinates"],
-                "to": port2["coordinates"]
-            }
+                "from": dict(port1["coordinates"]),
+                "to": dict(port2["coordinates"])
+            },
+            "route_path": sea_route["path"],
+            "polyline": sea_route["polyline"]
         }
     
     def _check_canal_crossing(self, coord1: Dict, coord2: Dict) -> Optional[Dict]:
         """
         Check if route crosses a major canal.
         Simplified logic - checks if route crosses specific regions.
+        Only used when the sea-lane graph has no path between two ports.
         """
         lat1, lon1 = coord1["lat"], coord1["lon"]
         lat2, lon2 = coord2["lat"], coord2["lon"]
@@ -162,6 +321,38 @@ class RoutePlannerAgent:
         if len(ports) < 2:
             return {"error": "At least 2 ports are required"}
         
+        self._check_cache_version()
+        key = (tuple(normalize_port_name(port) for port in ports), optimization)
+        cached = self.route_cache.get(key)
+        if cached is None:
+            cached = self._plan_route(ports, optimization)
+            if "error" in cached:
+                return cached
+            self.route_cache.set(key, cached)
+        
+        return self._fresh_route(_copy_route(cached), ports)
+    
+    def _fresh_route(self, route: Dict, ports: List[str]) -> Dict:
+        """
+        Prepare a copied cached route for a caller: port names as requested
+        and time-dependent fields recomputed for now.
+        """
+        route["ports"] = list(ports)
+        for i, leg in enumerate(route["legs"]):
+            leg["from"], leg["to"] = ports[i], ports[i + 1]
+        for alt in route["alternatives"]:
+            self._fresh_route(alt, alt["ports"])
+        
+        now = datetime.now()
+        route["summary"]["estimated_departure"] = now.strftime("%Y-%m-%d %H:%M UTC")
+        route["summary"]["estimated_arrival"] = (
+            now + timedelta(days=route["summary"]["total_time_days"])
+        ).strftime("%Y-%m-%d %H:%M UTC")
+        route["generated_at"] = now.isoformat()
+        return route
+    
+    def _plan_route(self, ports: List[str], optimization: str, with_alternatives: bool = True) -> Dict:
+        """Uncached route planning; see plan_multi_port_route"""
         legs = []
         total_distance = 0
         total_time = 0
@@ -179,27 +370,21 @@ class RoutePlannerAgent:
             total_time += leg["total_time_days"]
             total_cost += leg["total_cost_usd"]
             
-            if leg["canal_name"]:
-                canals_used.append(leg["canal_name"])
+            canals_used.extend(leg["canals"])
         
         # Risk assessment for each leg (simplified)
         for leg in legs:
             leg["risk_level"] = self._assess_leg_risk(leg)
         
-        # Generate alternative routes if optimization requested
-        alternatives = []
-        if len(ports) > 3 and optimization in ["cheapest", "fastest"]:
-            alternatives = self._generate_alternatives(ports, optimization)
-        
         # Get optimization profile info
         profile = self.optimization_profiles.get(optimization, self.optimization_profiles["balanced"])
         
-        return {
+        route = {
             "route_type": "multi_port",
             "optimization": optimization,
             "optimization_description": profile["description"],
             "total_ports": len(ports),
-            "ports": ports,
+            "ports": list(ports),
             "total_legs": len(legs),
             "legs": legs,
             "summary": {
@@ -212,9 +397,15 @@ class RoutePlannerAgent:
                 "estimated_arrival": (datetime.now() + timedelta(days=total_time)).strftime("%Y-%m-%d %H:%M UTC"),
                 "avg_speed_knots": round(self.base_ship_speed * profile["speed_multiplier"], 1)
             },
-            "alternatives": alternatives,
+            "alternatives": [],
             "generated_at": datetime.now().isoformat()
         }
+        
+        # Alternative orders need at least two intermediate stops to reorder
+        if with_alternatives and len(ports) > 3 and optimization in ["cheapest", "fastest"]:
+            route["alternatives"] = self._generate_alternatives(ports, optimization, route)
+        
+        return route
     
     def _assess_leg_risk(self, leg: Dict) -> str:
         """Assess risk level for a route leg"""
@@ -234,68 +425,300 @@ class RoutePlannerAgent:
         else:
             return "low"
     
-    def _generate_alternatives(self, ports: List[str], optimization: str) -> List[Dict]:
+    def _generate_alternatives(self, ports: List[str], optimization: str,
+                               route: Dict) -> List[Dict]:
         """
-        Generate alternative route orderings for optimization.
-        For now, returns a simplified alternative route.
+        Up to MAX_ALTERNATIVES other orderings of the intermediate stops, ranked
+        by the ordering objective of the optimization profile.
+        
+        Orders come from the K-best ordering search, so every alternative is a
+        distinct port sequence; each is assembled from the leg cache and carries
+        its deltas against the planned route.
         """
-        # This is a simplified version - in production, you'd use
-        # more sophisticated algorithms like Traveling Salesman Problem solvers
+        records = [get_port_by_name(port) for port in ports]
+        weights = self._ordering_weight_matrix(self._pair_metrics(records), optimization)
+        # One extra in case the planned order is itself among the best
+        ranked = k_best_open_paths(weights, MAX_ALTERNATIVES + 1, ALTERNATIVES_TIME_BUDGET_MS,
+                                   exact_limit=ALTERNATIVES_EXACT_LIMIT)
+        
+        planned = tuple(range(len(ports)))
+        planned_objective = path_cost(weights, list(planned))
+        planned_names = tuple(records[i]["name"] for i in planned)
+        summary = route["summary"]
+        
         alternatives = []
+        seen = {planned_names}
+        for path, objective in ranked:
+            names = tuple(records[i]["name"] for i in path)
+            if names in seen:  # repeated waypoints give equal sequences
+                continue
+            seen.add(names)
+            
+            alt_route = self._plan_route([ports[i] for i in path], optimization, with_alternatives=False)
+            alt_summary = alt_route["summary"]
+            alt_route["alternative_id"] = len(alternatives) + 1
+            alt_route["rank"] = len(alternatives) + 1
+            alt_route["description"] = (
+                "Best stop order found" if not alternatives and objective < planned_objective - 1e-9
+                else f"Alternative stop order #{len(alternatives) + 1}"
+            )
+            alt_route["objective_value"] = round(objective, 4)
+            alt_route["deltas"] = {
+                "distance_nm": round(alt_summary["total_distance_nm"] - summary["total_distance_nm"], 2),
+                "time_days": round(alt_summary["total_time_days"] - summary["total_time_days"], 2),
+                "cost_usd": round(alt_summary["total_cost_usd"] - summary["total_cost_usd"], 2),
+                "objective_pct": round((objective - planned_objective) / planned_objective * 100, 2)
+                if planned_objective > 0 else 0.0
+            }
+            alternatives.append(alt_route)
+            if len(alternatives) == MAX_ALTERNATIVES:
+                break
+        
+        return alternatives
+    
+    def _pair_metrics(self, records: List[Dict]) -> Dict[str, np.ndarray]:
+        """
+        Profile-independent pairwise leg metrics between port records, taken
+        from the sea-lane routes: distance, canal tolls/days and leg risk level.
+        """
+        n = len(records)
+        metrics = {
+            "distance_nm": np.zeros((n, n)),
+            "canal_toll_usd": np.zeros((n, n)),
+            "canal_days": np.zeros((n, n)),
+            "risk_score": np.zeros((n, n)),
+            "risk_weight": np.ones((n, n))
+        }
+        
+        for i in range(n):
+            for j in range(i + 1, n):
+                route = self.port_route(records[i], records[j])
+                risk = self._assess_leg_risk({
+                    "from_country": records[i]["country"],
+                    "to_country": records[j]["country"],
+                    "distance_nm": route["distance_nm"]
+                })
+                values = {
+                    "distance_nm": route["distance_nm"],
+                    "canal_toll_usd": sum(c["avg_toll"] for c in route["canals"]),
+                    "canal_days": sum(c["avg_transit_time"] for c in route["canals"]),
+                    "risk_score": self.leg_risk_scores[risk],
+                    "risk_weight": self.leg_risk_weights[risk]
+                }
+                for name, value in values.items():
+                    metrics[name][i, j] = metrics[name][j, i] = value
+        
+        return metrics
+    
+    def _profile_matrices(self, metrics: Dict[str, np.ndarray], optimization: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Order-dependent leg time (days) and cost (USD) under an optimization profile"""
+        profile = self.optimization_profiles.get(optimization, self.optimization_profiles["balanced"])
+        ship_speed = self.base_ship_speed * profile["speed_multiplier"]
+        fuel_cost_per_nm = self.base_fuel_cost_per_nm * profile["fuel_cost_multiplier"]
+        
+        time_days = metrics["distance_nm"] / ship_speed / 24 + metrics["canal_days"]
+        cost_usd = metrics["distance_nm"] * fuel_cost_per_nm + metrics["canal_toll_usd"]
+        return time_days, cost_usd
+    
+    def _ordering_weight_matrix(self, metrics: Dict[str, np.ndarray], optimization: str) -> np.ndarray:
+        """
+        Pairwise leg weights for the ordering solver under an optimization profile.
+        Port wait times and fees are the same for every ordering, so only the
+        order-dependent parts (sea-lane distance/time and canal costs) are weighted.
+        """
+        objective = self.ordering_objectives.get(optimization, "time_and_cost")
+        time_days, cost_usd = self._profile_matrices(metrics, optimization)
+        
+        if objective == "time":
+            return time_days
+        if objective == "cost":
+            return cost_usd
+        if objective == "risk_weighted_distance":
+            return metrics["distance_nm"] * metrics["risk_weight"]
+        # Balanced: time and cost normalised to comparable scales
+        return _normalized(time_days) + _normalized(cost_usd)
+    
+    def _resolve_itinerary(self, origin: str, destination: str,
+                           waypoints: List[str]) -> Optional[Tuple[List[str], List[Dict]]]:
+        """
+        Port names and records for origin, known waypoints and destination.
+        Unknown waypoints are dropped; returns None if an endpoint is unknown.
+        """
+        endpoints = [get_port_by_name(origin), get_port_by_name(destination)]
+        if not all(endpoints):
+            return None
         
-        # Try reverse order
-        if len(ports) > 2:
-            reversed_ports = [ports[0]] + list(reversed(ports[1:-1])) + [ports[-1]]
-            alt_route = self.plan_multi_port_route(reversed_ports, optimization)
-            if "error" not in alt_route:
-                alt_route["alternative_id"] = 1
-                alt_route["description"] = "Reversed intermediate stops"
-                alternatives.append(alt_route)
+        names = [origin]
+        records = [endpoints[0]]
+        for waypoint in dict.fromkeys(waypoints):
+            port = get_port_by_name(waypoint)
+            if port:
+                names.append(waypoint)
+                records.append(port)
+        names.append(destination)
+        records.append(endpoints[1])
+        return names, records
+    
+    def solve_route_order(self, origin: str, destination: str, waypoints: List[str],
+                          optimization: str = "balanced",
+                          time_budget_ms: float = DEFAULT_TIME_BUDGET_MS) -> Dict:
+        """
+        Optimize the order of waypoints between origin and destination.
+        Uses exact Held-Karp for small waypoint sets and 2-opt/Or-opt local
+        search for larger ones, minimising the objective of the optimization profile.
+        
+        Returns:
+            {"ports": ordered port names, "solver": solver stats}
+        """
+        solver_info = {"method": "trivial", "objective": self.ordering_objectives.get(optimization, "time_and_cost")}
+        
+        itinerary = self._resolve_itinerary(origin, destination, waypoints) if waypoints else None
+        if itinerary is None:
+            return {"ports": [origin, destination], "solver": solver_info}
+        names, records = itinerary
+        
+        weights = self._ordering_weight_matrix(self._pair_metrics(records), optimization)
+        path, stats = solve_open_path(weights, time_budget_ms)
+        solver_info.update(stats)
+        
+        return {"ports": [names[i] for i in path], "solver": solver_info}
+    
+    def plan_pareto_front(self, origin: str, destination: str, waypoints: List[str],
+                          time_budget_ms: float = 500, include_routes: bool = False) -> Dict:
+        """
+        Pareto-optimal (ordering, profile) pairs over total time, total cost and
+        aggregate leg risk, found in one pass instead of one planning run per profile.
+        
+        Candidate orderings come from solving weighted sums of the three
+        objectives for every profile; each candidate is scored from cached legs
+        and dominated candidates are pruned before any full route is built.
+        """
+        started = time.perf_counter()
+        itinerary = self._resolve_itinerary(origin, destination, waypoints or [])
+        if itinerary is None:
+            return {"error": f"Invalid port: {origin} or {destination}"}
+        names, records = itinerary
+        
+        metrics = self._pair_metrics(records)
+        profiles = list(self.optimization_profiles.keys())
+        orderings = {tuple(range(len(names)))}  # the order as given
+        
+        if len(names) > 3:
+            per_solve_ms = time_budget_ms / (len(profiles) * len(PARETO_SCALARIZATIONS))
+            risk = _normalized(metrics["risk_score"])
+            for optimization in profiles:
+                time_days, cost_usd = self._profile_matrices(metrics, optimization)
+                time_days, cost_usd = _normalized(time_days), _normalized(cost_usd)
+                for w_time, w_cost, w_risk in PARETO_SCALARIZATIONS:
+                    weights = w_time * time_days + w_cost * cost_usd + w_risk * risk
+                    path, _ = solve_open_path(weights, per_solve_ms, exact_limit=PARETO_EXACT_LIMIT)
+                    orderings.add(tuple(path))
+        
+        # Score every (ordering, profile) pair from cached legs
+        candidates = []
+        for order in orderings:
+            ports = [names[i] for i in order]
+            for optimization in profiles:
+                legs = [self.calculate_route_leg(a, b, optimization) for a, b in zip(ports, ports[1:])]
+                candidates.append({
+                    "ports": ports,
+                    "optimization": optimization,
+                    "total_time_days": round(sum(leg["total_time_days"] for leg in legs), 2),
+                    "total_cost_usd": round(sum(leg["total_cost_usd"] for leg in legs), 2),
+                    "risk_score": sum(self.leg_risk_scores[self._assess_leg_risk(leg)] for leg in legs)
+                })
+        
+        front = _pareto_filter(candidates, ("total_time_days", "total_cost_usd", "risk_score"))
+        front.sort(key=lambda c: (c["total_time_days"], c["total_cost_usd"], c["risk_score"]))
+        
+        if include_routes:
+            for candidate in front:
+                candidate["route_analysis"] = self.plan_multi_port_route(candidate["ports"], candidate["optimization"])
         
-        return alternatives[:3]  # Return max 3 alternatives
+        return {
+            "route_type": "pareto",
+            "objectives": ["total_time_days", "total_cost_usd", "risk_score"],
+            "orderings_considered": len(orderings),
+            "candidates_evaluated": len(candidates),
+            "front_size": len(front),
+            "front": front,
+            "solve_time_ms": round((time.perf_counter() - started) * 1000, 2),
+            "generated_at": datetime.now().isoformat()
+        }
     
     def optimize_route_order(self, origin: str, destination: str, waypoints: List[str], 
                             optimization: str = "balanced") -> List[str]:
         """
         Optimize the order of waypoints between origin and destination.
-        Uses a greedy nearest-neighbor approach.
+        See solve_route_order for the solver details.
         """
-        if not waypoints:
-            return [origin, destination]
-        
-        remaining = set(waypoints)
-        route = [origin]
-        current = origin
+        return self.solve_route_order(origin, destination, waypoints, optimization)["ports"]
+    
+    def simulate_route(self, ports: List[str], optimization: str = "balanced",
+                       trials: int = 10000, seed: Optional[int] = None) -> Dict:
+        """
+        Monte Carlo ETA and cost distribution for a planned route.
         
-        while remaining:
-            # Find nearest port from current location
-            nearest = None
-            min_distance = float('inf')
-            
-            current_port = get_port_by_name(current)
-            if not current_port:
-                break
-            
-            for waypoint in remaining:
-                waypoint_port = get_port_by_name(waypoint)
-                if waypoint_port:
-                    dist = self.calculate_distance(
-                        current_port["coordinates"],
-                        waypoint_port["coordinates"]
-                    )
-                    if dist < min_distance:
-                        min_distance = dist
-                        nearest = waypoint
-            
-            if nearest:
-                route.append(nearest)
-                remaining.remove(nearest)
-                current = nearest
-            else:
-                break
+        The deterministic plan supplies each leg's transit time, port wait,
+        canal time and costs; the simulator varies waits, canal delays and
+        speed around them. Returns P50/P90/P99 per leg and for the route.
+        """
+        route = self.plan_multi_port_route(ports, optimization)
+        if "error" in route:
+            return route
+        
+        legs = route["legs"]
+        simulation = simulate_legs(
+            transit_days=[leg["transit_time_days"] for leg in legs],
+            wait_days=[leg["port_wait_time_days"] for leg in legs],
+            canal_days=[sum(self.canals[name]["avg_transit_time"] for name in leg["canals"]) for leg in legs],
+            fuel_cost_usd=[leg["fuel_cost_usd"] for leg in legs],
+            fixed_cost_usd=[leg["port_fees_usd"] + leg["canal_cost_usd"] for leg in legs],
+            trials=trials,
+            seed=seed
+        )
+        
+        departure = datetime.now()
+        for leg, result in zip(legs, simulation["legs"]):
+            result["from"] = leg["from"]
+            result["to"] = leg["to"]
+            result["planned_time_days"] = leg["total_time_days"]
+            result["eta"] = {
+                k: (departure + timedelta(days=days)).strftime("%Y-%m-%d %H:%M UTC")
+                for k, days in result["elapsed_days_at_arrival"].items()
+            }
         
-        route.append(destination)
-        return route
+        return {
+            "route_type": "simulation",
+            "optimization": optimization,
+            "ports": route["ports"],
+            "planned": {
+                "total_time_days": route["summary"]["total_time_days"],
+                "total_cost_usd": route["summary"]["total_cost_usd"]
+            },
+            "estimated_departure": departure.strftime("%Y-%m-%d %H:%M UTC"),
+            "eta": {
+                k: (departure + timedelta(days=days)).strftime("%Y-%m-%d %H:%M UTC")
+                for k, days in simulation["total_time_days"].items()
+            },
+            **simulation,
+            "generated_at": departure.isoformat()
+        }
+    
+    def find_nearest_ports(self, lat: float, lon: float, k: int = 5,
+                           exclude: Optional[List[str]] = None) -> List[Dict]:
+        """Nearest K ports to a position, e.g. for diverting away from a congested port"""
+        excluded = []
+        for name in exclude or []:
+            port = get_port_by_name(name)
+            if port:
+                excluded.append(port["name"])
+        return self.spatial_index.nearest(lat, lon, k, excluded)
+    
+    def find_ports_within(self, lat: float, lon: float, radius_nm: float,
+                          limit: Optional[int] = None) -> List[Dict]:
+        """All ports within radius_nm nautical miles of a position"""
+        return self.spatial_index.within(lat, lon, radius_nm, limit)
     
     def compare_routes(self, route1: List[str], route2: List[str]) -> Dict:
         """Compare two different routes"""
@@ -326,3 +749,33 @@ class RoutePlannerAgent:
             }
         }
 
+
+# Planner instance owned by each process-pool worker, created on first use
+_worker_planner: Optional[RoutePlannerAgent] = None
+
+def _get_worker_planner() -> RoutePlannerAgent:
+    global _worker_planner
+    if _worker_planner is None:
+        _worker_planner = RoutePlannerAgent()
+    return _worker_planner
+
+def plan_route_in_worker(ports: List[str], optimization: str = "balanced") -> Dict:
+    """Process-pool entry point: plan one route with this process's planner and caches"""
+    return _get_worker_planner().plan_multi_port_route(ports, optimization)
+
+def optimize_order_in_worker(origin: str, destination: str, waypoints: List[str],
+                            optimization: str = "balanced", time_budget_ms: float = 250) -> Dict:
+    """Process-pool entry point for solve_route_order, with the full analysis of the chosen order"""
+    planner = _get_worker_planner()
+    ordering = planner.solve_route_order(origin, destination, waypoints, optimization, time_budget_ms)
+    return {**ordering, "route_analysis": planner.plan_multi_port_route(ordering["ports"], optimization)}
+
+def simulate_route_in_worker(ports: List[str], optimization: str = "balanced",
+                             trials: int = 10000, seed: Optional[int] = None) -> Dict:
+    """Process-pool entry point for simulate_route"""
+    return _get_worker_planner().simulate_route(ports, optimization, trials, seed)
+
+def plan_pareto_in_worker(origin: str, destination: str, waypoints: List[str],
+                          time_budget_ms: float = 500, include_routes: bool = False) -> Dict:
+    """Process-pool entry point for plan_pareto_front"""
+    return _get_worker_planner().plan_pareto_front(origin, destination, waypoints, time_budget_ms, include_routes)
@@ -1,8 +1,21 @@
-import json
 import asyncio
-from datetime import datetime, timedelta
-from typing import List, Dict, Any
+import os
+import uuid
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional
+import numpy as np
 from models.schemas import ScheduleRisk
+from agents.shipment_datasets import DEFAULT_SESSION, DatasetTooLarge, ShipmentDatasets
+from agents.shipment_store import ShipmentStore
+from agents.shipment_upload import ShipmentUploadParser
+
+# Streamed uploads whose progress stays queryable (oldest are forgotten first)
+MAX_TRACKED_UPLOADS = 32
+UPLOAD_MODES = ("replace", "append")
+
+
+class TooManyUploads(Exception):
+    pass
 
 class SchedulerAgent:
     def __init__(self):
@@ -54,91 +67,219 @@ class SchedulerAgent:
                 "status": "delayed"
             }
         ]
-        self._custom_data = None
+        # Each session gets its own dataset, copied from the sample data on its
+        # first write and saved to disk so it can leave memory and be shared by workers
+        default_dir = os.path.join(os.path.dirname(__file__), "..", "cache_data", "shipment_datasets")
+        self.datasets = ShipmentDatasets(
+            ShipmentStore(self.sample_data),
+            os.getenv("SHIPMENT_DATASET_DIR", default_dir),
+            session_max_bytes=int(os.getenv("SHIPMENT_SESSION_MAX_BYTES", str(512 << 20))),
+            resident_max_bytes=int(os.getenv("SHIPMENT_DATASETS_MAX_RESIDENT_BYTES", str(2 << 30))),
+            idle_seconds=float(os.getenv("SHIPMENT_SESSION_IDLE_SECONDS", "900")),
+            ttl_seconds=float(os.getenv("SHIPMENT_SESSION_TTL_SECONDS", str(7 * 86400)))
+        )
+        # Keyed by (session, upload id): a session only sees its own uploads
+        self._uploads: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
     
-    def set_shipment_data(self, data_list):
-        """Replace current dataset with provided shipment/equipment list."""
+    def set_shipment_data(self, data_list, session_id: Optional[str] = None):
+        """Replace the session's dataset with provided shipment/equipment list."""
         if not isinstance(data_list, list):
             raise ValueError("Shipment data must be a list of items")
-        self._custom_data = data_list
-    
-    def clear_custom_data(self):
-        """Revert to built-in sample data."""
-        self._custom_data = None
+        store = ShipmentStore(data_list)
+        store.indexes()  # built with the upload so the first query does not pay for it
+        self.datasets.replace(session_id, store)
     
-    def _get_active_data(self):
-        return self._custom_data if self._custom_data is not None else self.sample_data
+    def clear_custom_data(self, session_id: Optional[str] = None):
+        """Revert the session to built-in sample data."""
+        self.datasets.clear(session_id)
     
-    async def extract_countries(self) -> List[str]:
-        """Extract unique countries from equipment data"""
-        countries = list(set([item["country"] for item in self._get_active_data()]))
-        return countries
-    
-    async def analyze_schedule_risks(self) -> List[ScheduleRisk]:
-        """Analyze equipment schedule data for risks"""
-        risks = []
+    def upsert_shipments(self, items: List[Dict[str, Any]], session_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Insert or update items by equipment_id; existing items take only the
+        fields given. Risks are recomputed for the changed items only.
+        """
+        if not isinstance(items, list):
+            raise ValueError("Shipment data must be a list of items")
         
-        for item in self._get_active_data():
-            # Calculate delay days
-            original_date = datetime.strptime(item["original_delivery_date"], "%Y-%m-%d")
-            current_date = datetime.strptime(item["current_delivery_date"], "%Y-%m-%d")
-            delay_days = (current_date - original_date).days
-            
-            # Determine risk level (1-5)
-            risk_level = self._calculate_risk_level(delay_days, item.get("status", "on_time"))
-            
-            # Identify risk factors
-            risk_factors = self._identify_risk_factors(item, delay_days)
-            
-            risk = ScheduleRisk(
-                equipment_id=item["equipment_id"],
-                country=item["country"],
-                original_delivery_date=item["original_delivery_date"],
-                current_delivery_date=item["current_delivery_date"],
-                delay_days=delay_days,
-                risk_level=risk_level,
-                risk_factors=risk_factors
-            )
-            risks.append(risk)
+        def upsert(store: ShipmentStore) -> Dict[str, Any]:
+            result = store.upsert(items)
+            result["rejected"] = [{"index": index, "error": error} for index, error in result["rejected"]]
+            result["total_items"] = len(store)
+            return result
         
-        return risks
-    
-    def _calculate_risk_level(self, delay_days: int, status: str) -> int:
-        """Calculate risk level based on delay and status"""
-        if status == "on_time":
-            return 1
-        elif delay_days <= 7:
-            return 2
-        elif delay_days <= 14:
-            return 3
-        elif delay_days <= 30:
-            return 4
-        else:
-            return 5
+        return self.datasets.write(session_id, upsert, log={"upsert": items})
     
-    def _identify_risk_factors(self, item: Dict[str, Any], delay_days: int) -> List[str]:
-        """Identify potential risk factors"""
-        factors = []
-        
-        if delay_days > 0:
-            factors.append("Delivery delay")
+    def delete_shipments(self, equipment_ids: List[str], session_id: Optional[str] = None) -> Dict[str, Any]:
+        """Remove items by equipment_id"""
+        if not isinstance(equipment_ids, list):
+            raise ValueError("equipment_ids must be a list")
         
-        if delay_days > 14:
-            factors.append("Extended delay")
+        def delete(store: ShipmentStore) -> Dict[str, Any]:
+            result = store.delete(equipment_ids)
+            result["total_items"] = len(store)
+            return result
         
-        if item["country"] in ["China", "India", "Brazil"]:
-            factors.append("Emerging market risks")
-        
-        if delay_days > 30:
-            factors.append("Critical delay")
+        return self.datasets.write(session_id, delete, log={"delete": equipment_ids})
+    
+    def begin_upload(self, upload_id: Optional[str] = None, mode: str = "replace",
+                     fmt: Optional[str] = None, compression: Optional[str] = None,
+                     max_bytes: Optional[int] = None, session_id: Optional[str] = None) -> tuple:
+        """
+        Start a streamed upload into the session's dataset. Rows are parsed
+        into a separate store and only become visible in finish_upload(), so
+        readers never see a partial upload. Parsing stops with UploadTooLarge
+        once the rows outgrow the session's memory budget. Raises
+        TooManyUploads when MAX_TRACKED_UPLOADS uploads are still receiving.
         
-        return factors
+        Returns:
+            (upload_id, parser to feed the body into)
+        """
+        if mode not in UPLOAD_MODES:
+            raise ValueError(f"mode must be one of {', '.join(UPLOAD_MODES)}")
+        upload_id = upload_id or str(uuid.uuid4())
+        key = self._upload_key(upload_id, session_id)
+        previous = self._uploads.pop(key, None)
+        if previous is not None and previous["status"] == "receiving":
+            self._uploads[key] = previous
+            raise ValueError(f"Upload {upload_id} is already in progress")
+        # Finished uploads make room, oldest first; running ones are never dropped
+        for old_key in [k for k, upload in self._uploads.items() if upload["status"] != "receiving"]:
+            if len(self._uploads) < MAX_TRACKED_UPLOADS:
+                break
+            del self._uploads[old_key]
+        if len(self._uploads) >= MAX_TRACKED_UPLOADS:
+            raise TooManyUploads(f"{MAX_TRACKED_UPLOADS} uploads are already in progress, try again later")
+        parser = ShipmentUploadParser(ShipmentStore(), fmt=fmt, compression=compression, max_bytes=max_bytes,
+                                      max_store_bytes=self.datasets.session_max_bytes)
+        self._uploads[key] = {"upload_id": upload_id, "status": "receiving", "mode": mode,
+                              "session_id": session_id, "parser": parser}
+        return upload_id, parser
+
+    @staticmethod
+    def _upload_key(upload_id: str, session_id: Optional[str]) -> tuple:
+        return session_id or DEFAULT_SESSION, upload_id
+    
+    async def finish_upload(self, upload_id: str, error: Optional[str] = None,
+                            session_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Apply a fully parsed upload (replace the dataset or append to it), or
+        record why it failed and drop the parsed rows. Returns the final
+        upload status.
+        """
+        upload = self._uploads[self._upload_key(upload_id, session_id)]
+        parser = upload.pop("parser")
+        session_id = upload["session_id"]
+        if error is None and parser.rows_accepted == 0 and upload["mode"] == "replace":
+            error = "No valid rows in upload"
+        if error is None:
+            try:
+                # Indexing and saving block; the upload's bookkeeping stays on the event loop
+                await asyncio.to_thread(self._apply_upload, upload["mode"], session_id, parser.store)
+            except DatasetTooLarge as e:
+                error = str(e)
+            except BaseException as e:
+                # Keep the slot from counting as a running upload forever
+                upload.update({"status": "failed", "error": str(e) or type(e).__name__})
+                raise
+        upload.update(parser.progress())
+        upload.update({
+            "status": "failed" if error else "completed",
+            "error": error,
+            "rejects": parser.rejects,
+            "total_items": await asyncio.to_thread(self.datasets.read, session_id, len)
+        })
+        return self.upload_status(upload_id, session_id)
+    
+    def _apply_upload(self, mode: str, session_id: Optional[str], uploaded: ShipmentStore):
+        if mode == "replace":
+            uploaded.indexes()
+            self.datasets.replace(session_id, uploaded)
+        else:
+            self.datasets.write(session_id, lambda store: store.merge(uploaded))
+    
+    def upload_status(self, upload_id: str, session_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Progress of one of the session's uploads while running, or its summary once finished"""
+        upload = self._uploads.get(self._upload_key(upload_id, session_id))
+        if upload is None:
+            return None
+        status = {k: v for k, v in upload.items() if k != "parser"}
+        if "parser" in upload:
+            status.update(upload["parser"].progress())
+        return status
+    
+    def _get_active_data(self, session_id: Optional[str] = None):
+        return self.datasets.read(session_id, ShipmentStore.items)
+    
+    async def _read(self, session_id: Optional[str], read):
+        """read(store) in a worker thread: a dataset may first need loading from disk"""
+        return await asyncio.to_thread(self.datasets.read, session_id, read)
+    
+    async def extract_countries(self, session_id: Optional[str] = None) -> List[str]:
+        """Extract unique countries from equipment data"""
+        return await self._read(session_id, lambda store: store.distinct("country"))
+    
+    async def analyze_schedule_risks(self, session_id: Optional[str] = None) -> List[ScheduleRisk]:
+        """
+        Analyze equipment schedule data for risks.
+        Delay days, risk levels and risk factors are computed for all items at
+        once by the columnar store; the ScheduleRisk models for every item are
+        built in a worker thread.
+        """
+        return await self._read(session_id, ShipmentStore.schedule_risks)
     
-    async def get_equipment_by_country(self, country: str) -> List[Dict[str, Any]]:
+    async def get_equipment_by_country(self, country: str, session_id: Optional[str] = None) -> List[Dict[str, Any]]:
         """Get equipment data filtered by country"""
-        return [item for item in self._get_active_data() if item["country"] == country]
+        return await self._read(session_id, lambda store: store.items(store.rows_where("country", country)))
     
-    async def get_high_risk_equipment(self) -> List[ScheduleRisk]:
+    async def get_high_risk_equipment(self, session_id: Optional[str] = None) -> List[ScheduleRisk]:
         """Get equipment with high risk levels (4-5)"""
-        all_risks = await self.analyze_schedule_risks()
-        return [risk for risk in all_risks if risk.risk_level >= 4]
+        return await self._read(
+            session_id, lambda store: store.schedule_risks(store.query(ranges={"risk_level": (4, None)}))
+        )
+    
+    def query_equipment(self, country: Optional[str] = None, supplier: Optional[str] = None,
+                        status: Optional[str] = None, min_risk_level: Optional[int] = None,
+                        max_risk_level: Optional[int] = None, min_delay_days: Optional[int] = None,
+                        max_delay_days: Optional[int] = None, offset: int = 0, limit: int = 50,
+                        session_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        One page of equipment matching every given filter, answered from the
+        secondary indexes. Items carry their delay_days, risk_level and risk_factors.
+        """
+        equals = {field: value for field, value in
+                  (("country", country), ("supplier", supplier), ("status", status)) if value is not None}
+        ranges = {}
+        if min_risk_level is not None or max_risk_level is not None:
+            ranges["risk_level"] = (min_risk_level, max_risk_level)
+        if min_delay_days is not None or max_delay_days is not None:
+            ranges["delay_days"] = (min_delay_days, max_delay_days)
+        def page(store: ShipmentStore) -> Dict[str, Any]:
+            rows = store.query(equals, ranges)
+            return {
+                "total": len(rows),
+                "offset": offset,
+                "limit": limit,
+                "items": self._equipment_with_risk(store, rows[offset:offset + limit])
+            }
+        
+        return self.datasets.read(session_id, page)
+    
+    def most_delayed_equipment(self, limit: int = 10, offset: int = 0,
+                               session_id: Optional[str] = None) -> Dict[str, Any]:
+        """Equipment with the longest delays first, from the sorted delay index"""
+        def page(store: ShipmentStore) -> Dict[str, Any]:
+            return {
+                "total": len(store),
+                "offset": offset,
+                "limit": limit,
+                "items": self._equipment_with_risk(store, store.top("delay_days", limit, offset))
+            }
+        
+        return self.datasets.read(session_id, page)
+    
+    @staticmethod
+    def _equipment_with_risk(store: ShipmentStore, rows: np.ndarray) -> List[Dict[str, Any]]:
+        items = store.items(rows)
+        for item, risk in zip(items, store.risk_records(rows)):
+            item.update(delay_days=risk["delay_days"], risk_level=risk["risk_level"], risk_factors=risk["risk_factors"])
+        return items
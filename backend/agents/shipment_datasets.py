@@ -0,0 +1,442 @@
+"""
+Per-session shipment datasets: copy-on-write, memory budgets, disk spill.
+
+Every session reads the shared baseline store (the sample data) until its
+first write, which copies the baseline into a store of its own. Session
+datasets are written through to disk under `directory`: a full .npz
+snapshot, plus a .log of the upserts and deletes applied since (one JSON
+line each), so a small change costs one appended line rather than saving
+every row. The log is folded into a new snapshot once it passes
+LOG_COMPACT_RATIO of the snapshot's size. Because everything is on disk:
+
+- a resident dataset can be dropped from memory at any time and is loaded
+  again on its next access. Least recently used datasets are dropped when
+  the resident total exceeds `resident_max_bytes`, and any dataset idle for
+  `idle_seconds` is dropped on the next access to another session;
+- uvicorn workers sharing the directory see one dataset per session: each
+  access compares the files with the copy in memory, replaying new log
+  lines (or reloading after a new snapshot) if another worker wrote since.
+  Writes hold a per-session file lock, catch-up reads share it.
+
+Loading, saving and log replay block, so async callers run these methods in
+worker threads; within a process, a session's reads and writes take turns
+on a per-session lock, and read() keeps writes out while a caller uses the
+store.
+
+A write that takes a dataset's row data over `session_max_bytes` is rolled
+back and raises DatasetTooLarge. Requests without a session share DEFAULT_SESSION.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from contextlib import contextmanager, nullcontext
+from typing import Any, Callable, Dict, Optional, Tuple
+from agents.shipment_store import ShipmentStore
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock, run a single worker
+    fcntl = None
+
+DEFAULT_SESSION = "default"
+# Expired dataset files are looked for at most this often (seconds)
+PURGE_INTERVAL = 3600
+# A change log is folded into a new snapshot once it outgrows this share of
+# the snapshot's size (and LOG_COMPACT_MIN_BYTES), which bounds replay work
+LOG_COMPACT_RATIO = 0.25
+LOG_COMPACT_MIN_BYTES = 1 << 20
+
+
+class DatasetTooLarge(Exception):
+    pass
+
+
+def _apply_logged(store: ShipmentStore, entry: Dict[str, Any]):
+    if "upsert" in entry:
+        store.upsert(entry["upsert"])
+    if "delete" in entry:
+        store.delete(entry["delete"])
+
+
+class _Resident:
+    __slots__ = ("store", "signature", "log_offset", "log_size", "last_access", "nbytes")
+
+    def __init__(self, store: ShipmentStore, signature: Tuple[int, int, int]):
+        self.store = store
+        self.signature = signature  # of the snapshot the store was loaded from
+        self.log_offset = 0  # end of the last log line applied
+        self.log_size = 0  # log size when last read (a torn last line is not applied)
+        self.last_access = time.monotonic()
+        self.nbytes = 0
+
+
+class ShipmentDatasets:
+    """
+    Args:
+        baseline: store every session starts from; never written to
+        directory: where session datasets are saved (created on first write)
+        session_max_bytes: budget for one session's row data (indexes built by reads excluded)
+        resident_max_bytes: budget for all datasets held in memory at once
+        idle_seconds: datasets not accessed for this long leave memory
+        ttl_seconds: dataset files not written for this long are deleted
+            (0 keeps them; the default session's file is always kept)
+    """
+
+    def __init__(self, baseline: ShipmentStore, directory: str, session_max_bytes: int = 512 << 20,
+                 resident_max_bytes: int = 2 << 30, idle_seconds: float = 900, ttl_seconds: float = 7 * 86400):
+        self.baseline = baseline
+        self.directory = directory
+        self.session_max_bytes = session_max_bytes
+        self.resident_max_bytes = resident_max_bytes
+        self.idle_seconds = idle_seconds
+        self.ttl_seconds = ttl_seconds
+        self._resident: "OrderedDict[str, _Resident]" = OrderedDict()
+        # Guards _resident across request threads; per-session locks order this
+        # process's reads and writes of one dataset (dropped once unused)
+        self._mutex = threading.RLock()
+        self._session_locks: "weakref.WeakValueDictionary[str, Any]" = weakref.WeakValueDictionary()
+        self._purged_at = 0.0
+        self.counters = {
+            "loads": 0,
+            "saves": 0,
+            "log_appends": 0,
+            "log_replayed": 0,
+            "log_errors": 0,
+            "copies": 0,
+            "evicted_lru": 0,
+            "evicted_idle": 0,
+            "rejected_budget": 0,
+            "purged": 0,
+        }
+
+    @staticmethod
+    def _key(session_id: Optional[str]) -> str:
+        return session_id or DEFAULT_SESSION
+
+    def _path(self, key: str, suffix: str = ".npz") -> str:
+        # Hashed, so any client-chosen session id is a safe file name
+        return os.path.join(self.directory, hashlib.sha256(key.encode("utf-8")).hexdigest()[:32] + suffix)
+
+    @staticmethod
+    def _size(path: str) -> int:
+        try:
+            return os.stat(path).st_size
+        except FileNotFoundError:
+            return 0
+
+    @staticmethod
+    def _signature(stat: os.stat_result) -> Tuple[int, int, int]:
+        # Files are replaced, never rewritten in place: a new write has a new inode and mtime
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    def _session_lock(self, key: str):
+        with self._mutex:
+            lock = self._session_locks.get(key)
+            if lock is None:
+                lock = self._session_locks[key] = threading.RLock()
+            return lock
+
+    # -- Reads -------------------------------------------------------------------
+
+    def get(self, session_id: Optional[str] = None) -> ShipmentStore:
+        """
+        The session's dataset, loaded from disk if it is not resident or is
+        stale. A write in another thread may change it while in use; read()
+        holds writes off.
+        """
+        key = self._key(session_id)
+        resident = self._current(key)
+        if resident is None:
+            # Never written, reset, or expired: back to the shared baseline
+            return self.baseline
+        self._touch(key, resident)
+        return resident.store
+
+    def read(self, session_id: Optional[str], read: Callable[[ShipmentStore], Any]) -> Any:
+        """read(store) on the session's dataset, with this process's writes to it held off meanwhile"""
+        with self._session_lock(self._key(session_id)):
+            return read(self.get(session_id))
+
+    def _current(self, key: str, locked: bool = False) -> Optional[_Resident]:
+        """The session's resident copy brought up to date with its files, or None without a snapshot"""
+        resident = self._resident.get(key)
+        try:
+            signature = self._signature(os.stat(self._path(key)))
+        except FileNotFoundError:
+            with self._mutex:
+                self._resident.pop(key, None)
+            return None
+        if (resident is not None and resident.signature == signature
+                and resident.log_size == self._size(self._path(key, ".log"))):
+            return resident
+        # Files changed: read them under the session lock so no writer is halfway through
+        with nullcontext() if locked else self._locked(key, shared=True):
+            resident = self._sync(key, self._resident.get(key))
+            with self._mutex:
+                if resident is None:
+                    self._resident.pop(key, None)
+                else:
+                    self._resident[key] = resident
+        return resident
+
+    def _sync(self, key: str, resident: Optional[_Resident]) -> Optional[_Resident]:
+        try:
+            with open(self._path(key), "rb") as f:
+                signature = self._signature(os.fstat(f.fileno()))
+                if resident is None or resident.signature != signature:
+                    resident = _Resident(ShipmentStore.load(f), signature)
+                    self.counters["loads"] += 1
+        except FileNotFoundError:
+            return None
+        try:
+            with open(self._path(key, ".log"), "rb") as f:
+                f.seek(resident.log_offset)
+                data = f.read()
+        except FileNotFoundError:
+            data = b""
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].splitlines():
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                self.counters["log_errors"] += 1
+                continue
+            _apply_logged(resident.store, entry)
+            self.counters["log_replayed"] += 1
+        resident.log_offset += end
+        resident.log_size = resident.log_offset + len(data) - end
+        return resident
+
+    def _touch(self, key: str, resident: _Resident):
+        resident.last_access = time.monotonic()
+        # Re-measured on access: reads grow a dataset too (indexes)
+        resident.nbytes = resident.store.memory_usage()
+        with self._mutex:
+            if self._resident.get(key) is resident:
+                self._resident.move_to_end(key)
+            self._evict(keep=key)
+
+    def _evict(self, keep: str):
+        """Drop idle datasets, then least recently used ones until under the resident budget"""
+        now = time.monotonic()
+        for key in list(self._resident):
+            if key != keep and now - self._resident[key].last_access > self.idle_seconds:
+                del self._resident[key]
+                self.counters["evicted_idle"] += 1
+        total = sum(resident.nbytes for resident in self._resident.values())
+        for key in list(self._resident):
+            if total <= self.resident_max_bytes:
+                break
+            if key != keep:
+                total -= self._resident.pop(key).nbytes
+                self.counters["evicted_lru"] += 1
+        if self.ttl_seconds and now - self._purged_at > PURGE_INTERVAL:
+            self._purged_at = now
+            self.purge_expired()
+
+    # -- Writes ------------------------------------------------------------------
+
+    @contextmanager
+    def _locked(self, key: str, shared: bool = False):
+        """Hold the session's lock in this process and its file lock across workers, so writes apply one at a time"""
+        with self._session_lock(key):
+            if fcntl is None:
+                yield
+                return
+            with self._file_locked(key, shared):
+                yield
+
+    @contextmanager
+    def _file_locked(self, key: str, shared: bool):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(key, ".lock")
+        while True:
+            with open(path, "a") as lock:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+                try:
+                    current = os.path.samestat(os.fstat(lock.fileno()), os.stat(path))
+                except FileNotFoundError:
+                    current = False
+                if not current:
+                    # purge_expired() deleted the lock file while we waited; lock its successor
+                    continue
+                try:
+                    yield
+                    return
+                finally:
+                    fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+
+    def write(self, session_id: Optional[str], change: Callable[[ShipmentStore], Any],
+              log: Optional[Dict[str, Any]] = None) -> Any:
+        """
+        Apply change(store) to the session's dataset and save it. The first
+        write of a session copies the baseline. If change raises or the result
+        exceeds the session budget, the previous version stays in effect.
+
+        Args:
+            log: the same change as {"upsert": items} and/or {"delete": ids};
+                it is appended to the session's change log instead of saving
+                the whole dataset
+        """
+        key = self._key(session_id)
+        with self._locked(key):
+            resident = self._current(key, locked=True)
+            if resident is None:
+                store = self.baseline.copy()
+                self.counters["copies"] += 1
+            else:
+                store = resident.store
+            line = None
+            if log is not None and resident is not None:
+                try:
+                    line = (json.dumps(log, separators=(",", ":")) + "\n").encode("utf-8")
+                except (TypeError, ValueError):
+                    line = None  # not JSON: save the whole dataset instead
+            try:
+                result = change(store)
+            except BaseException:
+                # The resident copy may be half changed; reload it from disk next time
+                with self._mutex:
+                    self._resident.pop(key, None)
+                raise
+            if line is None:
+                self._commit(key, store)
+            else:
+                self._check_budget(key, store)
+                self._append_log(key, resident, line)
+        return result
+
+    def replace(self, session_id: Optional[str], store: ShipmentStore):
+        """Make store the session's dataset"""
+        key = self._key(session_id)
+        with self._locked(key):
+            self._commit(key, store)
+
+    def _check_budget(self, key: str, store: ShipmentStore):
+        # Row data only: caches built by reads (indexes) must not decide
+        # whether a write fits; they count towards the resident budget instead
+        size = store.memory_usage(caches=False)
+        if size > self.session_max_bytes:
+            with self._mutex:
+                self._resident.pop(key, None)
+            self.counters["rejected_budget"] += 1
+            raise DatasetTooLarge(
+                f"Dataset needs about {size >> 20} MiB, over the {self.session_max_bytes >> 20} MiB session budget"
+            )
+
+    def _append_log(self, key: str, resident: _Resident, line: bytes):
+        with open(self._path(key, ".log"), "ab") as f:
+            if f.tell() != resident.log_offset:
+                # Drop a torn last line left by a writer that died mid-append
+                f.truncate(resident.log_offset)
+            f.write(line)
+        resident.log_offset = resident.log_size = resident.log_offset + len(line)
+        self.counters["log_appends"] += 1
+        if resident.log_offset > max(LOG_COMPACT_MIN_BYTES, resident.signature[1] * LOG_COMPACT_RATIO):
+            self._commit(key, resident.store)
+        else:
+            self._touch(key, resident)
+
+    def _commit(self, key: str, store: ShipmentStore):
+        """Save a full snapshot of store and start an empty change log"""
+        self._check_budget(key, store)
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(key)
+        temp = f"{path}.{os.getpid()}.tmp"
+        with open(temp, "wb") as f:
+            store.save(f)
+            f.flush()
+            signature = self._signature(os.fstat(f.fileno()))
+        os.replace(temp, path)
+        self._remove(self._path(key, ".log"))
+        self.counters["saves"] += 1
+        resident = _Resident(store, signature)
+        with self._mutex:
+            self._resident[key] = resident
+        self._touch(key, resident)
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def clear(self, session_id: Optional[str] = None):
+        """Drop the session's dataset; it reads the baseline again"""
+        key = self._key(session_id)
+        with self._locked(key):
+            with self._mutex:
+                self._resident.pop(key, None)
+            self._remove(self._path(key))
+            self._remove(self._path(key, ".log"))
+
+    def purge_expired(self) -> int:
+        """
+        Delete datasets (snapshot, change log and lock file) not written for
+        ttl_seconds. A dataset whose lock another worker holds is skipped.
+        """
+        if not self.ttl_seconds or not os.path.isdir(self.directory):
+            return 0
+        keep = os.path.basename(self._path(DEFAULT_SESSION))
+        cutoff = time.time() - self.ttl_seconds
+        purged = 0
+        for entry in os.scandir(self.directory):
+            try:
+                if entry.name.endswith(".tmp"):
+                    if entry.stat().st_mtime < cutoff:
+                        os.remove(entry.path)
+                    continue
+                if entry.name == keep or not entry.name.endswith(".npz"):
+                    continue
+                base = entry.path[:-len(".npz")]
+                if self._written_at(base) >= cutoff:
+                    continue
+                if fcntl is None:
+                    self._purge(base)
+                    purged += 1
+                    continue
+                with open(base + ".lock", "a") as lock:
+                    try:
+                        fcntl.flock(lock.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    except BlockingIOError:
+                        continue
+                    # Written while we waited for the directory scan?
+                    if self._written_at(base) < cutoff:
+                        self._purge(base)
+                        purged += 1
+            except FileNotFoundError:
+                pass
+        self.counters["purged"] += purged
+        return purged
+
+    @staticmethod
+    def _written_at(base: str) -> float:
+        """Last write to a dataset: its snapshot or, if later, its change log"""
+        written = os.stat(base + ".npz").st_mtime
+        try:
+            return max(written, os.stat(base + ".log").st_mtime)
+        except FileNotFoundError:
+            return written
+
+    def _purge(self, base: str):
+        # The lock file goes last, while still held; waiters notice and lock a new one
+        for suffix in (".npz", ".log", ".lock"):
+            self._remove(base + suffix)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._mutex:
+            resident_bytes = sum(resident.nbytes for resident in self._resident.values())
+            resident_datasets = len(self._resident)
+        return {
+            "resident_datasets": resident_datasets,
+            "resident_bytes": resident_bytes,
+            "resident_max_bytes": self.resident_max_bytes,
+            "session_max_bytes": self.session_max_bytes,
+            **self.counters,
+        }
@@ -0,0 +1,731 @@
+"""
+Columnar shipment store for the scheduler agent.
+
+Each shipment field is kept as one NumPy column instead of a list of dicts:
+delivery dates as datetime64[D], country/supplier/status as int32 codes into
+per-field category tables, free text and any extra keys as object arrays.
+Delay days, risk levels and risk factors are then computed for every row at
+once with array operations and kept as columns, updated as rows change.
+ScheduleRisk models are only built for the rows a caller asks for.
+
+Risk factors are stored as a bitmask per row (see RISK_FACTORS); a row's
+factor names are looked up from a 16-entry table.
+"""
+
+import bisect
+import json
+import sys
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+from models.schemas import ScheduleRisk
+
+FIELDS = (
+    "equipment_id", "description", "country", "supplier",
+    "original_delivery_date", "current_delivery_date", "status"
+)
+REQUIRED_FIELDS = ("equipment_id", "country", "original_delivery_date", "current_delivery_date")
+CATEGORICAL_FIELDS = ("country", "supplier", "status")
+DATE_FIELDS = ("original_delivery_date", "current_delivery_date")
+TEXT_FIELDS = ("equipment_id", "description")
+# Items without a status key count as on time; an explicit None or "" does not
+ON_TIME_STATUS = "on_time"
+
+# Upper delay bound (days, inclusive) for risk levels 2-4; anything later is 5.
+# On-time items are always level 1.
+RISK_LEVEL_DELAY_LIMITS = (7, 14, 30)
+EMERGING_MARKETS = ("China", "India", "Brazil")
+# Bit order is the order factors are listed in a risk
+RISK_FACTORS = ("Delivery delay", "Extended delay", "Emerging market risks", "Critical delay")
+EXTENDED_DELAY_DAYS = 14
+CRITICAL_DELAY_DAYS = 30
+_FACTOR_LISTS = tuple(
+    tuple(name for bit, name in enumerate(RISK_FACTORS) if mask & (1 << bit))
+    for mask in range(1 << len(RISK_FACTORS))
+)
+
+# Secondary indexes: hash indexes on category codes, ordered ones on risk columns
+HASH_INDEXED_FIELDS = ("country", "supplier", "status")
+SORTED_INDEXED_FIELDS = ("risk_level", "delay_days")
+
+# Approximate heap bytes per row of the Python-side structures, measured with
+# tracemalloc: id -> row map entry, one index entry per indexed field
+_ROW_MAP_BYTES = 100
+_INDEX_ENTRY_BYTES = 95
+# ScheduleRisk fields, in the order _risk_values() yields them
+_RISK_KEYS = (
+    "equipment_id", "country", "original_delivery_date", "current_delivery_date",
+    "delay_days", "risk_level", "risk_factors"
+)
+# Rows sampled to estimate the size of the free-text columns
+_SIZE_SAMPLE_ROWS = 64
+# Object columns are saved as one JSON array each, stored as UTF-8 bytes
+_OBJECT_COLUMNS = ("equipment_id", "description", "extra")
+
+_INITIAL_CAPACITY = 64
+_MISSING_CODE = -1
+_NO_ROWS: frozenset = frozenset()
+
+
+class Categories:
+    """Value <-> int32 code table for one categorical column (code -1 = missing)"""
+
+    def __init__(self):
+        self.values: List[str] = []
+        self.codes: Dict[str, int] = {}
+
+    def encode(self, values: Iterable[Optional[str]]) -> np.ndarray:
+        codes = self.codes
+        out = []
+        for value in values:
+            if value is None:
+                out.append(_MISSING_CODE)
+                continue
+            code = codes.get(value)
+            if code is None:
+                code = codes[value] = len(self.values)
+                self.values.append(value)
+            out.append(code)
+        return np.asarray(out, dtype=np.int32)
+
+    def code(self, value: str) -> int:
+        """Code of a value, or -1 if it never occurred (matches nothing)"""
+        return self.codes.get(value, _MISSING_CODE)
+
+    def decode(self, codes: np.ndarray) -> List[Optional[str]]:
+        values = self.values
+        return [values[code] if code >= 0 else None for code in codes.tolist()]
+
+
+def _parse_dates(values: Sequence[Any]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    datetime64[D] column from "YYYY-MM-DD" strings, plus a mask of values that
+    are not valid dates (NaT in the column). The whole column is parsed by
+    NumPy at once; if it rejects any value, rows fall back to strptime
+    (which also accepts e.g. "2024-2-5").
+    """
+    try:
+        dates = np.array(values, dtype="datetime64[D]")
+        invalid = np.isnat(dates)
+        if not invalid.any():
+            return dates, invalid
+    except (ValueError, TypeError):
+        pass
+
+    dates = np.empty(len(values), dtype="datetime64[D]")
+    for i, value in enumerate(values):
+        try:
+            dates[i] = np.datetime64(datetime.strptime(str(value), "%Y-%m-%d").date(), "D") if value else np.datetime64("NaT")
+        except ValueError:
+            dates[i] = np.datetime64("NaT")
+    return dates, np.isnat(dates)
+
+
+def _item_error(item: Any) -> Optional[str]:
+    if not isinstance(item, dict):
+        return f"expected an object, got {type(item).__name__}"
+    missing = [field for field in REQUIRED_FIELDS if item.get(field) in (None, "")]
+    if missing:
+        return f"missing {', '.join(missing)}"
+    return None
+
+
+class BucketIndex:
+    """
+    Secondary index: key -> set of rows. With ordered=True the distinct keys
+    are also kept sorted, for range scans and highest-first iteration.
+    """
+
+    def __init__(self, ordered: bool = False):
+        self.buckets: Dict[int, set] = {}
+        self.keys: Optional[List[int]] = [] if ordered else None
+
+    @classmethod
+    def build(cls, values: np.ndarray, ordered: bool = False) -> "BucketIndex":
+        """Index a whole column at once: one stable argsort, split at key changes"""
+        index = cls(ordered)
+        if len(values):
+            order = np.argsort(values, kind="stable")
+            ordered_values = values[order]
+            bounds = np.flatnonzero(ordered_values[1:] != ordered_values[:-1]) + 1
+            keys = ordered_values[np.concatenate(([0], bounds))].tolist()
+            for key, rows in zip(keys, np.split(order, bounds)):
+                index.buckets[key] = set(rows.tolist())
+        if ordered:
+            index.keys = sorted(index.buckets)
+        return index
+
+    def add(self, key: int, row: int):
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = self.buckets[key] = set()
+            if self.keys is not None:
+                bisect.insort(self.keys, key)
+        bucket.add(row)
+
+    def discard(self, key: int, row: int):
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            return
+        bucket.discard(row)
+        if not bucket:
+            del self.buckets[key]
+            if self.keys is not None:
+                del self.keys[bisect.bisect_left(self.keys, key)]
+
+    def get(self, key: int):
+        return self.buckets.get(key, _NO_ROWS)
+
+    def range(self, low: Optional[int] = None, high: Optional[int] = None) -> List[set]:
+        """Buckets with low <= key <= high (ordered indexes only)"""
+        start = 0 if low is None else bisect.bisect_left(self.keys, low)
+        stop = len(self.keys) if high is None else bisect.bisect_right(self.keys, high)
+        return [self.buckets[key] for key in self.keys[start:stop]]
+
+    def descending(self):
+        """(key, rows) pairs from the highest key down (ordered indexes only)"""
+        for key in reversed(self.keys):
+            yield key, self.buckets[key]
+
+
+class ShipmentStore:
+    """
+    Growable columnar table of shipment items with materialized risk columns.
+
+    Risk columns are computed for rows as they are written, so appends,
+    upserts and deletes by equipment_id only touch the rows they change.
+    Deletes move the last row into the freed slot, so row order is upload
+    order only until the first delete. Equipment ids are expected to be
+    unique; with duplicates, upserts and deletes apply to the last one.
+    """
+
+    def __init__(self, items: Optional[Sequence[Dict[str, Any]]] = None):
+        self.categories = {field: Categories() for field in CATEGORICAL_FIELDS}
+        self._size = 0
+        self._capacity = 0
+        self._columns: Dict[str, np.ndarray] = {}
+        self._allocate(_INITIAL_CAPACITY)
+        self._row_by_id: Dict[str, int] = {}
+        # Incremented on every change
+        self.version = 0
+        # Secondary indexes, built on first query and then kept in step
+        self._indexes: Optional[Dict[str, BucketIndex]] = None
+        if items:
+            self.extend(items)
+
+    def _allocate(self, capacity: int):
+        old, size = self._columns, self._size
+        columns = {
+            "equipment_id": np.empty(capacity, dtype=object),
+            "description": np.empty(capacity, dtype=object),
+            "extra": np.empty(capacity, dtype=object),
+            "original_delivery_date": np.empty(capacity, dtype="datetime64[D]"),
+            "current_delivery_date": np.empty(capacity, dtype="datetime64[D]"),
+            "delay_days": np.empty(capacity, dtype=np.int32),
+            "risk_level": np.empty(capacity, dtype=np.int8),
+            "factor_mask": np.empty(capacity, dtype=np.uint8),
+        }
+        for field in CATEGORICAL_FIELDS:
+            columns[field] = np.empty(capacity, dtype=np.int32)
+        for name, column in old.items():
+            columns[name][:size] = column[:size]
+        self._columns = columns
+        self._capacity = capacity
+
+    def __len__(self) -> int:
+        return self._size
+
+    def column(self, name: str) -> np.ndarray:
+        """Read-only view of a column over the stored rows"""
+        view = self._columns[name][:self._size]
+        view.flags.writeable = False
+        return view
+
+    def row_of(self, equipment_id: str) -> Optional[int]:
+        return self._row_by_id.get(str(equipment_id))
+
+    # -- Writes ------------------------------------------------------------------
+
+    @staticmethod
+    def validate(items: Sequence[Any], first_row: int = 0):
+        """Raise ValueError for the first item that is not a dict with the required fields"""
+        for i, item in enumerate(items):
+            error = _item_error(item)
+            if error:
+                raise ValueError(f"Item {first_row + i}: {error}")
+
+    @staticmethod
+    def _prepare(items: Sequence[Any]) -> Tuple[Dict[int, str], Dict[str, np.ndarray]]:
+        """Per-item errors (index -> message) and the parsed date columns"""
+        errors: Dict[int, str] = {}
+        for i, item in enumerate(items):
+            error = _item_error(item)
+            if error:
+                errors[i] = error
+        dates = {}
+        for field in DATE_FIELDS:
+            values = [None if i in errors else item[field] for i, item in enumerate(items)]
+            dates[field], invalid = _parse_dates(values)
+            for i in np.flatnonzero(invalid).tolist():
+                errors.setdefault(i, f"invalid {field} {values[i]!r} (expected YYYY-MM-DD)")
+        return errors, dates
+
+    @staticmethod
+    def _without(items: Sequence[Any], dates: Dict[str, np.ndarray], errors: Dict[int, str]):
+        if not errors:
+            return list(items), dates
+        keep = np.ones(len(items), dtype=bool)
+        keep[list(errors)] = False
+        return (
+            [item for item, ok in zip(items, keep.tolist()) if ok],
+            {field: column[keep] for field, column in dates.items()}
+        )
+
+    def extend(self, items: Sequence[Dict[str, Any]]):
+        """
+        Append items. The batch is validated and parsed before anything is
+        stored, so a ValueError leaves the store unchanged.
+        """
+        first = self._size
+        self.validate(items, first)
+        dates = {}
+        for field in DATE_FIELDS:
+            values = [item[field] for item in items]
+            dates[field], invalid = _parse_dates(values)
+            if invalid.any():
+                i = int(np.argmax(invalid))
+                raise ValueError(f"Item {first + i}: invalid {field} {values[i]!r} (expected YYYY-MM-DD)")
+        self._append(items, dates)
+
+    def extend_valid(self, items: Sequence[Any]) -> List[Tuple[int, str]]:
+        """
+        Append the items that are valid and skip the rest.
+
+        Returns:
+            [(index into items, error), ...] for every rejected item
+        """
+        errors, dates = self._prepare(items)
+        self._append(*self._without(items, dates, errors))
+        return sorted(errors.items())
+
+    def upsert(self, items: Sequence[Any]) -> Dict[str, Any]:
+        """
+        Insert or update items by equipment_id. For an existing id only the
+        given fields change (e.g. {"equipment_id", "status"}); new ids need
+        every required field. Only the touched rows' risks are recomputed.
+
+        Returns:
+            {"inserted", "updated", "rejected": [(index into items, error), ...]}
+        """
+        errors: Dict[int, str] = {}
+        # Latest merged item per id; repeated ids in one batch apply in order
+        pending: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+        for i, item in enumerate(items):
+            if not isinstance(item, dict) or item.get("equipment_id") in (None, ""):
+                errors[i] = _item_error(item) or "missing equipment_id"
+                continue
+            equipment_id = str(item["equipment_id"])
+            if equipment_id in pending:
+                base = pending[equipment_id][1]
+            else:
+                row = self._row_by_id.get(equipment_id)
+                base = self.items([row])[0] if row is not None else {}
+            pending[equipment_id] = (i, {**base, **item, "equipment_id": equipment_id})
+
+        indices = [i for i, _ in pending.values()]
+        merged = [item for _, item in pending.values()]
+        merged_errors, dates = self._prepare(merged)
+        for j, error in merged_errors.items():
+            errors[indices[j]] = error
+        merged, dates = self._without(merged, dates, merged_errors)
+
+        existing = np.array([self._row_by_id.get(item["equipment_id"], -1) for item in merged], dtype=np.intp)
+        update = existing >= 0
+        if update.any():
+            self._write(existing[update], [item for item, u in zip(merged, update.tolist()) if u],
+                        {field: column[update] for field, column in dates.items()})
+        insert = ~update
+        if insert.any():
+            self._append([item for item, u in zip(merged, update.tolist()) if not u],
+                         {field: column[insert] for field, column in dates.items()})
+        return {
+            "inserted": int(insert.sum()),
+            "updated": int(update.sum()),
+            "rejected": sorted(errors.items())
+        }
+
+    def delete(self, equipment_ids: Iterable[str]) -> Dict[str, Any]:
+        """
+        Remove items by equipment_id. Each freed row is filled with the last
+        row, so a delete costs O(1) per item regardless of table size.
+
+        Returns:
+            {"deleted", "missing": [ids not found]}
+        """
+        rows, missing = [], []
+        for equipment_id in dict.fromkeys(str(e) for e in equipment_ids):
+            row = self._row_by_id.pop(equipment_id, None)
+            if row is None:
+                missing.append(equipment_id)
+            else:
+                rows.append(row)
+        # Highest rows first, so a row moved into a hole is never deleted later
+        for row in sorted(rows, reverse=True):
+            self._remove_row(row)
+        if rows:
+            self.version += 1
+        return {"deleted": len(rows), "missing": missing}
+
+    def _remove_row(self, row: int):
+        last = self._size - 1
+        columns = self._columns
+        self._unindex_rows([row])
+        if row != last:
+            self._unindex_rows([last])
+            for column in columns.values():
+                column[row] = column[last]
+            moved_id = columns["equipment_id"][row]
+            if self._row_by_id.get(moved_id) == last:
+                self._row_by_id[moved_id] = row
+            self._index_rows([row])
+        for name in ("equipment_id", "description", "extra"):
+            columns[name][last] = None
+        self._size = last
+
+    def _reserve(self, n: int) -> slice:
+        """Grow capacity for n more rows and return their slice"""
+        first = self._size
+        if first + n > self._capacity:
+            self._allocate(max(first + n, self._capacity * 2))
+        return slice(first, first + n)
+
+    def _append(self, items: Sequence[Dict[str, Any]], dates: Dict[str, np.ndarray]):
+        n = len(items)
+        if not n:
+            return
+        rows = self._reserve(n)
+        self._size += n
+        for row, equipment_id in enumerate(self._write(rows, items, dates, new=True), rows.start):
+            self._row_by_id[equipment_id] = row
+
+    def _write(self, rows, items: Sequence[Dict[str, Any]], dates: Dict[str, np.ndarray],
+               new: bool = False) -> List[str]:
+        """Store validated items at rows (slice or index array) and recompute their risks"""
+        columns = self._columns
+        if not new:
+            self._unindex_rows(rows)
+        ids = [str(item["equipment_id"]) for item in items]
+        columns["equipment_id"][rows] = ids
+        columns["description"][rows] = [item.get("description") for item in items]
+        for field in DATE_FIELDS:
+            columns[field][rows] = dates[field]
+        columns["country"][rows] = self.categories["country"].encode(item["country"] for item in items)
+        columns["supplier"][rows] = self.categories["supplier"].encode(item.get("supplier") for item in items)
+        columns["status"][rows] = self.categories["status"].encode(
+            item.get("status", ON_TIME_STATUS) for item in items
+        )
+        # Keys outside the known fields are kept per row so items round-trip
+        columns["extra"][rows] = [
+            {k: v for k, v in item.items() if k not in FIELDS} or None for item in items
+        ]
+        self._refresh_risks(rows)
+        self._index_rows(rows)
+        return ids
+
+    def merge(self, other: "ShipmentStore"):
+        """Append every row of another store; category codes are remapped with one lookup per field"""
+        n = len(other)
+        if not n:
+            return
+        rows = self._reserve(n)
+        columns = self._columns
+        for name in ("equipment_id", "description", "extra", *DATE_FIELDS):
+            columns[name][rows] = other._columns[name][:n]
+        for field in CATEGORICAL_FIELDS:
+            # Last entry maps the missing code (-1) to itself
+            remap = np.append(self.categories[field].encode(other.categories[field].values), _MISSING_CODE)
+            columns[field][rows] = remap[other._columns[field][:n]]
+        self._size += n
+        for row, equipment_id in enumerate(columns["equipment_id"][rows].tolist(), rows.start):
+            self._row_by_id[equipment_id] = row
+        self._refresh_risks(rows)
+        self._index_rows(rows)
+
+    def copy(self) -> "ShipmentStore":
+        """Independent store with the same rows"""
+        store = ShipmentStore()
+        store.merge(self)
+        return store
+
+    # -- Risk computation ------------------------------------------------------
+
+    def _compute_risks(self, rows) -> Dict[str, np.ndarray]:
+        """delay_days, risk_level and factor_mask for the selected rows (slice or index array)"""
+        columns = self._columns
+        delay = (columns["current_delivery_date"][rows] - columns["original_delivery_date"][rows]).astype(np.int32)
+        status = columns["status"][rows]
+        country = columns["country"][rows]
+
+        on_time_code = self.categories["status"].code(ON_TIME_STATUS)
+        # Until some row is on time its code is -1, which would match missing (None) statuses
+        on_time = status == on_time_code if on_time_code >= 0 else np.zeros(len(status), dtype=bool)
+        limits = RISK_LEVEL_DELAY_LIMITS
+        risk_level = np.select(
+            [on_time, delay <= limits[0], delay <= limits[1], delay <= limits[2]],
+            [1, 2, 3, 4], default=5
+        ).astype(np.int8)
+
+        emerging_codes = [self.categories["country"].code(c) for c in EMERGING_MARKETS]
+        factor_mask = (
+            (delay > 0).astype(np.uint8)
+            | ((delay > EXTENDED_DELAY_DAYS).astype(np.uint8) << 1)
+            | (np.isin(country, emerging_codes).astype(np.uint8) << 2)
+            | ((delay > CRITICAL_DELAY_DAYS).astype(np.uint8) << 3)
+        )
+        return {"delay_days": delay, "risk_level": risk_level, "factor_mask": factor_mask}
+
+    def _refresh_risks(self, rows):
+        """Recompute the materialized risk columns for written rows"""
+        for name, values in self._compute_risks(rows).items():
+            self._columns[name][rows] = values
+        self.version += 1
+
+    def risk_columns(self) -> Dict[str, np.ndarray]:
+        """delay_days (int32), risk_level (int8) and factor_mask (uint8) for every row"""
+        return {name: self.column(name) for name in ("delay_days", "risk_level", "factor_mask")}
+
+    def schedule_risks(self, rows: Optional[np.ndarray] = None) -> List[ScheduleRisk]:
+        """
+        ScheduleRisk per row (all rows by default, else the given row indices).
+        Built on every call, about 13 us a row: paths that serve many rows
+        should read risk_records() or risk_columns() instead.
+        """
+        return [ScheduleRisk(**record) for record in self.risk_records(rows)]
+
+    def risk_records(self, rows: Optional[np.ndarray] = None) -> List[Dict[str, Any]]:
+        """ScheduleRisk fields per row as plain dicts, as model_dump() would give them"""
+        return [dict(zip(_RISK_KEYS, values)) for values in self._risk_values(rows)]
+
+    def _risk_values(self, rows: Optional[np.ndarray]):
+        rows = np.arange(self._size) if rows is None else np.asarray(rows, dtype=np.intp)
+        columns = self._columns
+        return zip(
+            columns["equipment_id"][rows].tolist(),
+            self.categories["country"].decode(columns["country"][rows]),
+            np.datetime_as_string(columns["original_delivery_date"][rows]).tolist(),
+            np.datetime_as_string(columns["current_delivery_date"][rows]).tolist(),
+            columns["delay_days"][rows].tolist(),
+            columns["risk_level"][rows].tolist(),
+            [list(_FACTOR_LISTS[mask]) for mask in columns["factor_mask"][rows].tolist()]
+        )
+
+    def risks_by_country(self) -> Dict[str, Tuple[int, List[str]]]:
+        """Per country: the highest risk level and the risk factors of all its rows, in row order"""
+        n = self._size
+        if not n:
+            return {}
+        columns = self._columns
+        order = np.argsort(columns["country"][:n], kind="stable")
+        codes, starts = np.unique(columns["country"][:n][order], return_index=True)
+        levels = np.maximum.reduceat(columns["risk_level"][:n][order], starts)
+        result = {}
+        for country, level, masks in zip(self.categories["country"].decode(codes), levels.tolist(),
+                                         np.split(columns["factor_mask"][:n][order], starts[1:])):
+            factors = []
+            for mask in masks.tolist():
+                factors.extend(_FACTOR_LISTS[mask])
+            result[country] = (level, factors)
+        return result
+
+    # -- Secondary indexes -----------------------------------------------------
+
+    def indexes(self) -> Dict[str, BucketIndex]:
+        if self._indexes is None:
+            self._indexes = {
+                **{field: BucketIndex.build(self.column(field)) for field in HASH_INDEXED_FIELDS},
+                **{field: BucketIndex.build(self.column(field), ordered=True) for field in SORTED_INDEXED_FIELDS},
+            }
+        return self._indexes
+
+    def _index_keys(self, rows) -> Dict[str, List[int]]:
+        return {field: self._columns[field][rows].tolist() for field in self._indexes}
+
+    def _index_rows(self, rows):
+        if self._indexes is None:
+            return
+        indices = np.arange(self._size)[rows].tolist()
+        for field, keys in self._index_keys(rows).items():
+            index = self._indexes[field]
+            for key, row in zip(keys, indices):
+                index.add(key, row)
+
+    def _unindex_rows(self, rows):
+        if self._indexes is None:
+            return
+        indices = np.arange(self._size)[rows].tolist()
+        for field, keys in self._index_keys(rows).items():
+            index = self._indexes[field]
+            for key, row in zip(keys, indices):
+                index.discard(key, row)
+
+    def query(self, equals: Optional[Dict[str, str]] = None,
+              ranges: Optional[Dict[str, Tuple[Optional[int], Optional[int]]]] = None) -> np.ndarray:
+        """
+        Rows (ascending) matching every filter, found through the indexes.
+
+        Args:
+            equals: categorical field -> value, e.g. {"country": "China"}
+            ranges: sorted field -> (low, high), inclusive, None for open
+
+        The most selective filter supplies the candidate rows and the others
+        are checked on just those rows, so the cost follows the smallest
+        match rather than the table size.
+        """
+        indexes = self.indexes()
+        constraints = []  # (candidate count, candidate row sets, field, check on values)
+        for field, value in (equals or {}).items():
+            code = self.categories[field].code(value)
+            rows = indexes[field].get(code) if code != _MISSING_CODE else _NO_ROWS
+            constraints.append((len(rows), [rows], field, lambda values, code=code: values == code))
+        for field, (low, high) in (ranges or {}).items():
+            buckets = indexes[field].range(low, high)
+            low = -np.inf if low is None else low
+            high = np.inf if high is None else high
+            constraints.append((
+                sum(map(len, buckets)), buckets, field,
+                lambda values, low=low, high=high: (values >= low) & (values <= high)
+            ))
+        if not constraints:
+            return np.arange(self._size)
+
+        constraints.sort(key=lambda c: c[0])
+        count, buckets, _, _ = constraints[0]
+        rows = np.fromiter((row for bucket in buckets for row in bucket), dtype=np.intp, count=count)
+        for _, _, field, check in constraints[1:]:
+            rows = rows[check(self._columns[field][rows])]
+        rows.sort()
+        return rows
+
+    def top(self, field: str, n: int, offset: int = 0) -> np.ndarray:
+        """Rows with the highest values of a sorted field; ties in row order"""
+        rows: List[int] = []
+        for _, bucket in self.indexes()[field].descending():
+            rows.extend(sorted(bucket))
+            if len(rows) >= offset + n:
+                break
+        return np.asarray(rows[offset:offset + n], dtype=np.intp)
+
+    def distinct(self, field: str) -> List[str]:
+        """Values of a categorical field present in at least one row"""
+        codes = [code for code in self.indexes()[field].buckets if code != _MISSING_CODE]
+        return self.categories[field].decode(np.asarray(codes, dtype=np.int32))
+
+    # -- Row access ------------------------------------------------------------
+
+    def items(self, rows: Optional[np.ndarray] = None) -> List[Dict[str, Any]]:
+        """Rows as item dicts (dates as YYYY-MM-DD), all rows by default"""
+        rows = np.arange(self._size) if rows is None else np.asarray(rows, dtype=np.intp)
+        columns = self._columns
+        decoded = {field: self.categories[field].decode(columns[field][rows]) for field in CATEGORICAL_FIELDS}
+        original = np.datetime_as_string(columns["original_delivery_date"][rows]).tolist()
+        current = np.datetime_as_string(columns["current_delivery_date"][rows]).tolist()
+        out = []
+        for i, (equipment_id, description, extra) in enumerate(zip(
+            columns["equipment_id"][rows].tolist(),
+            columns["description"][rows].tolist(),
+            columns["extra"][rows].tolist()
+        )):
+            item = {
+                "equipment_id": equipment_id,
+                "description": description,
+                "country": decoded["country"][i],
+                "supplier": decoded["supplier"][i],
+                "original_delivery_date": original[i],
+                "current_delivery_date": current[i],
+                "status": decoded["status"][i],
+            }
+            # Optional fields the item never had stay absent
+            for field in ("description", "supplier"):
+                if item[field] is None:
+                    del item[field]
+            if extra:
+                item.update(extra)
+            out.append(item)
+        return out
+
+    def rows_where(self, field: str, value: str) -> np.ndarray:
+        """Row indices whose categorical field equals value"""
+        return self.query(equals={field: value})
+
+    # -- Size and persistence --------------------------------------------------
+
+    def memory_usage(self, caches: bool = True) -> int:
+        """
+        Approximate bytes held: the column buffers, the free-text values
+        (estimated from a sample of rows) and the id map, plus the indexes
+        once a read has built them. caches=False
+        counts the row data only, which does not depend on earlier reads.
+        """
+        total = sum(column.nbytes for column in self._columns.values())
+        n = self._size
+        if not n:
+            return total
+        sample = np.linspace(0, n - 1, min(n, _SIZE_SAMPLE_ROWS)).astype(np.intp)
+        columns = self._columns
+        text = 0
+        for row in sample.tolist():
+            text += sys.getsizeof(columns["equipment_id"][row])
+            text += sys.getsizeof(columns["description"][row]) if columns["description"][row] is not None else 0
+            extra = columns["extra"][row]
+            if extra:
+                text += sys.getsizeof(extra) + sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in extra.items())
+        total += text * n // len(sample)
+        total += n * _ROW_MAP_BYTES
+        if not caches:
+            return total
+        if self._indexes is not None:
+            total += n * _INDEX_ENTRY_BYTES * len(self._indexes)
+        return total
+
+    def save(self, file):
+        """
+        Write the rows to an open binary file as .npz: numeric columns as
+        arrays, object columns and category tables as UTF-8 JSON. No pickles,
+        so load() never executes anything from the file.
+        """
+        n = self._size
+        arrays = {
+            name: column[:n] for name, column in self._columns.items() if name not in _OBJECT_COLUMNS
+        }
+        for name in _OBJECT_COLUMNS:
+            arrays[name] = _json_bytes(self._columns[name][:n].tolist())
+        for field in CATEGORICAL_FIELDS:
+            arrays[f"{field}_categories"] = _json_bytes(self.categories[field].values)
+        np.savez(file, **arrays)
+
+    @classmethod
+    def load(cls, file) -> "ShipmentStore":
+        """Store written by save(); indexes are rebuilt on first use"""
+        store = cls()
+        with np.load(file, allow_pickle=False) as data:
+            objects = {name: json.loads(data[name].tobytes()) for name in _OBJECT_COLUMNS}
+            n = len(objects["equipment_id"])
+            store._allocate(max(n, _INITIAL_CAPACITY))
+            for name, column in store._columns.items():
+                if name in _OBJECT_COLUMNS:
+                    column[:n] = objects[name]
+                else:
+                    column[:n] = data[name]
+            for field in CATEGORICAL_FIELDS:
+                categories = store.categories[field]
+                categories.values = json.loads(data[f"{field}_categories"].tobytes())
+                categories.codes = {value: code for code, value in enumerate(categories.values)}
+        store._size = n
+        # Later rows win for repeated ids, as when they were appended
+        store._row_by_id = dict(zip(objects["equipment_id"], range(n)))
+        store.version += 1
+        return store
+
+
+def _json_bytes(values: List[Any]) -> np.ndarray:
+    return np.frombuffer(json.dumps(values, default=str).encode("utf-8"), dtype=np.uint8)
@@ -0,0 +1,264 @@
+"""
+Incremental NDJSON/CSV parser for streamed shipment uploads.
+
+Bytes are fed as they arrive. The parser inflates gzip/deflate input (given
+by Content-Encoding or detected from the gzip magic bytes, including bodies
+of several concatenated gzip members), decodes UTF-8 incrementally, splits
+complete records and appends them to a ShipmentStore in batches.
+Only the current batch and a partial trailing record are buffered.
+Invalid rows are skipped and reported with their line numbers.
+"""
+
+import codecs
+import csv
+import json
+import time
+import zlib
+from typing import Any, Dict, List, Optional
+from agents.shipment_store import ShipmentStore
+
+NDJSON = "ndjson"
+CSV = "csv"
+FORMATS = (NDJSON, CSV)
+
+BATCH_ROWS = 5000
+# Inflated output per decompress() call, so one small gzip chunk cannot expand unbounded at once
+INFLATE_STEP_BYTES = 1 << 20
+MAX_REPORTED_REJECTS = 1000
+_GZIP_MAGIC = b"\x1f\x8b"
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+def _csv_quote_open(line: str, in_quotes: bool) -> bool:
+    """
+    Whether a quoted field is still open at the end of one physical CSV line.
+    As in the csv module, a quote only opens a field when it is the field's
+    first character; elsewhere in an unquoted field (5" pipe) it is literal.
+    """
+    i, n = 0, len(line)
+    while i < n:
+        if in_quotes:
+            j = line.find('"', i)
+            if j < 0:
+                return True
+            if line.startswith('"', j + 1):  # doubled quote inside the field
+                i = j + 2
+                continue
+            in_quotes = False
+            i = j + 1
+        elif line.startswith('"', i):
+            in_quotes = True
+            i += 1
+            continue
+        # Unquoted field (or rest of a closed one): skip to the next field
+        j = line.find(",", i)
+        if j < 0:
+            return False
+        i = j + 1
+    return in_quotes
+
+
+class ShipmentUploadParser:
+    """
+    Parses one upload into `store`. Call feed() per body chunk, then finish().
+    Counters can be read at any time for progress reporting.
+    """
+
+    def __init__(self, store: ShipmentStore, fmt: Optional[str] = None, compression: Optional[str] = None,
+                 max_bytes: Optional[int] = None, batch_rows: int = BATCH_ROWS,
+                 max_store_bytes: Optional[int] = None):
+        """
+        Args:
+            fmt: "ndjson" or "csv"; None detects it from the first character
+            compression: "gzip" or "deflate" (e.g. from Content-Encoding);
+                None detects gzip from its magic bytes
+            max_bytes: limit on the decompressed size
+            max_store_bytes: limit on the parsed rows' memory (checked per batch)
+        """
+        if fmt is not None and fmt not in FORMATS:
+            raise ValueError(f"Unsupported format {fmt!r}, expected one of {', '.join(FORMATS)}")
+        if compression not in (None, "identity", "gzip", "deflate"):
+            raise ValueError(f"Unsupported compression {compression!r}")
+        self.store = store
+        self.format = fmt
+        self.max_bytes = max_bytes
+        self.max_store_bytes = max_store_bytes
+        self.batch_rows = batch_rows
+
+        self.compression = None if compression == "identity" else compression
+        self._inflater = None
+        self._sniffed = False
+        self._decoder = codecs.getincrementaldecoder("utf-8-sig")()
+        # Text after the last newline, kept in pieces so a long line is joined once
+        self._pending: List[str] = []
+
+        self._header: Optional[List[str]] = None
+        self._line = 0  # last physical line consumed
+        self._record: List[str] = []  # lines of a CSV record whose quoted field is still open
+        self._in_quotes = False
+        self._batch: List[Any] = []
+        self._batch_lines: List[int] = []
+
+        self.bytes_received = 0
+        self.bytes_decoded = 0
+        self.rows_accepted = 0
+        self.rows_rejected = 0
+        self.rejects: List[Dict[str, Any]] = []
+        self.started_at = time.time()
+
+    # -- Bytes -> text -----------------------------------------------------------
+
+    def feed(self, data: bytes):
+        if not data:
+            return
+        self.bytes_received += len(data)
+        if not self._sniffed:
+            self._sniffed = True
+            if self.compression is None and data[:2] == _GZIP_MAGIC:
+                self.compression = "gzip"
+            if self.compression is not None:
+                # wbits 32+15: accept either a gzip or a zlib header
+                self._inflater = zlib.decompressobj(wbits=47)
+        if self._inflater is None:
+            self._feed_decoded(data)
+            return
+        try:
+            while data:
+                if self._inflater.eof:
+                    # Concatenated members (cat a.gz b.gz) continue the same body
+                    self._inflater = zlib.decompressobj(wbits=47)
+                out = self._inflater.decompress(data, INFLATE_STEP_BYTES)
+                while out:
+                    self._feed_decoded(out)
+                    out = self._inflater.decompress(self._inflater.unconsumed_tail, INFLATE_STEP_BYTES)
+                data = self._inflater.unused_data
+        except zlib.error as e:
+            raise ValueError(f"Corrupt {self.compression} stream: {e}")
+
+    def _feed_decoded(self, data: bytes, final: bool = False):
+        self.bytes_decoded += len(data)
+        if self.max_bytes is not None and self.bytes_decoded > self.max_bytes:
+            raise UploadTooLarge(f"Upload exceeds {self.max_bytes} bytes")
+        try:
+            text = self._decoder.decode(data, final)
+        except UnicodeDecodeError as e:
+            raise ValueError(f"Upload is not valid UTF-8 (after line {self._line}): {e.reason}")
+        if self.format is None:
+            stripped = text.lstrip()
+            if not stripped:
+                self._pending.append(text)
+                return
+            self.format = NDJSON if stripped[0] in "{[" else CSV
+        self._consume(text, final)
+
+    # -- Text -> records ---------------------------------------------------------
+
+    def _consume(self, text: str, final: bool):
+        end = len(text) if final else text.rfind("\n") + 1
+        if not end and not final:
+            self._pending.append(text)
+            return
+        self._pending.append(text[:end])
+        lines = "".join(self._pending).split("\n")
+        self._pending = [text[end:]] if end < len(text) else []
+        if not lines[-1]:
+            lines.pop()  # nothing after the last newline
+        if self.format == NDJSON:
+            for line in lines:
+                self._line += 1
+                if line.strip():
+                    self._parse_json_line(line)
+        else:
+            for line in lines:
+                self._consume_csv_line(line)
+            if final and self._record:
+                # Quote never closed: let the csv module make what it can of it
+                self._parse_csv_record("\n".join(self._record), len(self._record))
+                self._record, self._in_quotes = [], False
+        if len(self._batch) >= self.batch_rows:
+            self._flush()
+
+    def _parse_json_line(self, line: str):
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            self._reject(self._line, f"invalid JSON: {e}")
+            return
+        self._batch.append(row)
+        self._batch_lines.append(self._line)
+
+    def _consume_csv_line(self, line: str):
+        # A record ends at a newline outside a quoted field; most lines have no quotes at all
+        if not self._record and '"' not in line:
+            self._parse_csv_record(line, 1)
+            return
+        self._in_quotes = _csv_quote_open(line, self._in_quotes)
+        self._record.append(line)
+        if not self._in_quotes:
+            self._parse_csv_record("\n".join(self._record), len(self._record))
+            self._record = []
+
+    def _parse_csv_record(self, record: str, physical_lines: int):
+        first_line = self._line + 1
+        self._line += physical_lines
+        if not record.strip():
+            return
+        try:
+            values = next(csv.reader([record.rstrip("\r\n")]))
+        except (csv.Error, StopIteration) as e:
+            self._reject(first_line, f"invalid CSV: {e}")
+            return
+        if self._header is None:
+            self._header = [name.strip() for name in values]
+            return
+        if len(values) != len(self._header):
+            self._reject(first_line, f"expected {len(self._header)} fields, got {len(values)}")
+            return
+        # Empty cells are missing values, as in the JSON upload
+        self._batch.append({name: value for name, value in zip(self._header, values) if value != ""})
+        self._batch_lines.append(first_line)
+
+    # -- Records -> store --------------------------------------------------------
+
+    def _flush(self):
+        if not self._batch:
+            return
+        rejected = self.store.extend_valid(self._batch)
+        for index, error in rejected:
+            self._reject(self._batch_lines[index], error)
+        self.rows_accepted += len(self._batch) - len(rejected)
+        self._batch, self._batch_lines = [], []
+        if self.max_store_bytes is not None and self.store.memory_usage(caches=False) > self.max_store_bytes:
+            raise UploadTooLarge(f"Parsed rows exceed the {self.max_store_bytes >> 20} MiB dataset budget")
+
+    def _reject(self, line: int, error: str):
+        self.rows_rejected += 1
+        if len(self.rejects) < MAX_REPORTED_REJECTS:
+            self.rejects.append({"line": line, "error": error})
+
+    def finish(self):
+        """Parse whatever is left once the body is complete"""
+        if self._inflater is not None:
+            if not self._inflater.eof:
+                raise ValueError(f"Truncated {self.compression} stream")
+            tail = self._inflater.flush()
+            if tail:
+                self._feed_decoded(tail)
+        self._feed_decoded(b"", final=True)
+        self._flush()
+        self.rejects.sort(key=lambda reject: reject["line"])
+
+    def progress(self) -> Dict[str, Any]:
+        return {
+            "format": self.format,
+            "compression": self.compression,
+            "bytes_received": self.bytes_received,
+            "bytes_decoded": self.bytes_decoded,
+            "lines": self._line,
+            "rows_accepted": self.rows_accepted,
+            "rows_rejected": self.rows_rejected,
+            "elapsed_ms": round((time.time() - self.started_at) * 1000, 1),
+        }
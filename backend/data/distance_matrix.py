@@ -0,0 +1,80 @@
+"""
+Precomputed all-pairs great-circle distance matrix over the port table.
+"""
+
+import math
+from typing import Dict, List, Optional
+import numpy as np
+
+from data.ports import MAJOR_PORTS, get_port_by_name, get_port_table_version
+
+# Radius of earth in nautical miles
+EARTH_RADIUS_NM = 3440.065
+
+
+def haversine_nm(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great circle distance in nautical miles between two points given in degrees"""
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * math.asin(min(math.sqrt(a), 1.0)) * EARTH_RADIUS_NM
+
+
+def haversine_matrix(lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """
+    Great circle distances (nautical miles) between every pair of coordinates.
+    lats/lons are 1-D arrays in degrees; returns an (n, n) array.
+    """
+    lat = np.radians(lats)[:, None]
+    lon = np.radians(lons)[:, None]
+
+    dlat = lat.T - lat
+    dlon = lon.T - lon
+
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat) * np.cos(lat.T) * np.sin(dlon / 2) ** 2
+    c = 2 * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+    return c * EARTH_RADIUS_NM
+
+
+class PortDistanceMatrix:
+    """
+    Distance matrix over MAJOR_PORTS, built once and rebuilt only when the
+    port table version changes.
+    """
+
+    def __init__(self):
+        self.names: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.matrix = np.zeros((0, 0))
+        self._version = None
+        self.refresh()
+
+    def refresh(self, force: bool = False) -> bool:
+        """Rebuild the matrix if the port table changed. Returns True if rebuilt."""
+        version = get_port_table_version()
+        if not force and version == self._version:
+            return False
+
+        names = list(MAJOR_PORTS.keys())
+        lats = np.array([MAJOR_PORTS[n]["coordinates"]["lat"] for n in names], dtype=float)
+        lons = np.array([MAJOR_PORTS[n]["coordinates"]["lon"] for n in names], dtype=float)
+
+        self.names = names
+        self.index = {name: i for i, name in enumerate(names)}
+        self.matrix = haversine_matrix(lats, lons)
+        self._version = version
+        return True
+
+    def row_of(self, port_name: str) -> Optional[int]:
+        """Matrix row for a port name or alias, or None if unknown"""
+        self.refresh()
+        port = get_port_by_name(port_name)
+        return self.index.get(port["name"]) if port else None
+
+    def distance(self, port1_name: str, port2_name: str) -> Optional[float]:
+        """Distance in nautical miles between two known ports"""
+        i = self.row_of(port1_name)
+        j = self.row_of(port2_name)
+        if i is None or j is None:
+            return None
+        return float(self.matrix[i, j])
@@ -2,6 +2,9 @@
 Major global shipping ports database with coordinates and operational data.
 """
 
+from types import MappingProxyType
+from typing import Dict
+
 MAJOR_PORTS = {
     # Asia-Pacific
     "Shanghai": {
@@ -253,12 +256,120 @@ CANALS = {
     }
 }
 
+# Alternative names and UN/LOCODEs accepted by get_port_by_name
+PORT_ALIASES = {
+    "Shanghai": ["CNSHA"],
+    "Singapore": ["SGSIN"],
+    "Shenzhen": ["CNSZX", "Yantian"],
+    "Hong Kong": ["HK", "HKHKG"],
+    "Busan": ["Pusan", "KRPUS"],
+    "Guangzhou": ["Canton", "CNCAN"],
+    "Qingdao": ["Tsingtao", "CNTAO"],
+    "Tokyo": ["JPTYO"],
+    "Port Klang": ["Klang", "MYPKG"],
+    "Kaohsiung": ["TWKHH"],
+    "Rotterdam": ["NLRTM"],
+    "Antwerp": ["Antwerpen", "BEANR"],
+    "Hamburg": ["DEHAM"],
+    "Valencia": ["ESVLC"],
+    "Piraeus": ["GRPIR"],
+    "Le Havre": ["FRLEH"],
+    "Felixstowe": ["GBFXT"],
+    "Dubai": ["Jebel Ali", "AEJEA", "AEDXB"],
+    "Jeddah": ["Jiddah", "SAJED"],
+    "Port Said": ["EGPSD"],
+    "Los Angeles": ["LA", "USLAX"],
+    "Long Beach": ["USLGB"],
+    "New York": ["NYC", "New York New Jersey", "USNYC"],
+    "Savannah": ["USSAV"],
+    "Houston": ["USHOU"],
+    "Santos": ["BRSSZ"],
+    "Vancouver": ["CAVAN"],
+    "Manzanillo": ["MXZLO"],
+    "Durban": ["ZADUR"],
+    "Lagos": ["Apapa", "NGLOS"],
+    "Tangier": ["Tanger Med", "MAPTM"],
+    "Sydney": ["Port Botany", "AUSYD"],
+    "Melbourne": ["AUMEL"],
+    "Mumbai": ["Bombay", "INBOM"],
+    "Chennai": ["Madras", "INMAA"],
+    "Colombo": ["LKCMB"],
+    "Karachi": ["PKKHI"],
+}
+
+# Bumped whenever MAJOR_PORTS or CANALS changes so derived structures
+# (distance matrix, indexes, caches) know to rebuild themselves.
+_port_table_version = 0
+
+def get_port_table_version() -> int:
+    """Current version of the port/canal tables"""
+    return _port_table_version
+
+def mark_port_table_changed():
+    """Signal that MAJOR_PORTS, CANALS or PORT_ALIASES was modified in place"""
+    global _port_table_version
+    _port_table_version += 1
+
+def upsert_port(name: str, info: dict):
+    """Add or replace a port entry"""
+    MAJOR_PORTS[name] = info
+    mark_port_table_changed()
+
+def remove_port(name: str):
+    """Remove a port entry if present"""
+    if MAJOR_PORTS.pop(name, None) is not None:
+        mark_port_table_changed()
+
+def normalize_port_name(port_name: str) -> str:
+    """Normalize a port name for lookups: lowercase, no punctuation, single spaces"""
+    cleaned = "".join(ch if ch.isalnum() else " " for ch in port_name.lower())
+    return " ".join(cleaned.split())
+
+def _freeze_port(name: str, info: dict) -> MappingProxyType:
+    """Read-only port record shared by every lookup"""
+    record = {**info, "name": name}
+    record["coordinates"] = MappingProxyType(dict(info["coordinates"]))
+    return MappingProxyType(record)
+
+def _build_port_index() -> Dict[str, MappingProxyType]:
+    """Map exact names, normalized names and aliases to shared port records"""
+    records = {name: _freeze_port(name, info) for name, info in MAJOR_PORTS.items()}
+    index = {}
+
+    # Aliases first so canonical names always win on collisions
+    for name, aliases in PORT_ALIASES.items():
+        if name in records:
+            for alias in aliases:
+                index.setdefault(normalize_port_name(alias), records[name])
+
+    for name, record in records.items():
+        index[name] = record
+        index[normalize_port_name(name)] = record
+        index[normalize_port_name(f"Port of {name}")] = record
+
+    return index
+
+_port_index: Dict[str, MappingProxyType] = {}
+_port_index_version = None
+
+def get_port_index() -> Dict[str, MappingProxyType]:
+    """Name index over MAJOR_PORTS, rebuilt only when the port table changes"""
+    global _port_index, _port_index_version
+    if _port_index_version != _port_table_version:
+        _port_index = _build_port_index()
+        _port_index_version = _port_table_version
+    return _port_index
+
 def get_port_by_name(port_name: str):
-    """Get port information by name (case-insensitive)"""
-    for name, info in MAJOR_PORTS.items():
-        if name.lower() == port_name.lower():
-            return {**info, "name": name}
-    return None
+    """
+    Get port information by name, alias or UN/LOCODE (case-insensitive).
+    Returns a shared read-only record; copy it before modifying.
+    """
+    index = get_port_index()
+    record = index.get(port_name)
+    if record is None:
+        record = index.get(normalize_port_name(port_name))
+    return record
 
 def get_all_port_names():
     """Get list of all port names"""
@@ -0,0 +1,156 @@
+"""
+Sea-lane routing graph: ports, chokepoints, open-sea waypoints and canals
+joined by navigable lanes, with cached A* shortest paths between ports.
+"""
+
+import heapq
+from typing import Dict, List, Optional, Tuple
+
+from data.ports import MAJOR_PORTS, CANALS, get_port_table_version
+from data.sea_lanes import SEA_NODES, SEA_LANES, PORT_ACCESS, AUTO_ACCESS_LINKS
+from data.distance_matrix import haversine_nm
+
+MAX_CACHED_ROUTES = 50000
+
+
+class SeaLaneGraph:
+    """
+    Maritime graph built from MAJOR_PORTS, CANALS and the sea-lane tables.
+    Rebuilt (and the route cache dropped) when the port table version changes.
+    """
+
+    def __init__(self):
+        self.coordinates: Dict[str, Tuple[float, float]] = {}
+        self.node_types: Dict[str, str] = {}
+        self.adjacency: Dict[str, List[Tuple[str, float]]] = {}
+        self._routes: Dict[Tuple[str, str], Optional[Dict]] = {}
+        self._version = None
+        self.refresh()
+
+    def refresh(self, force: bool = False) -> bool:
+        """Rebuild the graph if the port or canal tables changed. Returns True if rebuilt."""
+        version = get_port_table_version()
+        if not force and version == self._version:
+            return False
+
+        coordinates = {}
+        node_types = {}
+        for name, info in SEA_NODES.items():
+            coordinates[name] = (info["coordinates"]["lat"], info["coordinates"]["lon"])
+            node_types[name] = info["type"]
+        for name, info in CANALS.items():
+            coordinates[name] = (info["coordinates"]["lat"], info["coordinates"]["lon"])
+            node_types[name] = "canal"
+
+        sea_names = list(coordinates.keys())
+        adjacency: Dict[str, List[Tuple[str, float]]] = {name: [] for name in coordinates}
+
+        def connect(a: str, b: str):
+            distance = haversine_nm(*coordinates[a], *coordinates[b])
+            adjacency[a].append((b, distance))
+            adjacency[b].append((a, distance))
+
+        for a, b in SEA_LANES:
+            if a in coordinates and b in coordinates:
+                connect(a, b)
+
+        for name, info in MAJOR_PORTS.items():
+            if name in coordinates:
+                continue
+            coordinates[name] = (info["coordinates"]["lat"], info["coordinates"]["lon"])
+            node_types[name] = "port"
+            adjacency[name] = []
+
+            access = [n for n in PORT_ACCESS.get(name, []) if n in adjacency and n != name]
+            if not access:
+                # Unlisted port: join the nearest sea nodes
+                access = sorted(
+                    sea_names,
+                    key=lambda n: haversine_nm(*coordinates[name], *coordinates[n])
+                )[:AUTO_ACCESS_LINKS]
+            for node in access:
+                connect(name, node)
+
+        self.coordinates = coordinates
+        self.node_types = node_types
+        self.adjacency = adjacency
+        self._routes = {}
+        self._version = version
+        return True
+
+    def _a_star(self, source: str, target: str) -> Optional[List[str]]:
+        """Shortest node path between two ports; other ports are never transited"""
+        target_lat, target_lon = self.coordinates[target]
+
+        def heuristic(node: str) -> float:
+            return haversine_nm(*self.coordinates[node], target_lat, target_lon)
+
+        best = {source: 0.0}
+        parent = {source: None}
+        frontier = [(heuristic(source), 0.0, source)]
+
+        while frontier:
+            _, cost, node = heapq.heappop(frontier)
+            if node == target:
+                path = []
+                while node is not None:
+                    path.append(node)
+                    node = parent[node]
+                return path[::-1]
+            if cost > best[node]:
+                continue
+            if node != source and self.node_types[node] == "port":
+                continue
+
+            for neighbour, distance in self.adjacency[node]:
+                new_cost = cost + distance
+                if new_cost < best.get(neighbour, float("inf")):
+                    best[neighbour] = new_cost
+                    parent[neighbour] = node
+                    heapq.heappush(frontier, (new_cost + heuristic(neighbour), new_cost, neighbour))
+
+        return None
+
+    def route(self, from_port: str, to_port: str) -> Optional[Dict]:
+        """
+        Sea route between two ports (canonical names).
+
+        Returns:
+            {"distance_nm", "path", "polyline", "canals"} or None when either
+            port is unknown or no navigable path exists. The result is shared
+            with the cache and must not be modified.
+        """
+        self.refresh()
+        key = (from_port, to_port)
+        if key in self._routes:
+            return self._routes[key]
+
+        if from_port not in self.coordinates or to_port not in self.coordinates:
+            return None
+
+        path = [from_port] if from_port == to_port else self._a_star(from_port, to_port)
+        result = None
+        if path:
+            distance = sum(
+                haversine_nm(*self.coordinates[a], *self.coordinates[b])
+                for a, b in zip(path, path[1:])
+            )
+            result = {
+                "distance_nm": distance,
+                "path": tuple(path),
+                "polyline": tuple(self.coordinates[n] for n in path),
+                "canals": tuple(n for n in path[1:-1] if self.node_types[n] == "canal"),
+            }
+
+        if len(self._routes) >= MAX_CACHED_ROUTES:
+            # Drop the oldest entry; dicts keep insertion order
+            self._routes.pop(next(iter(self._routes)))
+        self._routes[key] = result
+        if result is not None:
+            self._routes[(to_port, from_port)] = {
+                **result,
+                "path": result["path"][::-1],
+                "polyline": result["polyline"][::-1],
+                "canals": result["canals"][::-1],
+            }
+        return result
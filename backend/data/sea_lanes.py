@@ -0,0 +1,317 @@
+"""
+Maritime network used for sea-lane routing: chokepoints and open-sea
+waypoints, the navigable lanes between them, and how each port joins the
+network. Canals from data.ports.CANALS are nodes of the same graph.
+"""
+
+SEA_NODES = {
+    # Chokepoints
+    "Strait of Gibraltar": {"type": "chokepoint", "coordinates": {"lat": 35.95, "lon": -5.60}},
+    "Bab-el-Mandeb": {"type": "chokepoint", "coordinates": {"lat": 12.60, "lon": 43.30}},
+    "Strait of Hormuz": {"type": "chokepoint", "coordinates": {"lat": 26.55, "lon": 56.45}},
+    "Strait of Malacca": {"type": "chokepoint", "coordinates": {"lat": 2.90, "lon": 100.90}},
+    "Singapore Strait": {"type": "chokepoint", "coordinates": {"lat": 1.15, "lon": 103.90}},
+    "Dover Strait": {"type": "chokepoint", "coordinates": {"lat": 51.00, "lon": 1.55}},
+    "Cape of Good Hope": {"type": "chokepoint", "coordinates": {"lat": -35.20, "lon": 18.50}},
+    "Cape Horn": {"type": "chokepoint", "coordinates": {"lat": -56.50, "lon": -67.00}},
+    "Taiwan Strait": {"type": "chokepoint", "coordinates": {"lat": 23.50, "lon": 119.30}},
+    "Luzon Strait": {"type": "chokepoint", "coordinates": {"lat": 20.50, "lon": 121.00}},
+    "Korea Strait": {"type": "chokepoint", "coordinates": {"lat": 34.30, "lon": 128.80}},
+    "Lombok Strait": {"type": "chokepoint", "coordinates": {"lat": -8.80, "lon": 115.70}},
+    "Straits of Florida": {"type": "chokepoint", "coordinates": {"lat": 25.00, "lon": -79.80}},
+    "Yucatan Channel": {"type": "chokepoint", "coordinates": {"lat": 21.80, "lon": -85.80}},
+    "Windward Passage": {"type": "chokepoint", "coordinates": {"lat": 20.00, "lon": -73.80}},
+    "Sicily Channel": {"type": "chokepoint", "coordinates": {"lat": 37.20, "lon": 11.50}},
+    "Bass Strait": {"type": "chokepoint", "coordinates": {"lat": -39.50, "lon": 146.00}},
+
+    # Open-sea waypoints - Asia-Pacific
+    "Yangtze Approach": {"type": "waypoint", "coordinates": {"lat": 30.80, "lon": 123.00}},
+    "Yellow Sea": {"type": "waypoint", "coordinates": {"lat": 35.00, "lon": 123.00}},
+    "East China Sea": {"type": "waypoint", "coordinates": {"lat": 28.00, "lon": 124.50}},
+    "Pearl River Approach": {"type": "waypoint", "coordinates": {"lat": 21.90, "lon": 114.30}},
+    "South China Sea": {"type": "waypoint", "coordinates": {"lat": 12.00, "lon": 112.00}},
+    "South China Sea South": {"type": "waypoint", "coordinates": {"lat": 5.00, "lon": 107.50}},
+    "Karimata Strait": {"type": "waypoint", "coordinates": {"lat": -2.00, "lon": 108.80}},
+    "Java Sea": {"type": "waypoint", "coordinates": {"lat": -5.00, "lon": 112.00}},
+    "Osumi Strait": {"type": "waypoint", "coordinates": {"lat": 30.90, "lon": 130.80}},
+    "Japan South": {"type": "waypoint", "coordinates": {"lat": 32.50, "lon": 134.00}},
+    "Tokyo Bay Approach": {"type": "waypoint", "coordinates": {"lat": 34.50, "lon": 139.90}},
+    "Philippine Sea": {"type": "waypoint", "coordinates": {"lat": 15.00, "lon": 132.00}},
+    "Caroline Islands": {"type": "waypoint", "coordinates": {"lat": 5.00, "lon": 150.00}},
+    "Solomon Sea East": {"type": "waypoint", "coordinates": {"lat": -9.00, "lon": 160.00}},
+    "Coral Sea": {"type": "waypoint", "coordinates": {"lat": -18.00, "lon": 156.00}},
+    "Cape Howe": {"type": "waypoint", "coordinates": {"lat": -37.80, "lon": 150.50}},
+    "Great Australian Bight": {"type": "waypoint", "coordinates": {"lat": -37.00, "lon": 130.00}},
+    "Cape Leeuwin": {"type": "waypoint", "coordinates": {"lat": -35.50, "lon": 114.50}},
+    "West Australia Offshore": {"type": "waypoint", "coordinates": {"lat": -25.00, "lon": 111.00}},
+
+    # Open-sea waypoints - Pacific crossings and Americas west coast
+    "North Pacific West": {"type": "waypoint", "coordinates": {"lat": 40.00, "lon": 155.00}},
+    "North Pacific": {"type": "waypoint", "coordinates": {"lat": 46.00, "lon": 180.00}},
+    "North Pacific East": {"type": "waypoint", "coordinates": {"lat": 42.00, "lon": -140.00}},
+    "Juan de Fuca": {"type": "waypoint", "coordinates": {"lat": 48.40, "lon": -124.80}},
+    "San Pedro Approach": {"type": "waypoint", "coordinates": {"lat": 33.60, "lon": -118.30}},
+    "Baja West": {"type": "waypoint", "coordinates": {"lat": 29.00, "lon": -117.00}},
+    "Cabo San Lucas Offshore": {"type": "waypoint", "coordinates": {"lat": 22.50, "lon": -111.00}},
+    "Mexico Pacific": {"type": "waypoint", "coordinates": {"lat": 18.00, "lon": -105.00}},
+    "Central America Pacific": {"type": "waypoint", "coordinates": {"lat": 11.00, "lon": -90.00}},
+    "Gulf of Panama": {"type": "waypoint", "coordinates": {"lat": 8.00, "lon": -79.30}},
+    "Peru Offshore": {"type": "waypoint", "coordinates": {"lat": -12.00, "lon": -80.00}},
+    "Chile Offshore": {"type": "waypoint", "coordinates": {"lat": -35.00, "lon": -75.00}},
+
+    # Open-sea waypoints - Atlantic and Caribbean
+    "Caribbean Sea": {"type": "waypoint", "coordinates": {"lat": 14.00, "lon": -77.00}},
+    "Lesser Antilles": {"type": "waypoint", "coordinates": {"lat": 14.00, "lon": -60.00}},
+    "Gulf of Mexico": {"type": "waypoint", "coordinates": {"lat": 26.00, "lon": -90.00}},
+    "Houston Approach": {"type": "waypoint", "coordinates": {"lat": 28.90, "lon": -94.50}},
+    "Georgia Offshore": {"type": "waypoint", "coordinates": {"lat": 31.50, "lon": -79.50}},
+    "Cape Hatteras": {"type": "waypoint", "coordinates": {"lat": 34.50, "lon": -74.50}},
+    "New York Approach": {"type": "waypoint", "coordinates": {"lat": 40.30, "lon": -73.50}},
+    "Bahamas Offshore": {"type": "waypoint", "coordinates": {"lat": 24.00, "lon": -70.00}},
+    "Mid North Atlantic": {"type": "waypoint", "coordinates": {"lat": 45.00, "lon": -40.00}},
+    "Azores": {"type": "waypoint", "coordinates": {"lat": 37.00, "lon": -28.00}},
+    "Western Approaches": {"type": "waypoint", "coordinates": {"lat": 49.00, "lon": -6.50}},
+    "English Channel": {"type": "waypoint", "coordinates": {"lat": 50.20, "lon": -1.00}},
+    "North Sea South": {"type": "waypoint", "coordinates": {"lat": 52.50, "lon": 3.00}},
+    "German Bight": {"type": "waypoint", "coordinates": {"lat": 54.00, "lon": 7.80}},
+    "Cape Finisterre": {"type": "waypoint", "coordinates": {"lat": 43.50, "lon": -10.00}},
+    "Cape St Vincent": {"type": "waypoint", "coordinates": {"lat": 36.80, "lon": -9.50}},
+    "Canary Islands": {"type": "waypoint", "coordinates": {"lat": 28.50, "lon": -15.50}},
+    "Cape Verde": {"type": "waypoint", "coordinates": {"lat": 15.00, "lon": -19.50}},
+    "Sierra Leone Offshore": {"type": "waypoint", "coordinates": {"lat": 7.00, "lon": -15.00}},
+    "Cape Palmas Offshore": {"type": "waypoint", "coordinates": {"lat": 3.50, "lon": -9.00}},
+    "Gulf of Guinea": {"type": "waypoint", "coordinates": {"lat": 3.00, "lon": 3.00}},
+    "Angola Offshore": {"type": "waypoint", "coordinates": {"lat": -12.00, "lon": 10.00}},
+    "Namibia Offshore": {"type": "waypoint", "coordinates": {"lat": -25.00, "lon": 12.00}},
+    "Brazil Bulge": {"type": "waypoint", "coordinates": {"lat": -5.00, "lon": -33.50}},
+    "Guiana Offshore": {"type": "waypoint", "coordinates": {"lat": 8.00, "lon": -52.00}},
+    "Abrolhos": {"type": "waypoint", "coordinates": {"lat": -18.50, "lon": -37.00}},
+    "Cabo Frio": {"type": "waypoint", "coordinates": {"lat": -23.50, "lon": -41.50}},
+    "Rio de la Plata Offshore": {"type": "waypoint", "coordinates": {"lat": -37.00, "lon": -54.00}},
+
+    # Open-sea waypoints - Mediterranean, Red Sea and Indian Ocean
+    "Alboran Sea": {"type": "waypoint", "coordinates": {"lat": 36.20, "lon": -2.50}},
+    "Balearic Sea": {"type": "waypoint", "coordinates": {"lat": 38.50, "lon": 1.00}},
+    "Sardinia Channel": {"type": "waypoint", "coordinates": {"lat": 38.00, "lon": 9.50}},
+    "Ionian Sea": {"type": "waypoint", "coordinates": {"lat": 35.50, "lon": 18.00}},
+    "Aegean South": {"type": "waypoint", "coordinates": {"lat": 36.50, "lon": 24.50}},
+    "Eastern Med": {"type": "waypoint", "coordinates": {"lat": 33.50, "lon": 28.00}},
+    "Red Sea North": {"type": "waypoint", "coordinates": {"lat": 26.50, "lon": 35.00}},
+    "Red Sea Central": {"type": "waypoint", "coordinates": {"lat": 20.00, "lon": 38.80}},
+    "Gulf of Aden": {"type": "waypoint", "coordinates": {"lat": 12.50, "lon": 48.00}},
+    "Gulf of Oman": {"type": "waypoint", "coordinates": {"lat": 24.50, "lon": 58.50}},
+    "Arabian Sea": {"type": "waypoint", "coordinates": {"lat": 15.00, "lon": 62.00}},
+    "Laccadive Sea": {"type": "waypoint", "coordinates": {"lat": 8.00, "lon": 75.00}},
+    "Dondra Head": {"type": "waypoint", "coordinates": {"lat": 5.30, "lon": 80.60}},
+    "Bay of Bengal": {"type": "waypoint", "coordinates": {"lat": 9.00, "lon": 84.00}},
+    "Great Channel": {"type": "waypoint", "coordinates": {"lat": 6.20, "lon": 94.50}},
+    "Malacca Strait North": {"type": "waypoint", "coordinates": {"lat": 5.80, "lon": 98.00}},
+    "Malacca Strait South": {"type": "waypoint", "coordinates": {"lat": 1.75, "lon": 102.40}},
+    "Somali Basin": {"type": "waypoint", "coordinates": {"lat": 0.00, "lon": 52.00}},
+    "Mozambique Channel": {"type": "waypoint", "coordinates": {"lat": -20.00, "lon": 40.00}},
+    "East London Offshore": {"type": "waypoint", "coordinates": {"lat": -33.80, "lon": 28.50}},
+    "Agulhas": {"type": "waypoint", "coordinates": {"lat": -36.50, "lon": 24.00}},
+    "Indian Ocean Central": {"type": "waypoint", "coordinates": {"lat": -10.00, "lon": 85.00}},
+    "South Indian Ocean": {"type": "waypoint", "coordinates": {"lat": -36.00, "lon": 60.00}},
+}
+
+# Navigable lanes between sea nodes and canals (undirected)
+SEA_LANES = [
+    # East Asia
+    ("Yangtze Approach", "Yellow Sea"),
+    ("Yangtze Approach", "East China Sea"),
+    ("Yellow Sea", "Korea Strait"),
+    ("East China Sea", "Korea Strait"),
+    ("East China Sea", "Taiwan Strait"),
+    ("East China Sea", "Luzon Strait"),
+    ("East China Sea", "Osumi Strait"),
+    ("Korea Strait", "Osumi Strait"),
+    ("Osumi Strait", "Japan South"),
+    ("Japan South", "Tokyo Bay Approach"),
+    ("Tokyo Bay Approach", "North Pacific West"),
+    ("Japan South", "Philippine Sea"),
+    ("Taiwan Strait", "Pearl River Approach"),
+    ("Pearl River Approach", "Luzon Strait"),
+    ("Pearl River Approach", "South China Sea"),
+    ("Luzon Strait", "South China Sea"),
+    ("Luzon Strait", "Philippine Sea"),
+    ("Luzon Strait", "North Pacific West"),
+    ("South China Sea", "South China Sea South"),
+    ("South China Sea South", "Singapore Strait"),
+
+    # Southeast Asia and Australia
+    ("Singapore Strait", "Malacca Strait South"),
+    ("Malacca Strait South", "Strait of Malacca"),
+    ("Strait of Malacca", "Malacca Strait North"),
+    ("Malacca Strait North", "Great Channel"),
+    ("Singapore Strait", "Karimata Strait"),
+    ("Karimata Strait", "Java Sea"),
+    ("Java Sea", "Lombok Strait"),
+    ("Lombok Strait", "West Australia Offshore"),
+    ("Lombok Strait", "Indian Ocean Central"),
+    ("West Australia Offshore", "Cape Leeuwin"),
+    ("Cape Leeuwin", "Great Australian Bight"),
+    ("Great Australian Bight", "Bass Strait"),
+    ("Bass Strait", "Cape Howe"),
+    ("Cape Howe", "Coral Sea"),
+    ("Coral Sea", "Solomon Sea East"),
+    ("Solomon Sea East", "Caroline Islands"),
+    ("Caroline Islands", "Philippine Sea"),
+    ("Caroline Islands", "North Pacific West"),
+
+    # Pacific crossings and Americas west coast
+    ("North Pacific West", "North Pacific"),
+    ("North Pacific", "North Pacific East"),
+    ("North Pacific East", "Juan de Fuca"),
+    ("North Pacific East", "San Pedro Approach"),
+    ("Juan de Fuca", "San Pedro Approach"),
+    ("San Pedro Approach", "Baja West"),
+    ("Baja West", "Cabo San Lucas Offshore"),
+    ("Cabo San Lucas Offshore", "Mexico Pacific"),
+    ("Mexico Pacific", "Central America Pacific"),
+    ("Central America Pacific", "Gulf of Panama"),
+    ("Gulf of Panama", "Panama Canal"),
+    ("Gulf of Panama", "Peru Offshore"),
+    ("Peru Offshore", "Chile Offshore"),
+    ("Chile Offshore", "Cape Horn"),
+
+    # Caribbean, Gulf of Mexico and North America east coast
+    ("Panama Canal", "Caribbean Sea"),
+    ("Caribbean Sea", "Yucatan Channel"),
+    ("Caribbean Sea", "Windward Passage"),
+    ("Caribbean Sea", "Lesser Antilles"),
+    ("Yucatan Channel", "Gulf of Mexico"),
+    ("Yucatan Channel", "Straits of Florida"),
+    ("Gulf of Mexico", "Houston Approach"),
+    ("Gulf of Mexico", "Straits of Florida"),
+    ("Straits of Florida", "Georgia Offshore"),
+    ("Windward Passage", "Bahamas Offshore"),
+    ("Bahamas Offshore", "Cape Hatteras"),
+    ("Bahamas Offshore", "Azores"),
+    ("Georgia Offshore", "Cape Hatteras"),
+    ("Cape Hatteras", "New York Approach"),
+    ("Cape Hatteras", "Azores"),
+    ("New York Approach", "Mid North Atlantic"),
+    ("Lesser Antilles", "Guiana Offshore"),
+    ("Lesser Antilles", "Azores"),
+    ("Lesser Antilles", "Cape Verde"),
+
+    # North Atlantic and northern Europe
+    ("Mid North Atlantic", "Western Approaches"),
+    ("Mid North Atlantic", "Cape Finisterre"),
+    ("Azores", "Cape St Vincent"),
+    ("Azores", "Strait of Gibraltar"),
+    ("Azores", "Canary Islands"),
+    ("Western Approaches", "English Channel"),
+    ("Western Approaches", "Cape Finisterre"),
+    ("English Channel", "Dover Strait"),
+    ("Dover Strait", "North Sea South"),
+    ("North Sea South", "German Bight"),
+    ("Cape Finisterre", "Cape St Vincent"),
+    ("Cape St Vincent", "Strait of Gibraltar"),
+    ("Cape St Vincent", "Canary Islands"),
+
+    # Mediterranean and Suez
+    ("Strait of Gibraltar", "Alboran Sea"),
+    ("Alboran Sea", "Balearic Sea"),
+    ("Balearic Sea", "Sardinia Channel"),
+    ("Alboran Sea", "Sardinia Channel"),
+    ("Sardinia Channel", "Sicily Channel"),
+    ("Sicily Channel", "Ionian Sea"),
+    ("Ionian Sea", "Aegean South"),
+    ("Ionian Sea", "Eastern Med"),
+    ("Aegean South", "Eastern Med"),
+    ("Eastern Med", "Suez Canal"),
+    ("Suez Canal", "Red Sea North"),
+    ("Red Sea North", "Red Sea Central"),
+    ("Red Sea Central", "Bab-el-Mandeb"),
+    ("Bab-el-Mandeb", "Gulf of Aden"),
+
+    # West and southern Africa, South Atlantic
+    ("Canary Islands", "Cape Verde"),
+    ("Cape Verde", "Sierra Leone Offshore"),
+    ("Cape Verde", "Brazil Bulge"),
+    ("Sierra Leone Offshore", "Cape Palmas Offshore"),
+    ("Cape Palmas Offshore", "Gulf of Guinea"),
+    ("Gulf of Guinea", "Angola Offshore"),
+    ("Gulf of Guinea", "Brazil Bulge"),
+    ("Angola Offshore", "Namibia Offshore"),
+    ("Namibia Offshore", "Cape of Good Hope"),
+    ("Cape of Good Hope", "Agulhas"),
+    ("Cape of Good Hope", "Cabo Frio"),
+    ("Cape of Good Hope", "South Indian Ocean"),
+    ("Agulhas", "East London Offshore"),
+    ("Agulhas", "South Indian Ocean"),
+    ("East London Offshore", "Mozambique Channel"),
+    ("Guiana Offshore", "Brazil Bulge"),
+    ("Brazil Bulge", "Abrolhos"),
+    ("Abrolhos", "Cabo Frio"),
+    ("Cabo Frio", "Rio de la Plata Offshore"),
+    ("Rio de la Plata Offshore", "Cape Horn"),
+
+    # Indian Ocean, Arabian Sea and the Gulf
+    ("Mozambique Channel", "Somali Basin"),
+    ("Somali Basin", "Gulf of Aden"),
+    ("Somali Basin", "Arabian Sea"),
+    ("Somali Basin", "Indian Ocean Central"),
+    ("Gulf of Aden", "Arabian Sea"),
+    ("Gulf of Aden", "Laccadive Sea"),
+    ("Arabian Sea", "Gulf of Oman"),
+    ("Gulf of Oman", "Strait of Hormuz"),
+    ("Arabian Sea", "Laccadive Sea"),
+    ("Arabian Sea", "Dondra Head"),
+    ("Laccadive Sea", "Dondra Head"),
+    ("Dondra Head", "Bay of Bengal"),
+    ("Dondra Head", "Great Channel"),
+    ("Dondra Head", "Indian Ocean Central"),
+    ("Bay of Bengal", "Great Channel"),
+    ("Great Channel", "Indian Ocean Central"),
+    ("Indian Ocean Central", "Cape Leeuwin"),
+    ("Indian Ocean Central", "West Australia Offshore"),
+    ("South Indian Ocean", "Cape Leeuwin"),
+]
+
+# Sea nodes each port connects to. Ports not listed here are joined to
+# their nearest sea nodes automatically.
+PORT_ACCESS = {
+    "Shanghai": ["Yangtze Approach"],
+    "Singapore": ["Singapore Strait"],
+    "Shenzhen": ["Pearl River Approach"],
+    "Hong Kong": ["Pearl River Approach"],
+    "Busan": ["Korea Strait"],
+    "Guangzhou": ["Pearl River Approach"],
+    "Qingdao": ["Yellow Sea"],
+    "Tokyo": ["Tokyo Bay Approach"],
+    "Port Klang": ["Strait of Malacca"],
+    "Kaohsiung": ["Taiwan Strait", "Luzon Strait"],
+    "Rotterdam": ["North Sea South"],
+    "Antwerp": ["North Sea South"],
+    "Hamburg": ["German Bight"],
+    "Valencia": ["Balearic Sea"],
+    "Piraeus": ["Aegean South"],
+    "Le Havre": ["English Channel"],
+    "Felixstowe": ["North Sea South", "Dover Strait"],
+    "Dubai": ["Strait of Hormuz"],
+    "Jeddah": ["Red Sea Central"],
+    "Port Said": ["Eastern Med", "Suez Canal"],
+    "Los Angeles": ["San Pedro Approach"],
+    "Long Beach": ["San Pedro Approach"],
+    "New York": ["New York Approach"],
+    "Savannah": ["Georgia Offshore"],
+    "Houston": ["Houston Approach"],
+    "Santos": ["Cabo Frio"],
+    "Vancouver": ["Juan de Fuca"],
+    "Manzanillo": ["Mexico Pacific"],
+    "Durban": ["East London Offshore", "Mozambique Channel"],
+    "Lagos": ["Gulf of Guinea"],
+    "Tangier": ["Strait of Gibraltar"],
+    "Sydney": ["Cape Howe", "Coral Sea"],
+    "Melbourne": ["Bass Strait"],
+    "Mumbai": ["Arabian Sea", "Laccadive Sea"],
+    "Chennai": ["Bay of Bengal"],
+    "Colombo": ["Dondra Head"],
+    "Karachi": ["Arabian Sea", "Gulf of Oman"],
+}
+
+# Number of nearest sea nodes used for ports without a PORT_ACCESS entry
+AUTO_ACCESS_LINKS = 2
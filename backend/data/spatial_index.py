@@ -0,0 +1,180 @@
+"""
+Ball tree spatial index over port coordinates for nearest-port and
+within-radius queries.
+
+Coordinates are mapped to 3-D unit vectors so that straight-line (chord)
+distance is monotonic in great-circle distance; the tree prunes on chord
+distance and results are converted back to nautical miles.
+"""
+
+import heapq
+import math
+from typing import Dict, List, Optional
+import numpy as np
+
+from data.ports import MAJOR_PORTS, get_port_table_version
+from data.distance_matrix import EARTH_RADIUS_NM
+
+LEAF_SIZE = 16
+
+
+def to_unit_vectors(lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """Convert degree coordinates to (n, 3) unit vectors"""
+    lat = np.radians(lats)
+    lon = np.radians(lons)
+    return np.column_stack((np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)))
+
+
+def chord_to_nm(chord):
+    """Chord length on the unit sphere -> great-circle distance in nautical miles"""
+    return 2 * np.arcsin(np.clip(np.asarray(chord) / 2, 0.0, 1.0)) * EARTH_RADIUS_NM
+
+
+def nm_to_chord(distance_nm: float) -> float:
+    """Great-circle distance in nautical miles -> chord length on the unit sphere"""
+    angle = min(distance_nm / EARTH_RADIUS_NM, math.pi)
+    return 2 * math.sin(angle / 2)
+
+
+class PortSpatialIndex:
+    """
+    Static ball tree over MAJOR_PORTS, rebuilt when the port table changes.
+    Nodes are stored in flat lists; each node covers points[start:end].
+    """
+
+    def __init__(self):
+        self.names: List[str] = []
+        self.points = np.zeros((0, 3))
+        self._version = None
+        self.refresh()
+
+    def refresh(self, force: bool = False) -> bool:
+        """Rebuild the tree if the port table changed. Returns True if rebuilt."""
+        version = get_port_table_version()
+        if not force and version == self._version:
+            return False
+
+        names = list(MAJOR_PORTS.keys())
+        lats = np.array([MAJOR_PORTS[n]["coordinates"]["lat"] for n in names], dtype=float)
+        lons = np.array([MAJOR_PORTS[n]["coordinates"]["lon"] for n in names], dtype=float)
+        vectors = to_unit_vectors(lats, lons) if names else np.zeros((0, 3))
+
+        self._order = np.arange(len(names))
+        self._centers: List[np.ndarray] = []
+        self._radii: List[float] = []
+        self._bounds: List[tuple] = []
+        self._children: List[Optional[tuple]] = []
+        if names:
+            self._build(vectors, 0, len(names))
+
+        # Points stored in tree order so every node is a contiguous slice
+        self.names = [names[i] for i in self._order]
+        self.points = vectors[self._order]
+        self._version = version
+        return True
+
+    def _build(self, vectors: np.ndarray, start: int, end: int) -> int:
+        node = len(self._centers)
+        members = vectors[self._order[start:end]]
+        center = members.mean(axis=0)
+        radius = float(np.sqrt(((members - center) ** 2).sum(axis=1)).max())
+
+        self._centers.append(center)
+        self._radii.append(radius)
+        self._bounds.append((start, end))
+        self._children.append(None)
+
+        if end - start > LEAF_SIZE:
+            # Split at the median of the widest dimension
+            axis = int(np.argmax(members.max(axis=0) - members.min(axis=0)))
+            ranked = np.argsort(members[:, axis], kind="stable")
+            self._order[start:end] = self._order[start:end][ranked]
+            mid = (start + end) // 2
+            left = self._build(vectors, start, mid)
+            right = self._build(vectors, mid, end)
+            self._children[node] = (left, right)
+
+        return node
+
+    def _lower_bound(self, node: int, query: np.ndarray) -> float:
+        gap = float(np.sqrt(((query - self._centers[node]) ** 2).sum())) - self._radii[node]
+        return max(gap, 0.0)
+
+    def _record(self, i: int, chord: float) -> Dict:
+        name = self.names[i]
+        info = MAJOR_PORTS[name]
+        return {
+            "name": name,
+            "country": info["country"],
+            "coordinates": dict(info["coordinates"]),
+            "distance_nm": round(float(chord_to_nm(chord)), 2)
+        }
+
+    def nearest(self, lat: float, lon: float, k: int = 5,
+                exclude: Optional[List[str]] = None) -> List[Dict]:
+        """K nearest ports to a coordinate, closest first"""
+        self.refresh()
+        if not self.names or k <= 0:
+            return []
+
+        excluded = set(exclude or [])
+        query = to_unit_vectors(np.array([lat]), np.array([lon]))[0]
+
+        best: List[tuple] = []  # max-heap of (-chord, index)
+        frontier = [(self._lower_bound(0, query), 0)]
+        while frontier:
+            bound, node = heapq.heappop(frontier)
+            if len(best) == k and bound >= -best[0][0]:
+                break
+
+            children = self._children[node]
+            if children:
+                for child in children:
+                    heapq.heappush(frontier, (self._lower_bound(child, query), child))
+                continue
+
+            start, end = self._bounds[node]
+            chords = np.sqrt(((self.points[start:end] - query) ** 2).sum(axis=1))
+            for offset in np.argsort(chords):
+                i = start + int(offset)
+                if self.names[i] in excluded:
+                    continue
+                chord = float(chords[offset])
+                if len(best) < k:
+                    heapq.heappush(best, (-chord, i))
+                elif chord < -best[0][0]:
+                    heapq.heapreplace(best, (-chord, i))
+                else:
+                    break
+
+        return [self._record(i, -neg) for neg, i in sorted(best, reverse=True)]
+
+    def within(self, lat: float, lon: float, radius_nm: float,
+               limit: Optional[int] = None) -> List[Dict]:
+        """All ports within radius_nm of a coordinate, closest first"""
+        self.refresh()
+        if not self.names or radius_nm < 0:
+            return []
+
+        query = to_unit_vectors(np.array([lat]), np.array([lon]))[0]
+        max_chord = nm_to_chord(radius_nm)
+
+        hits = []
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            if self._lower_bound(node, query) > max_chord:
+                continue
+            children = self._children[node]
+            if children:
+                stack.extend(children)
+                continue
+            start, end = self._bounds[node]
+            chords = np.sqrt(((self.points[start:end] - query) ** 2).sum(axis=1))
+            for offset in np.nonzero(chords <= max_chord)[0]:
+                hits.append((float(chords[offset]), start + int(offset)))
+
+        hits.sort()
+        if limit is not None:
+            hits = hits[:limit]
+        return [self._record(i, chord) for chord, i in hits]
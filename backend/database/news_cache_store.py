@@ -0,0 +1,148 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class NewsCacheStore:
+    """
+    SQLite store for fetched news articles, per-country political risk
+    results and incremental ingestion cursors, so a restarted server starts
+    warm instead of hitting the news APIs for every country.
+    
+    Rows carry their fetch/compute time (Unix seconds) and are read back one
+    key at a time on demand. Methods are blocking; async callers should run
+    them with asyncio.to_thread.
+    """
+    
+    def __init__(self, path: Optional[str] = None):
+        default_path = os.path.join(os.path.dirname(__file__), "..", "cache_data", "news_cache.sqlite3")
+        self.path = path or os.getenv("NEWS_CACHE_DB", default_path)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+    
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            if not os.path.exists(directory):
+                os.makedirs(directory)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS news_articles ("
+                " cache_key TEXT PRIMARY KEY,"
+                " articles TEXT NOT NULL,"
+                " fetched_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS country_risks ("
+                " country TEXT PRIMARY KEY,"
+                " risks TEXT NOT NULL,"
+                " computed_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS ingest_cursors ("
+                " provider TEXT NOT NULL,"
+                " country TEXT NOT NULL,"
+                " cursor TEXT NOT NULL,"
+                " updated_at REAL NOT NULL,"
+                " PRIMARY KEY (provider, country))"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+    
+    @staticmethod
+    def encode_key(key: tuple) -> str:
+        """Stable text form of a news cache key"""
+        return json.dumps(key, separators=(",", ":"), default=str)
+    
+    def get_articles(self, key: tuple) -> Optional[Tuple[List[Dict[str, Any]], float]]:
+        """(articles, age in seconds) for a cache key, or None"""
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT articles, fetched_at FROM news_articles WHERE cache_key = ?",
+                (self.encode_key(key),)
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), max(time.time() - row[1], 0.0)
+    
+    def put_articles(self, key: tuple, articles: List[Dict[str, Any]]):
+        """Insert or replace the articles for a cache key, stamped now"""
+        payload = json.dumps(articles, default=str)
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO news_articles (cache_key, articles, fetched_at) VALUES (?, ?, ?)",
+                (self.encode_key(key), payload, time.time())
+            )
+            conn.commit()
+    
+    def get_country_risks(self, country: str) -> Optional[Tuple[List[Dict[str, Any]], float]]:
+        """(serialized PoliticalRisk list, age in seconds) for a country, or None"""
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT risks, computed_at FROM country_risks WHERE country = ?",
+                (country,)
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), max(time.time() - row[1], 0.0)
+    
+    def put_country_risks(self, country: str, risks: List[Dict[str, Any]]):
+        """Insert or replace the analyzed risks for a country, stamped now"""
+        payload = json.dumps(risks, default=str)
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO country_risks (country, risks, computed_at) VALUES (?, ?, ?)",
+                (country, payload, time.time())
+            )
+            conn.commit()
+    
+    def get_cursor(self, provider: str, country: str) -> Optional[Dict[str, Any]]:
+        """Incremental ingestion high-water mark for a provider and country, or None"""
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT cursor FROM ingest_cursors WHERE provider = ? AND country = ?",
+                (provider, country)
+            ).fetchone()
+        return json.loads(row[0]) if row is not None else None
+    
+    def put_cursor(self, provider: str, country: str, cursor: Dict[str, Any]):
+        """Insert or replace the high-water mark for a provider and country"""
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO ingest_cursors (provider, country, cursor, updated_at) VALUES (?, ?, ?, ?)",
+                (provider, country, json.dumps(cursor), time.time())
+            )
+            conn.commit()
+    
+    def purge(self, max_age: float) -> int:
+        """Delete rows older than max_age seconds. Returns the number removed."""
+        cutoff = time.time() - max_age
+        with self._lock:
+            conn = self._connection()
+            removed = conn.execute("DELETE FROM news_articles WHERE fetched_at < ?", (cutoff,)).rowcount
+            removed += conn.execute("DELETE FROM country_risks WHERE computed_at < ?", (cutoff,)).rowcount
+            conn.commit()
+        return removed
+    
+    def stats(self) -> Dict[str, Any]:
+        """Row counts per table"""
+        with self._lock:
+            conn = self._connection()
+            articles = conn.execute("SELECT COUNT(*) FROM news_articles").fetchone()[0]
+            risks = conn.execute("SELECT COUNT(*) FROM country_risks").fetchone()[0]
+        return {"path": self.path, "news_entries": articles, "country_risk_entries": risks}
+    
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
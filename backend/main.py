@@ -1,22 +1,32 @@
-from fastapi import FastAPI, HTTPException, UploadFile, File
+from fastapi import FastAPI, HTTPException, UploadFile, File, Request, Depends, Header
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
-# from sse_starlette.sse import EventSourceResponse  # Temporarily disabled
+from fastapi.responses import FileResponse, StreamingResponse
+from sse_starlette.sse import EventSourceResponse
 from dotenv import load_dotenv
 import uvicorn
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import asyncio
 import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 import uuid
 
 from agents.assistant_agent import AssistantAgent
 from agents.chatbot_manager import ChatbotManager
-from agents.scheduler_agent import SchedulerAgent
-from agents.political_risk_agent import PoliticalRiskAgent
+from agents.scheduler_agent import SchedulerAgent, TooManyUploads
+from agents.shipment_datasets import DatasetTooLarge
+from agents.shipment_upload import UploadTooLarge
+from agents.political_risk_agent import PoliticalRiskAgent, article_columns, article_error, score_articles_in_worker
 from agents.reporting_agent import ReportingAgent
-from agents.route_planner_agent import RoutePlannerAgent
+from agents.route_planner_agent import (
+    RoutePlannerAgent, optimize_order_in_worker, plan_route_in_worker, plan_pareto_in_worker,
+    simulate_route_in_worker
+)
 from database.mongodb import MongoDBClient
+from utils.snapshot_broadcaster import SnapshotBroadcaster
 from models.schemas import QueryRequest, RiskReport, PoliticalRisk, ScheduleRisk, Session, SessionCreate, SessionUpdate
 
 load_dotenv()  # load variables from backend/.env if present
@@ -46,49 +56,138 @@ route_planner_agent = RoutePlannerAgent()
 db_client = MongoDBClient()
 
 latest_world_data: Dict[str, Any] = {"world_risk_data": {}, "political_risks": [], "schedule_risks": []}
-_subscribers: set = set()
+# World risk is recomputed by one background task and fanned out to every
+# dashboard stream as deltas; refresh timestamps alone do not count as changes
+world_snapshot = SnapshotBroadcaster(
+    list_keys={
+        "political_risks": lambda r: f"{r['country']}|{r['risk_type']}|{r['source_url']}|{r['source_title']}",
+        "schedule_risks": lambda r: r["equipment_id"],
+    },
+    ignore_fields=("last_updated", "publication_date"),
+    queue_size=int(os.getenv("WORLD_STREAM_QUEUE_SIZE", "16"))
+)
+WORLD_REFRESH_INTERVAL = float(os.getenv("WORLD_REFRESH_INTERVAL", "60"))  # seconds, 0 disables
 _poll_task = None
 
+# Process pool for CPU-bound batch route planning, created on first use
+_route_pool: ProcessPoolExecutor | None = None
+ROUTE_BATCH_MAX_ITINERARIES = 1000
+
+def _get_route_pool() -> ProcessPoolExecutor:
+    global _route_pool
+    if _route_pool is None:
+        workers = int(os.getenv("ROUTE_PLANNER_WORKERS", "0")) or os.cpu_count() or 2
+        _route_pool = ProcessPoolExecutor(max_workers=workers)
+    return _route_pool
+
+# Process pool for CPU-bound batch article scoring, created on first use
+_scoring_pool: ProcessPoolExecutor | None = None
+SCORING_WORKERS = int(os.getenv("POLITICAL_SCORING_WORKERS", "0")) or os.cpu_count() or 2
+SCORE_BATCH_DEFAULT_CHUNK = 2000
+# Largest request body accepted by /api/political/score-batch (bytes), and
+# chunks a request may have queued in the pool before reading pauses
+SCORE_BATCH_MAX_BYTES = int(os.getenv("POLITICAL_SCORE_BATCH_MAX_BYTES", str(256 << 20)))
+SCORE_BATCH_MAX_IN_FLIGHT = 2 * SCORING_WORKERS
+
+def _get_scoring_pool() -> ProcessPoolExecutor:
+    global _scoring_pool
+    if _scoring_pool is None:
+        _scoring_pool = ProcessPoolExecutor(max_workers=SCORING_WORKERS)
+    return _scoring_pool
+
+# Inputs of the last published refresh: (default store, its version, political risks)
+_world_inputs: Optional[tuple] = None
+_world_refreshed_at = 0.0
+_world_refresh_lock = asyncio.Lock()
+
+def _build_world_sections(political_risks, store) -> Dict[str, Any]:
+    # Straight from the store's risk columns: no ScheduleRisk model per item
+    world_risk_data = reporting_agent._create_world_risk_data(political_risks)
+    for country, (risk_level, risk_factors) in store.risks_by_country().items():
+        reporting_agent._add_schedule_world_risk(world_risk_data, country, risk_level, risk_factors)
+    return {
+        "world_risk_data": world_risk_data,
+        "political_risks": [r.model_dump() for r in political_risks],
+        "schedule_risks": store.risk_records()
+    }
+
+async def _refresh_world_data(force: bool = False):
+    """
+    Recompute world risk and publish it to the snapshot. Skipped while no
+    dashboard stream is connected (unless forced), and when neither the
+    shipment data nor the analyzed political risks changed since last time.
+    """
+    global latest_world_data, _world_inputs, _world_refreshed_at
+    if not force and not world_snapshot.subscriber_count and world_snapshot.version:
+        return
+    async with _world_refresh_lock:
+        store = await asyncio.to_thread(scheduler_agent.datasets.get)
+        countries = await scheduler_agent.extract_countries()
+        political_risks = await political_risk_agent.analyze_risks(countries)
+        _world_refreshed_at = time.monotonic()
+        # Cached risks are the same objects until re-analyzed, and stores bump version on every write
+        if (_world_inputs is not None and _world_inputs[0] is store and _world_inputs[1] == store.version
+                and len(_world_inputs[2]) == len(political_risks)
+                and all(a is b for a, b in zip(_world_inputs[2], political_risks))):
+            return
+        # Dumping and diffing every item is CPU work; keep it off the event loop
+        sections = await asyncio.to_thread(
+            scheduler_agent.datasets.read, None, lambda store: _build_world_sections(political_risks, store)
+        )
+        prepared = await asyncio.to_thread(world_snapshot.prepare, sections)
+        latest_world_data = {**sections, "timestamp": datetime.utcnow().isoformat()}
+        # Subscribers receive only what changed since the previous version
+        world_snapshot.commit(prepared)
+        _world_inputs = (store, store.version, political_risks)
+
 async def _poll_world_data():
-    global latest_world_data
     while True:
+        started = time.perf_counter()
         try:
-            countries = await scheduler_agent.extract_countries()
-            political_risks = await political_risk_agent.analyze_risks(countries)
-            schedule_risks = await scheduler_agent.analyze_schedule_risks()
-            # combine
-            world_risk_data = reporting_agent._create_combined_world_risk_data(political_risks, schedule_risks)
-            latest_world_data = {
-                "world_risk_data": world_risk_data,
-                "political_risks": [r.dict() for r in political_risks],
-                "schedule_risks": [r.dict() for r in schedule_risks],
-                "timestamp": datetime.utcnow().isoformat()
-            }
-            # notify subscribers (they pull via SSE generator)
+            await _refresh_world_data()
         except Exception as e:
             print("Polling error:", e)
-        await asyncio.sleep(60)  # poll every minute
+        # Fixed schedule: a slow refresh shortens the following wait
+        await asyncio.sleep(max(WORLD_REFRESH_INTERVAL - (time.perf_counter() - started), 1.0))
 
 @app.on_event("startup")
 async def startup_event():
     await db_client.connect()
-    # global _poll_task
-    # _poll_task = asyncio.create_task(_poll_world_data())  # Disabled for now
+    await political_risk_agent.connect()
+    global _poll_task
+    if WORLD_REFRESH_INTERVAL > 0:
+        _poll_task = asyncio.create_task(_poll_world_data())
 
 @app.on_event("shutdown")
 async def shutdown_event():
     await db_client.disconnect()
-    # global _poll_task
-    # if _poll_task:
-    #     _poll_task.cancel()
+    await political_risk_agent.disconnect()
+    global _route_pool, _scoring_pool
+    if _route_pool is not None:
+        _route_pool.shutdown(wait=False, cancel_futures=True)
+        _route_pool = None
+    if _scoring_pool is not None:
+        _scoring_pool.shutdown(wait=False, cancel_futures=True)
+        _scoring_pool = None
+    global _poll_task
+    if _poll_task:
+        _poll_task.cancel()
+        _poll_task = None
 
 @app.get("/")
 async def root():
     return {"message": "SentriX API is running"}
 
+def shipment_session(session_id: Optional[str] = None, x_session_id: Optional[str] = Header(None)) -> Optional[str]:
+    """
+    Shipment dataset a request works on: ?session_id= or the X-Session-Id
+    header. Without either, requests share the default dataset.
+    """
+    return session_id or x_session_id
+
 @app.post("/api/shipment/upload")
-async def upload_shipment_data(payload: Dict[str, Any]):
-    """Accept shipment/equipment JSON array and load into SchedulerAgent."""
+async def upload_shipment_data(payload: Dict[str, Any], session: Optional[str] = Depends(shipment_session)):
+    """Accept shipment/equipment JSON array and load it as the session's dataset."""
     try:
         data = payload.get("data") if isinstance(payload, dict) else None
         if data is None:
@@ -97,21 +196,149 @@ async def upload_shipment_data(payload: Dict[str, Any]):
                 data = payload
         if not isinstance(data, list):
             raise HTTPException(status_code=400, detail="Body must contain a 'data' array or be an array itself")
-        scheduler_agent.set_shipment_data(data)
+        # Indexing and saving the dataset block; keep them off the event loop
+        await asyncio.to_thread(scheduler_agent.set_shipment_data, data, session)
         return {"status": "ok", "items": len(data)}
     except HTTPException:
         raise
+    except DatasetTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/shipment/upsert")
+async def upsert_shipments(payload: Dict[str, Any], session: Optional[str] = Depends(shipment_session)):
+    """
+    Insert or update shipment items by equipment_id: {"data": [...]}.
+    Existing items only change the fields given, e.g.
+    {"equipment_id": "EQ001", "status": "delayed", "current_delivery_date": "2024-03-10"}.
+    Schedule risks are recomputed for the changed items only.
+    """
+    try:
+        return await asyncio.to_thread(scheduler_agent.upsert_shipments, payload.get("data"), session)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except DatasetTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+SHIPMENT_QUERY_MAX_LIMIT = 1000
+
+def _validate_page(offset: int, limit: int):
+    if offset < 0 or not 1 <= limit <= SHIPMENT_QUERY_MAX_LIMIT:
+        raise HTTPException(status_code=400, detail=f"offset must be >= 0 and limit between 1 and {SHIPMENT_QUERY_MAX_LIMIT}")
+
+@app.get("/api/shipment/query")
+async def query_shipments(country: Optional[str] = None, supplier: Optional[str] = None,
+                          status: Optional[str] = None, min_risk_level: Optional[int] = None,
+                          max_risk_level: Optional[int] = None, min_delay_days: Optional[int] = None,
+                          max_delay_days: Optional[int] = None, offset: int = 0, limit: int = 50,
+                          session: Optional[str] = Depends(shipment_session)):
+    """
+    Paginated equipment lookup through the scheduler's secondary indexes
+    (hash: country, supplier, status; sorted: risk level, delay days).
+    Items are in dataset order: {total, offset, limit, items}.
+    """
+    _validate_page(offset, limit)
+    return await asyncio.to_thread(
+        scheduler_agent.query_equipment, country, supplier, status, min_risk_level, max_risk_level,
+        min_delay_days, max_delay_days, offset, limit, session
+    )
+
+@app.get("/api/shipment/most-delayed")
+async def most_delayed_shipments(limit: int = 10, offset: int = 0, session: Optional[str] = Depends(shipment_session)):
+    """Top N most delayed equipment items, longest delay first"""
+    _validate_page(offset, limit)
+    return await asyncio.to_thread(scheduler_agent.most_delayed_equipment, limit, offset, session)
+
+@app.post("/api/shipment/delete")
+async def delete_shipments(payload: Dict[str, Any], session: Optional[str] = Depends(shipment_session)):
+    """Remove shipment items: {"equipment_ids": [...]}"""
+    try:
+        return await asyncio.to_thread(scheduler_agent.delete_shipments, payload.get("equipment_ids"), session)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+# Raw body bytes buffered before each parse step, and the decompressed size limit
+SHIPMENT_UPLOAD_FEED_BYTES = 1 << 20
+SHIPMENT_UPLOAD_MAX_BYTES = int(os.getenv("SHIPMENT_UPLOAD_MAX_BYTES", str(2 << 30)))
+
+@app.post("/api/shipment/upload/stream")
+async def upload_shipment_stream(request: Request, format: str = "", mode: str = "replace", upload_id: str = "",
+                                 session: Optional[str] = Depends(shipment_session)):
+    """
+    Stream a shipment file into the session's dataset without holding it in memory.
+    
+    The raw request body is NDJSON (one item per line) or CSV with a header
+    row, optionally gzip/deflate compressed (Content-Encoding header, or gzip
+    detected from its magic bytes). Format comes from `format`, else the
+    Content-Type, else the first character. Rows are parsed and validated
+    chunk by chunk as the body arrives; invalid rows are skipped and reported
+    with their line numbers.
+    
+    mode: "replace" swaps in the uploaded items once the body is complete,
+    "append" adds them to the current items. Uploads larger than the
+    session's memory budget stop with 413, and with 429 while too many
+    uploads are in progress.
+    upload_id: optional client-chosen id, so progress can be polled at
+    GET /api/shipment/upload/{upload_id} (same session) while the body is
+    still uploading.
+    """
+    content_type = request.headers.get("content-type", "")
+    fmt = format or ("csv" if "csv" in content_type else "ndjson" if "ndjson" in content_type or "jsonl" in content_type else None)
+    compression = request.headers.get("content-encoding") or None
+    try:
+        upload_id, parser = scheduler_agent.begin_upload(
+            upload_id or None, mode, fmt, compression, SHIPMENT_UPLOAD_MAX_BYTES, session
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except TooManyUploads as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    
+    # Parsing runs off the event loop; reading pauses while a step is parsed
+    pending = bytearray()
+    try:
+        async for chunk in request.stream():
+            pending += chunk
+            if len(pending) >= SHIPMENT_UPLOAD_FEED_BYTES:
+                await asyncio.to_thread(parser.feed, bytes(pending))
+                pending.clear()
+        await asyncio.to_thread(parser.feed, bytes(pending))
+        await asyncio.to_thread(parser.finish)
+    except UploadTooLarge as e:
+        await scheduler_agent.finish_upload(upload_id, str(e), session)
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        status = await scheduler_agent.finish_upload(upload_id, str(e), session)
+        raise HTTPException(status_code=400, detail=status)
+    except BaseException as e:
+        # Client gone, request cancelled or a parser bug: drop the parsed rows all the same
+        await scheduler_agent.finish_upload(upload_id, f"Upload aborted: {str(e) or type(e).__name__}", session)
+        raise
+    
+    status = await scheduler_agent.finish_upload(upload_id, session_id=session)
+    if status["status"] == "failed":
+        raise HTTPException(status_code=400, detail=status)
+    return status
+
+@app.get("/api/shipment/upload/{upload_id}")
+async def shipment_upload_status(upload_id: str, session: Optional[str] = Depends(shipment_session)):
+    """Progress of one of the session's streamed uploads (bytes, lines, accepted/rejected rows)"""
+    status = scheduler_agent.upload_status(upload_id, session)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    return status
+
 @app.post("/api/report/combined")
-async def generate_combined_report():
+async def generate_combined_report(session: Optional[str] = Depends(shipment_session)):
     """Generate a combined report from current political + schedule risks."""
     try:
         session_id = str(uuid.uuid4())
-        countries = await scheduler_agent.extract_countries()
+        countries = await scheduler_agent.extract_countries(session)
         political_risks = await political_risk_agent.analyze_risks(countries)
-        schedule_risks = await scheduler_agent.analyze_schedule_risks()
+        schedule_risks = await scheduler_agent.analyze_schedule_risks(session)
         report = await reporting_agent.generate_combined_report(political_risks, schedule_risks, session_id)
         await db_client.store_report(report)
         return {"session_id": session_id, "report": report, "type": "report"}
@@ -119,10 +346,15 @@ async def generate_combined_report():
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/shipment/reset")
-async def reset_shipment_data():
-    scheduler_agent.clear_custom_data()
+async def reset_shipment_data(session: Optional[str] = Depends(shipment_session)):
+    await asyncio.to_thread(scheduler_agent.clear_custom_data, session)
     return {"status": "ok"}
 
+@app.get("/api/shipment/datasets/stats")
+async def shipment_dataset_stats():
+    """Resident session datasets, memory use against the budgets, loads/saves and evictions"""
+    return scheduler_agent.datasets.stats()
+
 @app.post("/api/query")
 async def process_query(request: QueryRequest):
     """Process natural language queries and route to appropriate agents"""
@@ -140,9 +372,9 @@ async def process_query(request: QueryRequest):
         report = None
         
         if intent == "combined":
-            countries = await scheduler_agent.extract_countries()
+            countries = await scheduler_agent.extract_countries(request.session_id)
             political_risks = await political_risk_agent.analyze_risks(countries)
-            schedule_risks = await scheduler_agent.analyze_schedule_risks()
+            schedule_risks = await scheduler_agent.analyze_schedule_risks(request.session_id)
             report = await reporting_agent.generate_combined_report(political_risks, schedule_risks, session_id)
             
             # Generate summary message
@@ -155,7 +387,7 @@ async def process_query(request: QueryRequest):
                 message += f"🚨 {high_sch_risk} routes face severe delays. "
             message += f"The full combined report includes risk assessments, mitigation strategies, and actionable recommendations."
         elif intent == "political":
-            countries = await scheduler_agent.extract_countries()
+            countries = await scheduler_agent.extract_countries(request.session_id)
             political_risks = await political_risk_agent.analyze_risks(countries)
             report = await reporting_agent.generate_political_report(political_risks, session_id)
             
@@ -188,7 +420,7 @@ async def process_query(request: QueryRequest):
             message += f"📋 A comprehensive report with detailed analysis and mitigation strategies has been generated."
             
         elif intent == "schedule":
-            schedule_risks = await scheduler_agent.analyze_schedule_risks()
+            schedule_risks = await scheduler_agent.analyze_schedule_risks(request.session_id)
             report = await reporting_agent.generate_schedule_report(schedule_risks, session_id)
             
             # Generate detailed message with route information
@@ -267,6 +499,157 @@ async def process_query(request: QueryRequest):
         traceback.print_exc()  # Print full traceback
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/political/score-batch")
+async def score_article_batch(request: Request, country: str = "", chunk_size: int = SCORE_BATCH_DEFAULT_CHUNK):
+    """
+    Score a stream of news articles with the political risk rules in a process pool.
+    
+    The request body is NDJSON, one provider-shaped article per line
+    ({"title", "content" | "description", "pubDate", "link", "country"}); the
+    `country` query parameter is used for articles without one. Lines are
+    parsed as they arrive and each chunk of `chunk_size` articles is sent to the
+    pool as columns while the rest of the body is still uploading.
+    
+    Response is NDJSON in input order: {"type": "result", "line", "risk"} per
+    article (risk is a PoliticalRisk or null), {"type": "error", "line", "error"}
+    for unparseable lines, then a final {"type": "summary", ...} line.
+    Bodies over SCORE_BATCH_MAX_BYTES are rejected with 413.
+    """
+    too_large = HTTPException(status_code=413, detail=f"Body exceeds {SCORE_BATCH_MAX_BYTES} bytes")
+    if int(request.headers.get("content-length") or 0) > SCORE_BATCH_MAX_BYTES:
+        raise too_large
+    chunk_size = min(max(chunk_size, 100), 20000)
+    loop = asyncio.get_running_loop()
+    pool = _get_scoring_pool()
+    started = time.perf_counter()
+    # Ready error lines (str) and submitted chunks (line numbers, future), in input order
+    outputs = deque()
+    batch, batch_lines = [], []
+    totals = {"articles": 0, "with_risk": 0, "rejected": 0}
+    in_flight = set()
+    
+    def submit():
+        future = loop.run_in_executor(pool, score_articles_in_worker, article_columns(batch, country))
+        in_flight.add(future)
+        future.add_done_callback(in_flight.discard)
+        outputs.append((batch_lines[:], future))
+        batch.clear()
+        batch_lines.clear()
+    
+    def parse(line_number: int, raw: bytes):
+        if not raw.strip():
+            return
+        try:
+            article = json.loads(raw)
+            error = article_error(article)
+            if error:
+                raise ValueError(error)
+        except ValueError as e:
+            totals["rejected"] += 1
+            if batch:
+                submit()
+            outputs.append(json.dumps({"type": "error", "line": line_number, "error": str(e)}) + "\n")
+            return
+        batch.append(article)
+        batch_lines.append(line_number)
+        if len(batch) >= chunk_size:
+            submit()
+    
+    # The body is consumed before responding: Starlette's streaming response
+    # listens on the same receive channel, so it cannot be read while streaming
+    line_number = 0
+    received = 0
+    # Bytes after the last newline, kept in pieces so a long line is joined once
+    pending: List[bytes] = []
+    try:
+        async for chunk in request.stream():
+            received += len(chunk)
+            if received > SCORE_BATCH_MAX_BYTES:
+                raise too_large
+            end = chunk.rfind(b"\n") + 1
+            if not end:
+                pending.append(chunk)
+                continue
+            pending.append(chunk[:end])
+            lines = b"".join(pending).split(b"\n")
+            pending = [chunk[end:]] if end < len(chunk) else []
+            for raw in lines[:-1]:
+                line_number += 1
+                parse(line_number, raw)
+            # Reading pauses while the pool is behind, so a fast client cannot queue the whole body
+            while len(in_flight) >= SCORE_BATCH_MAX_IN_FLIGHT:
+                await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+        if pending:
+            parse(line_number + 1, b"".join(pending))
+        if batch:
+            submit()
+    except BaseException:
+        for future in in_flight:
+            future.cancel()
+        raise
+    
+    async def stream_scores():
+        try:
+            while outputs:
+                item = outputs.popleft()
+                if isinstance(item, str):
+                    yield item
+                    continue
+                line_numbers, future = item
+                try:
+                    risks = await future
+                except Exception as e:
+                    # A chunk that cannot be scored fails its own lines, not the stream
+                    totals["rejected"] += len(line_numbers)
+                    yield "".join(
+                        json.dumps({"type": "error", "line": number, "error": f"scoring failed: {e}"}) + "\n"
+                        for number in line_numbers
+                    )
+                    continue
+                lines = []
+                for number, risk in zip(line_numbers, risks):
+                    totals["articles"] += 1
+                    totals["with_risk"] += risk is not None
+                    lines.append(json.dumps({"type": "result", "line": number, "risk": risk}))
+                yield "\n".join(lines) + "\n"
+            
+            yield json.dumps({
+                "type": "summary",
+                **totals,
+                "elapsed_ms": round((time.perf_counter() - started) * 1000, 2)
+            }) + "\n"
+        finally:
+            # Client went away or we finished: drop chunks still queued
+            for item in outputs:
+                if not isinstance(item, str):
+                    item[1].cancel()
+    
+    return StreamingResponse(stream_scores(), media_type="application/x-ndjson")
+
+@app.post("/api/political/ingest")
+async def ingest_political_news(countries: str = ""):
+    """
+    Incrementally ingest news: fetch only articles newer than each provider's
+    per-country cursor and fold their risks into the stored country results.
+    countries: optional comma-separated list (defaults to the shipment countries)
+    """
+    try:
+        selected = [c.strip() for c in countries.split(",") if c.strip()] or await scheduler_agent.extract_countries()
+        results = await political_risk_agent.ingest(selected)
+        return {"countries": results, "cursors": political_risk_agent.ingest_cursors()}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/political/provider-status")
+async def political_provider_status():
+    """Circuit breaker and rate limit state for each news provider"""
+    return political_risk_agent.provider_status()
+
+@app.get("/api/political/cache-stats")
+async def political_cache_stats():
+    """News cache size and hit/miss/refresh counters for the political risk agent"""
+    return political_risk_agent.cache_stats()
+
 @app.get("/api/reports")
 async def get_reports():
     """Get all stored reports"""
@@ -315,10 +698,42 @@ async def download_report(report_id: str):
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
 
-# @app.get("/api/stream/dashboard")
-# async def stream_dashboard():
-#     # Temporarily disabled - requires sse_starlette
-#     pass
+@app.get("/api/stream/dashboard")
+async def stream_dashboard(request: Request):
+    """
+    Server-sent events for live dashboards, fed by the background refresher.
+    
+    The first event is "snapshot" ({version, updated_at, data}) with the full
+    world risk data, political risks and schedule risks; after that "delta"
+    events ({version, base_version, sections: {name: {upsert, remove}}}) carry
+    only changed items: world_risk_data by country, political risks by
+    "country|risk_type|source_url|source_title" (repeats of one key get "#2",
+    "#3", ... in order), schedule risks by equipment_id. Event ids are versions, so a reconnecting client that sends
+    Last-Event-ID for the current version skips the snapshot. A client that
+    falls behind gets a fresh "snapshot" instead of the missed deltas.
+    """
+    last_event_id = request.headers.get("last-event-id", "")
+    last_version = int(last_event_id) if last_event_id.isdigit() else None
+    
+    async def events():
+        async for event, version, data in world_snapshot.subscribe(last_version):
+            yield {"event": event, "id": str(version), "data": data}
+    
+    return EventSourceResponse(events(), ping=15)
+
+@app.get("/api/dashboard/live")
+async def live_dashboard_data():
+    """Latest world risk snapshot from the background refresher (the stream's initial state)"""
+    # With no stream connected the refresher idles; catch up here if the snapshot is due
+    if (WORLD_REFRESH_INTERVAL > 0 and not world_snapshot.subscriber_count
+            and time.monotonic() - _world_refreshed_at > WORLD_REFRESH_INTERVAL):
+        await _refresh_world_data(force=True)
+    return world_snapshot.snapshot()
+
+@app.get("/api/stream/stats")
+async def stream_stats():
+    """Snapshot version, connected dashboard streams and publish/resync counters"""
+    return world_snapshot.stats()
 
 @app.get("/api/dashboard")
 async def get_dashboard_data():
@@ -979,6 +1394,27 @@ async def get_session_reports(session_id: str):
 # MULTI-PORT ROUTE PLANNING ENDPOINTS
 # ============================================================
 
+def _build_route_report(ports: List[str], optimization: str, session_id: str | None,
+                        route_analysis: Dict[str, Any]) -> RiskReport:
+    """RiskReport stored for a planned multi-port route"""
+    return RiskReport(
+        report_id=str(uuid.uuid4()),
+        session_id=session_id or "default",
+        report_type="multi_port_route",
+        created_at=datetime.now(),
+        title=f"Multi-Port Route: {' → '.join(ports)}",
+        executive_summary=f"Multi-port route analysis for {len(ports)} ports: {' → '.join(ports)}. Total distance: {route_analysis['summary']['total_distance_nm']} nm, Estimated time: {route_analysis['summary']['total_time_days']} days, Total cost: ${route_analysis['summary']['total_cost_usd']:,.2f}.",
+        recommendations=[
+            f"Recommended optimization strategy: {optimization}",
+            "Monitor weather conditions along the route",
+            "Pre-book port slots to minimize wait times",
+            "Consider alternative routes if delays occur"
+        ],
+        political_risks=[],
+        schedule_risks=[],
+        route_analysis=json.dumps(route_analysis)  # Store full route data as JSON
+    )
+
 @app.post("/api/route/plan-multi-port")
 async def plan_multi_port_route(request: Dict[str, Any]):
     """
@@ -1006,24 +1442,8 @@ async def plan_multi_port_route(request: Dict[str, Any]):
             raise HTTPException(status_code=400, detail=route_analysis["error"])
         
         # Generate a report for this route
-        report_id = str(uuid.uuid4())
-        route_report = RiskReport(
-            report_id=report_id,
-            session_id=session_id or "default",
-            report_type="multi_port_route",
-            created_at=datetime.now(),
-            title=f"Multi-Port Route: {' → '.join(ports)}",
-            executive_summary=f"Multi-port route analysis for {len(ports)} ports: {' → '.join(ports)}. Total distance: {route_analysis['summary']['total_distance_nm']} nm, Estimated time: {route_analysis['summary']['total_time_days']} days, Total cost: ${route_analysis['summary']['total_cost_usd']:,.2f}.",
-            recommendations=[
-                f"Recommended optimization strategy: {optimization}",
-                "Monitor weather conditions along the route",
-                "Pre-book port slots to minimize wait times",
-                "Consider alternative routes if delays occur"
-            ],
-            political_risks=[],
-            schedule_risks=[],
-            route_analysis=json.dumps(route_analysis)  # Store full route data as JSON
-        )
+        route_report = _build_route_report(ports, optimization, session_id, route_analysis)
+        report_id = route_report.report_id
         
         # Store report
         await db_client.store_report(route_report)
@@ -1042,6 +1462,82 @@ async def plan_multi_port_route(request: Dict[str, Any]):
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/route/plan-batch")
+async def plan_route_batch(request: Dict[str, Any]):
+    """
+    Plan many multi-port routes in a process pool and stream results as NDJSON.
+    
+    Request body:
+    {
+        "itineraries": [{"ports": ["Port1", "Port2", ...], "optimization": "balanced", "id": "optional"}, ...],
+        "optimization": "fastest|cheapest|balanced|safest",  (default for itineraries without one)
+        "persist_reports": false,
+        "session_id": "optional"
+    }
+    
+    Each line is {"type": "result", "index", "id", "success", ...} in completion
+    order, followed by a final {"type": "summary", ...} line.
+    """
+    itineraries = request.get("itineraries")
+    default_optimization = request.get("optimization", "balanced")
+    persist_reports = bool(request.get("persist_reports", False))
+    session_id = request.get("session_id")
+    
+    if not isinstance(itineraries, list) or not itineraries:
+        raise HTTPException(status_code=400, detail="'itineraries' must be a non-empty array")
+    if len(itineraries) > ROUTE_BATCH_MAX_ITINERARIES:
+        raise HTTPException(status_code=400, detail=f"At most {ROUTE_BATCH_MAX_ITINERARIES} itineraries per batch")
+    
+    async def stream_results():
+        loop = asyncio.get_running_loop()
+        pool = _get_route_pool()
+        started = time.perf_counter()
+        succeeded = 0
+        failed = 0
+        
+        async def plan(index: int, itinerary: Any):
+            ports = itinerary.get("ports") if isinstance(itinerary, dict) else itinerary
+            optimization = itinerary.get("optimization", default_optimization) if isinstance(itinerary, dict) else default_optimization
+            item_id = itinerary.get("id") if isinstance(itinerary, dict) else None
+            if not isinstance(ports, list) or len(ports) < 2:
+                return index, item_id, ports, optimization, {"error": "At least 2 ports are required"}
+            try:
+                analysis = await loop.run_in_executor(pool, plan_route_in_worker, ports, optimization)
+            except Exception as e:
+                analysis = {"error": str(e)}
+            return index, item_id, ports, optimization, analysis
+        
+        tasks = [asyncio.ensure_future(plan(i, it)) for i, it in enumerate(itineraries)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                index, item_id, ports, optimization, analysis = await next_done
+                line = {"type": "result", "index": index, "id": item_id}
+                if "error" in analysis:
+                    failed += 1
+                    line.update({"success": False, "error": analysis["error"]})
+                else:
+                    succeeded += 1
+                    line.update({"success": True, "route_analysis": analysis})
+                    if persist_reports:
+                        report = _build_route_report(ports, optimization, session_id, analysis)
+                        await db_client.store_report(report)
+                        line["report_id"] = report.report_id
+                yield json.dumps(line) + "\n"
+            
+            yield json.dumps({
+                "type": "summary",
+                "total": len(itineraries),
+                "succeeded": succeeded,
+                "failed": failed,
+                "elapsed_ms": round((time.perf_counter() - started) * 1000, 2)
+            }) + "\n"
+        finally:
+            # Client went away or we finished: drop anything still queued
+            for task in tasks:
+                task.cancel()
+    
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
 @app.post("/api/route/optimize-order")
 async def optimize_route_order(request: Dict[str, Any]):
     """
@@ -1052,31 +1548,39 @@ async def optimize_route_order(request: Dict[str, Any]):
         "origin": "OriginPort",
         "destination": "DestinationPort",
         "waypoints": ["Port1", "Port2", "Port3", ...],
-        "optimization": "fastest|cheapest|balanced"
+        "optimization": "fastest|cheapest|balanced|safest",
+        "time_budget_ms": 250  (optional)
     }
+    
+    The search runs in the route planner process pool, off the event loop.
     """
     try:
         origin = request.get("origin")
         destination = request.get("destination")
         waypoints = request.get("waypoints", [])
         optimization = request.get("optimization", "balanced")
+        time_budget_ms = request.get("time_budget_ms", 250)
         
         if not origin or not destination:
             raise HTTPException(status_code=400, detail="Origin and destination are required")
         
-        # Optimize the route order
-        optimized_route = route_planner_agent.optimize_route_order(
-            origin, destination, waypoints, optimization
-        )
+        try:
+            time_budget_ms = min(max(float(time_budget_ms), 10.0), 2000.0)
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="time_budget_ms must be a number")
         
-        # Get full analysis for optimized route
-        route_analysis = route_planner_agent.plan_multi_port_route(optimized_route, optimization)
+        # Optimize the route order and analyze the optimized route
+        ordering = await asyncio.get_running_loop().run_in_executor(
+            _get_route_pool(), optimize_order_in_worker,
+            origin, destination, waypoints, optimization, time_budget_ms
+        )
         
         return {
             "success": True,
             "original_ports": [origin] + waypoints + [destination],
-            "optimized_ports": optimized_route,
-            "route_analysis": route_analysis
+            "optimized_ports": ordering["ports"],
+            "solver": ordering["solver"],
+            "route_analysis": ordering["route_analysis"]
         }
         
     except HTTPException:
@@ -1086,6 +1590,98 @@ async def optimize_route_order(request: Dict[str, Any]):
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/route/simulate")
+async def simulate_route(request: Dict[str, Any]):
+    """
+    Monte Carlo ETA and cost percentiles (P50/P90/P99) for a multi-port route.
+    
+    Request body:
+    {
+        "ports": ["Port1", "Port2", ...],
+        "optimization": "fastest|cheapest|balanced|safest",
+        "trials": 10000,  (optional, up to 200000)
+        "seed": 42  (optional, for reproducible results)
+    }
+    
+    Trials are sampled in the route planner process pool, off the event loop.
+    """
+    try:
+        ports = request.get("ports", [])
+        optimization = request.get("optimization", "balanced")
+        seed = request.get("seed")
+        
+        if len(ports) < 2:
+            raise HTTPException(status_code=400, detail="At least 2 ports are required")
+        
+        try:
+            trials = int(request.get("trials", 10000))
+            seed = int(seed) if seed is not None else None
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="trials and seed must be integers")
+        if trials < 1:
+            raise HTTPException(status_code=400, detail="trials must be positive")
+        
+        simulation = await asyncio.get_running_loop().run_in_executor(
+            _get_route_pool(), simulate_route_in_worker, ports, optimization, trials, seed
+        )
+        if "error" in simulation:
+            raise HTTPException(status_code=400, detail=simulation["error"])
+        
+        return {"success": True, "simulation": simulation}
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/route/pareto")
+async def pareto_routes(request: Dict[str, Any]):
+    """
+    Pareto-optimal orderings and profiles over total time, cost and risk.
+    
+    Request body:
+    {
+        "origin": "OriginPort",
+        "destination": "DestinationPort",
+        "waypoints": ["Port1", "Port2", ...],
+        "time_budget_ms": 500,  (optional)
+        "include_routes": false  (optional, full route analysis per front member)
+    }
+    
+    The search runs in the route planner process pool, off the event loop.
+    """
+    try:
+        origin = request.get("origin")
+        destination = request.get("destination")
+        waypoints = request.get("waypoints", [])
+        include_routes = bool(request.get("include_routes", False))
+        
+        if not origin or not destination:
+            raise HTTPException(status_code=400, detail="Origin and destination are required")
+        
+        try:
+            time_budget_ms = min(max(float(request.get("time_budget_ms", 500)), 10.0), 5000.0)
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="time_budget_ms must be a number")
+        
+        result = await asyncio.get_running_loop().run_in_executor(
+            _get_route_pool(), plan_pareto_in_worker,
+            origin, destination, waypoints, time_budget_ms, include_routes
+        )
+        if "error" in result:
+            raise HTTPException(status_code=400, detail=result["error"])
+        
+        return {"success": True, "pareto": result}
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.post("/api/route/compare")
 async def compare_routes(request: Dict[str, Any]):
     """
@@ -1145,5 +1741,49 @@ async def search_ports(query: str):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/route/cache-stats")
+async def route_cache_stats():
+    """Hit/miss counters for the route planner's route and leg caches"""
+    return route_planner_agent.cache_stats()
+
+def _validate_coordinates(lat: float, lon: float):
+    if not -90 <= lat <= 90 or not -180 <= lon <= 180:
+        raise HTTPException(status_code=400, detail="lat must be within [-90, 90] and lon within [-180, 180]")
+
+@app.get("/api/route/ports/nearest")
+async def nearest_ports(lat: float, lon: float, k: int = 5, exclude: str = ""):
+    """
+    Find the K nearest ports to a coordinate.
+    exclude: optional comma-separated port names to skip (e.g. a congested port)
+    """
+    try:
+        _validate_coordinates(lat, lon)
+        if not 1 <= k <= 100:
+            raise HTTPException(status_code=400, detail="k must be between 1 and 100")
+        excluded = [name.strip() for name in exclude.split(",") if name.strip()]
+        results = route_planner_agent.find_nearest_ports(lat, lon, k, excluded)
+        return {"results": results, "total": len(results)}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/route/ports/within")
+async def ports_within(lat: float, lon: float, radius_nm: float, limit: int = 100):
+    """Find all ports within radius_nm nautical miles of a coordinate"""
+    try:
+        _validate_coordinates(lat, lon)
+        if radius_nm <= 0:
+            raise HTTPException(status_code=400, detail="radius_nm must be positive")
+        if not 1 <= limit <= 1000:
+            raise HTTPException(status_code=400, detail="limit must be between 1 and 1000")
+        # total counts every port in range, so clients can tell when limit cut the list
+        results = route_planner_agent.find_ports_within(lat, lon, radius_nm)
+        return {"results": results[:limit], "total": len(results)}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000)
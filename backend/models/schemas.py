@@ -21,6 +21,7 @@ class PoliticalRisk(BaseModel):
     publication_date: str
     source_title: str
     source_url: str
+    sources: Optional[List[Dict[str, str]]] = None  # every provider copy when near-duplicates were collapsed
 
 class ScheduleRisk(BaseModel):
     equipment_id: str
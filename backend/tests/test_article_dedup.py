@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+from agents.article_dedup import ArticleDeduplicator
+
+STORY = (
+    "Port workers in Rotterdam began a 48 hour strike on Monday over pay and "
+    "automation, halting container handling at the largest terminals and "
+    "leaving dozens of vessels waiting at anchor outside the harbour entrance"
+)
+OTHER = (
+    "The central bank raised interest rates by a quarter point on Thursday, "
+    "citing persistent inflation in services and a tight labour market that "
+    "has kept wage growth well above the target consistent with price stability"
+)
+
+
+def test_signature_similarity_estimates_jaccard():
+    dedup = ArticleDeduplicator(num_perm=256, bands=32)
+    words = STORY.split()
+    variant = " ".join(words[:-4] + ["near", "the", "harbour", "today"])
+    sigs = dedup.signatures([STORY, variant, OTHER])
+
+    def jaccard(a, b):
+        sa = {" ".join(a[i:i + 3]) for i in range(len(a) - 2)}
+        sb = {" ".join(b[i:i + 3]) for i in range(len(b) - 2)}
+        return len(sa & sb) / len(sa | sb)
+
+    norm = lambda text: text.lower().split()
+    assert np.mean(sigs[0] == sigs[1]) == pytest.approx(jaccard(norm(STORY), norm(variant)), abs=0.1)
+    assert np.mean(sigs[0] == sigs[2]) < 0.1
+
+
+def test_collapse_merges_syndicated_copies_and_keeps_the_first():
+    articles = [
+        {"title": "Rotterdam port strike", "description": STORY, "link": "https://a.example/1", "provider": "NewsData"},
+        {"title": "Rotterdam Port Strike!", "description": STORY + " Reuters", "link": "https://b.example/2",
+         "provider": "GNews"},
+        {"title": "Rates rise", "description": OTHER, "link": "https://a.example/3", "provider": "NewsData"},
+    ]
+    collapsed = ArticleDeduplicator().collapse(articles)
+    assert [a["title"] for a in collapsed] == ["Rotterdam port strike", "Rates rise"]
+    assert [s["provider"] for s in collapsed[0]["sources"]] == ["NewsData", "GNews"]
+    assert "sources" not in collapsed[1]
+
+
+def test_same_link_is_one_article_whatever_the_text():
+    articles = [
+        {"title": "Strike", "description": STORY, "url": "https://x.example/a"},
+        {"title": "Rates", "description": OTHER, "url": "https://x.example/a"},
+    ]
+    assert ArticleDeduplicator().clusters(articles) == [[0, 1]]
+
+
+def test_unrelated_articles_stay_apart():
+    rng = np.random.default_rng(0)
+    vocabulary = (STORY + " " + OTHER).lower().split()
+    articles = [{"title": f"Story {i}", "description": " ".join(rng.choice(vocabulary, 40))} for i in range(50)]
+    assert ArticleDeduplicator().clusters(articles) == [[i] for i in range(50)]
+
+
+def test_bands_must_divide_permutations():
+    with pytest.raises(ValueError):
+        ArticleDeduplicator(num_perm=64, bands=10)
+
+
+def test_articles_without_text_are_not_merged_with_each_other():
+    dedup = ArticleDeduplicator()
+    articles = [
+        {"title": None, "description": "", "link": "https://a.example/1"},
+        {"title": "", "content": None, "link": "https://b.example/2"},
+        {"title": "--", "link": "https://c.example/3"},
+        {"title": None, "link": "https://a.example/1", "provider": None},
+    ]
+    assert dedup.clusters(articles) == [[0, 3], [1], [2]]
+    assert dedup.collapse(articles)[0]["sources"][1] == {"provider": "", "title": "", "link": "https://a.example/1"}
@@ -0,0 +1,68 @@
+import time
+
+import pytest
+
+from agents.route_planner_agent import RoutePlannerAgent
+from utils.cache import TTLCache
+
+PORTS = ["Shanghai", "Singapore", "Rotterdam"]
+
+
+def test_entries_expire_after_the_ttl():
+    cache = TTLCache(maxsize=4, ttl=0.05)
+    cache.set("a", 1)
+    cache.set("b", 2, age=1)  # restored already past the ttl
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    time.sleep(0.06)
+    assert cache.get("a", "gone") == "gone"
+    assert len(cache) == 0
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_age_and_least_recently_used_eviction():
+    cache = TTLCache(maxsize=2)
+    cache.set("a", 1, age=30)
+    value, age = cache.get_with_age("a")
+    assert value == 1 and age == pytest.approx(30, abs=1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None and cache.get("a") == 1
+    assert cache.stats()["evictions"] == 1
+
+
+@pytest.fixture
+def planner():
+    return RoutePlannerAgent()
+
+
+def test_cache_hits_return_copies(planner):
+    first = planner.plan_multi_port_route(PORTS, "balanced")
+    first["legs"][0]["canals"].append("Nowhere Canal")
+    first["legs"][0]["polyline"][0]["lat"] = 99.0
+    first["summary"]["canals_used"].clear()
+    first["ports"][0] = "Changed"
+
+    second = planner.plan_multi_port_route(PORTS, "balanced")
+    assert planner.route_cache.hits == 1
+    assert "Nowhere Canal" not in second["legs"][0]["canals"]
+    assert second["legs"][0]["polyline"][0]["lat"] != 99.0
+    assert second["summary"]["canals_used"] and second["ports"][0] == "Shanghai"
+
+    leg = planner.calculate_route_leg("Shanghai", "Singapore")
+    leg["route_path"].clear()
+    assert planner.calculate_route_leg("Shanghai", "Singapore")["route_path"]
+
+
+def test_mark_profiles_changed_drops_cached_routes_and_legs(planner):
+    before = planner.plan_multi_port_route(PORTS, "fastest")
+    assert len(planner.route_cache) and len(planner.leg_cache)
+
+    planner.optimization_profiles["fastest"]["speed_multiplier"] *= 2
+    # Without the signal, in-place edits are not noticed
+    assert planner.plan_multi_port_route(PORTS, "fastest")["summary"] == before["summary"]
+    planner.mark_profiles_changed()
+    after = planner.plan_multi_port_route(PORTS, "fastest")
+    assert after["summary"]["total_time_days"] < before["summary"]["total_time_days"]
+    assert planner.route_cache.misses == 2
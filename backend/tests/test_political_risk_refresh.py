@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+
+from agents.political_risk_agent import PoliticalRiskAgent
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def article(title):
+    return {"title": title, "description": "Dock workers strike at the main port",
+            "link": f"https://example.com/{title}", "pubDate": "2026-01-01T00:00:00"}
+
+
+@pytest.fixture
+def agent(monkeypatch):
+    monkeypatch.setenv("NEWS_CACHE_PERSIST", "0")
+    monkeypatch.setenv("NEWS_CACHE_TTL", "60")
+    agent = PoliticalRiskAgent()
+    agent.headlines = {"NewsData.io": "old strike", "GNews": "old protest"}
+    agent.fetches = 0
+
+    def provider(name):
+        async def fetch(country):
+            agent.fetches += 1
+            return [article(agent.headlines[name])]
+        return fetch
+
+    agent._fetch_from_newsdata = provider("NewsData.io")
+    agent._fetch_from_gnews = provider("GNews")
+    return agent
+
+
+def titles(risks):
+    return {risk.source_title for risk in risks}
+
+
+def age_caches(agent, age):
+    for cache in (agent.news_cache, agent.risk_cache):
+        for key in list(cache._entries):
+            cache.set(key, cache.get(key), age=age)
+
+
+def test_stale_country_is_rescored_from_live_news_not_the_stale_cache(agent):
+    async def scenario():
+        first = await agent._analyze_country("Chile")
+        assert titles(first) == {"old strike", "old protest"}
+
+        age_caches(agent, 120)
+        agent.headlines = {"NewsData.io": "new strike", "GNews": "new protest"}
+
+        # The stale risks are served at once while the country refreshes
+        stale = await agent._analyze_country("Chile")
+        assert titles(stale) == {"old strike", "old protest"}
+        await agent._country_refreshes["Chile"]
+
+        risks, age = agent.risk_cache.get_with_age("Chile")
+        assert titles(risks) == {"new strike", "new protest"}
+        assert age <= agent.news_cache_ttl
+        assert titles(await agent._analyze_country("Chile")) == {"new strike", "new protest"}
+
+    run(scenario())
+    assert agent.fetches == 4
+    assert agent.news_cache_metrics["refreshes"] == 2
+    assert agent.news_cache_metrics["stale_hits"] == 0
+
+
+def test_failed_refresh_keeps_the_stale_risks_stale(agent):
+    async def scenario():
+        await agent._analyze_country("Chile")
+        age_caches(agent, 120)
+
+        async def down(country):
+            raise RuntimeError("provider down")
+        agent._fetch_from_newsdata = agent._fetch_from_gnews = down
+
+        await agent._analyze_country("Chile")
+        await agent._country_refreshes["Chile"]
+
+        risks, age = agent.risk_cache.get_with_age("Chile")
+        assert titles(risks) == {"old strike", "old protest"}
+        # Still stale, so the next request tries again rather than trusting it
+        assert age > agent.news_cache_ttl
+
+    run(scenario())
+    assert agent.news_cache_metrics["refresh_failures"] == 2
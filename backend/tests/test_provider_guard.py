@@ -0,0 +1,114 @@
+import asyncio
+import time
+
+import pytest
+
+from utils.provider_guard import CLOSED, HALF_OPEN, OPEN, ProviderGuard, ProviderUnavailable, parse_retry_after
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def make_guard(**overrides):
+    options = dict(requests_per_window=1000, window_seconds=1, burst=10, failure_threshold=3,
+                   cooldown_seconds=0.05, max_wait_seconds=0.5)
+    options.update(overrides)
+    return ProviderGuard("Test", **options)
+
+
+def test_opens_after_threshold_and_rejects_without_a_request():
+    guard = make_guard()
+    for _ in range(2):
+        run(guard.acquire())
+        guard.record_failure("boom", status=500)
+    assert guard.state == CLOSED
+    run(guard.acquire())
+    guard.record_failure("boom", status=500)
+    assert guard.state == OPEN and guard.counters["trips"] == 1
+    with pytest.raises(ProviderUnavailable) as raised:
+        run(guard.acquire())
+    assert raised.value.reason == "circuit open"
+    assert guard.counters["requests"] == 3
+
+
+def test_half_open_allows_one_trial_and_success_closes():
+    guard = make_guard(failure_threshold=1)
+    run(guard.acquire())
+    guard.record_failure("boom")
+    time.sleep(0.06)
+    run(guard.acquire())
+    assert guard.state == HALF_OPEN
+    with pytest.raises(ProviderUnavailable) as raised:
+        run(guard.acquire())
+    assert raised.value.reason == "circuit half-open"
+    guard.record_success()
+    assert guard.state == CLOSED and guard.consecutive_failures == 0
+    run(guard.acquire())
+
+
+def test_failed_trial_reopens_with_a_doubled_cooldown():
+    guard = make_guard(failure_threshold=1)
+    run(guard.acquire())
+    guard.record_failure("boom")
+    time.sleep(0.06)
+    run(guard.acquire())
+    guard.record_failure("still down")
+    assert guard.state == OPEN
+    assert guard._cooldown == pytest.approx(0.1)
+    assert guard.counters["trips"] == 2
+
+
+def test_retry_after_and_429_open_at_once():
+    guard = make_guard(max_cooldown_seconds=600)
+    run(guard.acquire())
+    guard.record_failure("slow down", status=429, headers={"Retry-After": "120"})
+    assert guard.state == OPEN
+    assert guard.stats()["open_for_seconds"] == pytest.approx(120, abs=1)
+
+
+def test_cancelled_throttled_trial_frees_the_slot_and_token():
+    guard = make_guard(failure_threshold=1, requests_per_window=2, burst=1, max_wait_seconds=5)
+    run(guard.acquire())
+    guard.record_failure("boom")
+    time.sleep(0.06)
+
+    async def cancelled_acquire():
+        task = asyncio.ensure_future(guard.acquire())
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    run(cancelled_acquire())
+    assert guard.state == HALF_OPEN and not guard._trial_in_flight
+    assert guard.tokens > 0  # the reserved token was handed back
+
+
+def test_empty_bucket_rejects_beyond_max_wait_and_throttles_within_it():
+    guard = make_guard(requests_per_window=10, window_seconds=1, burst=1, max_wait_seconds=0.2)
+    run(guard.acquire())
+    started = time.monotonic()
+    run(guard.acquire())  # next token is 0.1 s away
+    assert time.monotonic() - started >= 0.08
+    assert guard.counters["throttled"] == 1
+
+    slow = make_guard(requests_per_window=1, window_seconds=10, burst=1, max_wait_seconds=0.2)
+    run(slow.acquire())
+    with pytest.raises(ProviderUnavailable) as raised:
+        run(slow.acquire())
+    assert raised.value.reason == "rate limited"
+
+
+def test_rate_limit_headers_retune_the_refill_rate():
+    guard = make_guard(requests_per_window=60, window_seconds=60)
+    guard.record_success({"X-RateLimit-Remaining": "30", "X-RateLimit-Reset": "10"})
+    assert guard.rate == pytest.approx(3.0)
+    assert guard.tokens <= 30
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("7") == 7.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0  # in the past
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
@@ -0,0 +1,49 @@
+import random
+
+from agents.risk_keyword_matcher import RISK_SCORE_TIERS, RISK_TYPE_VOCABULARY, RiskKeywordMatcher
+
+WORDS = sorted({keyword for _, keywords in RISK_SCORE_TIERS + RISK_TYPE_VOCABULARY for keyword in keywords}
+               | {"software", "port", "shipping", "Lawful", "BANNER", "import-export", "calm", "harbour"})
+
+
+def reference_score(content):
+    """Scoring rules as PoliticalRiskAgent applied them keyword by keyword"""
+    text = content.lower()
+    score = sum(points for points, keywords in RISK_SCORE_TIERS for keyword in keywords if keyword in text)
+    return min(score, 5)
+
+
+def reference_type(content):
+    text = content.lower()
+    for name, keywords in RISK_TYPE_VOCABULARY:
+        if any(keyword in text for keyword in keywords):
+            return name
+    return "General Economic Risk"
+
+
+def random_texts(count, seed=0):
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(WORDS) for _ in range(rng.randrange(0, 8))) for _ in range(count)]
+
+
+def test_score_and_type_match_the_original_rules():
+    matcher = RiskKeywordMatcher()
+    for text in random_texts(2000):
+        result = matcher.match(text, details=False)
+        assert result == {"score": reference_score(text), "risk_type": reference_type(text)}, text
+
+
+def test_details_list_every_keyword_watchlist_hit_and_span():
+    matcher = RiskKeywordMatcher(watchlist=["Port", "harbour"])
+    text = "Port strike: software war at the port"
+    result = matcher.match(text)
+    assert set(result["keywords"]) == {"strike", "war", "port"}
+    assert result["watchlist"] == ["port"]
+    lowered = text.lower()
+    assert all(lowered[start:end] == keyword for start, end, keyword in result["spans"])
+    assert [keyword for _, _, keyword in result["spans"]].count("war") == 2  # "software" too
+    assert result["spans"] == sorted(result["spans"])
+
+
+def test_empty_content():
+    assert RiskKeywordMatcher().match(None, details=False) == {"score": 0, "risk_type": "General Economic Risk"}
@@ -0,0 +1,87 @@
+import itertools
+import time
+
+import numpy as np
+import pytest
+
+from agents.route_order_solver import (
+    held_karp, k_best_open_paths, local_search, nearest_neighbour, path_cost, solve_open_path
+)
+
+
+def random_weights(n, seed, symmetric=True):
+    rng = np.random.default_rng(seed)
+    points = rng.uniform(0, 100, size=(n, 2))
+    weights = np.linalg.norm(points[:, None] - points[None, :], axis=-1)
+    if not symmetric:
+        weights = weights * rng.uniform(0.8, 1.2, size=(n, n))
+    return weights
+
+
+def brute_force(weights):
+    n = len(weights)
+    best = None
+    for middle in itertools.permutations(range(1, n - 1)):
+        path = [0, *middle, n - 1]
+        cost = path_cost(weights, path)
+        if best is None or cost < best[1] - 1e-9:
+            best = (path, cost)
+    return best
+
+
+@pytest.mark.parametrize("n", [2, 3, 4, 6, 8])
+@pytest.mark.parametrize("seed", [0, 1, 2])
+@pytest.mark.parametrize("symmetric", [True, False])
+def test_held_karp_matches_brute_force(n, seed, symmetric):
+    weights = random_weights(n, seed, symmetric)
+    path = held_karp(weights)
+    assert path[0] == 0 and path[-1] == n - 1
+    assert sorted(path) == list(range(n))
+    assert path_cost(weights, path) == pytest.approx(brute_force(weights)[1])
+
+
+def test_solve_open_path_is_exact_up_to_the_limit():
+    weights = random_weights(9, seed=3)
+    path, stats = solve_open_path(weights)
+    assert stats["exact"] and stats["method"] == "held_karp"
+    assert stats["objective_value"] == pytest.approx(brute_force(weights)[1], abs=1e-3)
+    assert stats["objective_value"] <= stats["greedy_objective_value"]
+
+
+def test_local_search_beyond_the_limit_keeps_a_valid_path_and_improves_on_greedy():
+    weights = random_weights(40, seed=4)
+    path, stats = solve_open_path(weights, time_budget_ms=200)
+    assert stats["method"] == "two_opt_or_opt" and not stats["exact"]
+    assert path[0] == 0 and path[-1] == 39 and sorted(path) == list(range(40))
+    assert stats["objective_value"] <= stats["greedy_objective_value"]
+
+
+def test_local_search_never_worsens_a_path():
+    weights = random_weights(25, seed=5, symmetric=False)
+    start = nearest_neighbour(weights)
+    improved = local_search(weights, start, time.perf_counter() + 1)
+    assert sorted(improved) == sorted(start)
+    assert path_cost(weights, improved) <= path_cost(weights, start) + 1e-9
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_k_best_orders_are_distinct_valid_and_match_brute_force_ranking(seed):
+    weights = random_weights(7, seed)
+    ranked = sorted(
+        path_cost(weights, [0, *middle, 6]) for middle in itertools.permutations(range(1, 6))
+    )
+    results = k_best_open_paths(weights, k=5, time_budget_ms=2000)
+    assert len(results) == 5
+    assert len({tuple(path) for path, _ in results}) == 5
+    costs = [cost for _, cost in results]
+    assert costs == sorted(costs)
+    for path, cost in results:
+        assert path[0] == 0 and path[-1] == 6 and sorted(path) == list(range(7))
+        assert cost == pytest.approx(path_cost(weights, path))
+    assert costs == pytest.approx(ranked[:5])
+
+
+def test_k_best_stops_when_orders_run_out():
+    weights = random_weights(4, seed=6)  # two waypoints: only two orders exist
+    results = k_best_open_paths(weights, k=5)
+    assert sorted(tuple(path) for path, _ in results) == [(0, 1, 2, 3), (0, 2, 1, 3)]
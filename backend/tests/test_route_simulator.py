@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from agents import route_simulator
+from agents.route_simulator import MAX_TRIALS, _percentiles, simulate_legs
+
+LEGS = dict(
+    transit_days=[10.0, 4.0, 7.5],
+    wait_days=[1.5, 0.5, 2.0],
+    canal_days=[0.0, 0.5, 0.0],
+    fuel_cost_usd=[120000.0, 40000.0, 90000.0],
+    fixed_cost_usd=[30000.0, 450000.0, 25000.0],
+)
+
+
+def without_timing(result):
+    return {k: v for k, v in result.items() if k != "simulation_time_ms"}
+
+
+def test_percentiles_are_nearest_rank_and_ordered():
+    samples = np.arange(1, 101, dtype=float)[::-1]
+    assert {k: float(v) for k, v in _percentiles(samples).items()} == {"p50": 50.0, "p90": 90.0, "p99": 99.0}
+
+    result = simulate_legs(**LEGS, trials=5000, seed=3)
+    blocks = [result["total_time_days"], result["total_cost_usd"]]
+    for leg in result["legs"]:
+        blocks += [leg["time_days"], leg["cost_usd"], leg["elapsed_days_at_arrival"]]
+    for block in blocks:
+        assert block["p50"] <= block["p90"] <= block["p99"]
+    # Arrival times only grow along the route
+    arrivals = [leg["elapsed_days_at_arrival"]["p50"] for leg in result["legs"]]
+    assert arrivals == sorted(arrivals)
+    assert result["legs"][-1]["elapsed_days_at_arrival"] == result["total_time_days"]
+
+
+def test_fixed_seed_is_reproducible():
+    first = simulate_legs(**LEGS, trials=2000, seed=42)
+    assert without_timing(simulate_legs(**LEGS, trials=2000, seed=42)) == without_timing(first)
+    assert without_timing(simulate_legs(**LEGS, trials=2000, seed=43)) != without_timing(first)
+
+
+def test_trials_are_clamped(monkeypatch):
+    monkeypatch.setattr(route_simulator, "MAX_TRIALS", 500)
+    assert simulate_legs(**LEGS, trials=10 ** 9, seed=1)["trials"] == 500
+    assert simulate_legs(**LEGS, trials=0, seed=1)["trials"] == 1
+    assert MAX_TRIALS == 200000
+
+
+def test_routes_without_canals_or_legs():
+    result = simulate_legs(**{**LEGS, "canal_days": [0.0, 0.0, 0.0]}, trials=100, seed=1)
+    assert len(result["legs"]) == 3
+    empty = simulate_legs([], [], [], [], [], trials=100, seed=1)
+    assert empty["legs"] == [] and empty["total_time_days"]["p99"] == pytest.approx(0)
@@ -0,0 +1,42 @@
+from itertools import combinations
+
+import pytest
+
+from data.distance_matrix import haversine_nm
+from data.ports import MAJOR_PORTS
+from data.sea_lane_graph import SeaLaneGraph
+
+
+@pytest.fixture(scope="module")
+def graph():
+    return SeaLaneGraph()
+
+
+def test_every_port_pair_is_reachable_and_no_shorter_than_the_great_circle(graph):
+    for a, b in combinations(MAJOR_PORTS, 2):
+        route = graph.route(a, b)
+        assert route is not None, (a, b)
+        assert route["path"][0] == a and route["path"][-1] == b
+        # Ports are endpoints only, never transited
+        assert all(graph.node_types[node] != "port" for node in route["path"][1:-1]), (a, b)
+        great_circle = haversine_nm(*graph.coordinates[a], *graph.coordinates[b])
+        assert route["distance_nm"] >= great_circle - 1e-6, (a, b)
+
+
+@pytest.mark.parametrize("origin, destination, canal", [
+    ("Shanghai", "Rotterdam", "Suez Canal"),
+    ("Mumbai", "Hamburg", "Suez Canal"),
+    ("Los Angeles", "New York", "Panama Canal"),
+    ("Houston", "Tokyo", "Panama Canal"),
+])
+def test_known_corridors_use_their_canal(graph, origin, destination, canal):
+    route = graph.route(origin, destination)
+    assert route["canals"] == (canal,)
+    back = graph.route(destination, origin)
+    assert back["path"] == route["path"][::-1]
+    assert back["distance_nm"] == pytest.approx(route["distance_nm"])
+
+
+def test_unknown_ports_have_no_route(graph):
+    assert graph.route("Shanghai", "Atlantis") is None
+    assert graph.route("Shanghai", "Shanghai")["distance_nm"] == 0
@@ -0,0 +1,194 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from agents import shipment_datasets
+from agents.shipment_datasets import DEFAULT_SESSION, DatasetTooLarge, ShipmentDatasets
+from agents.shipment_store import ShipmentStore
+
+fcntl = pytest.importorskip("fcntl")
+
+
+def item(equipment_id, **fields):
+    return {"equipment_id": equipment_id, "country": "China", "original_delivery_date": "2024-01-01",
+            "current_delivery_date": "2024-01-10", **fields}
+
+
+@pytest.fixture
+def baseline():
+    return ShipmentStore([item(f"S{i}") for i in range(5)])
+
+
+def upsert(datasets, session, items):
+    return datasets.write(session, lambda store: store.upsert(items), log={"upsert": items})
+
+
+def delete(datasets, session, ids):
+    return datasets.write(session, lambda store: store.delete(ids), log={"delete": ids})
+
+
+def test_sessions_copy_the_baseline_on_first_write(tmp_path, baseline):
+    datasets = ShipmentDatasets(baseline, str(tmp_path))
+    assert datasets.get("a") is baseline
+    upsert(datasets, "a", [item("A1")])
+    assert len(datasets.get("a")) == 6
+    assert datasets.get("b") is baseline and len(baseline) == 5
+    datasets.clear("a")
+    assert datasets.get("a") is baseline
+
+
+def test_small_writes_append_to_the_log_and_other_workers_replay_it(tmp_path, baseline):
+    writer = ShipmentDatasets(baseline, str(tmp_path))
+    reader = ShipmentDatasets(baseline, str(tmp_path))
+    upsert(writer, "s", [item("A1")])  # first write: full snapshot
+    assert writer.counters["saves"] == 1
+
+    upsert(writer, "s", [item("A2"), item("S1", status="delayed")])
+    delete(writer, "s", ["S0"])
+    assert writer.counters["saves"] == 1 and writer.counters["log_appends"] == 2
+    assert reader.get("s").items() == writer.get("s").items()
+    assert reader.counters["loads"] == 1 and reader.counters["log_replayed"] == 2
+
+    upsert(writer, "s", [item("A3")])
+    assert reader.get("s").items() == writer.get("s").items()
+    assert reader.counters["loads"] == 1 and reader.counters["log_replayed"] == 3
+
+    # Writes go through the other worker too, on top of what it replayed
+    upsert(reader, "s", [item("A4")])
+    assert writer.get("s").items() == reader.get("s").items()
+
+
+def test_log_is_compacted_into_a_new_snapshot(tmp_path, baseline, monkeypatch):
+    monkeypatch.setattr(shipment_datasets, "LOG_COMPACT_MIN_BYTES", 2000)
+    datasets = ShipmentDatasets(baseline, str(tmp_path))
+    upsert(datasets, "s", [item("A0")])
+    for i in range(40):
+        upsert(datasets, "s", [item(f"A{i}", description="x" * 50)])
+    assert datasets.counters["saves"] > 1
+    fresh = ShipmentDatasets(baseline, str(tmp_path))
+    assert fresh.get("s").items() == datasets.get("s").items()
+    log = datasets._path("s", ".log")
+    assert not os.path.exists(log) or os.path.getsize(log) <= 2000
+
+
+def test_torn_log_line_is_skipped_and_then_overwritten(tmp_path, baseline):
+    datasets = ShipmentDatasets(baseline, str(tmp_path))
+    upsert(datasets, "s", [item("A1")])
+    upsert(datasets, "s", [item("A2")])
+    with open(datasets._path("s", ".log"), "ab") as f:
+        f.write(b'{"upsert":[{"equipm')
+    other = ShipmentDatasets(baseline, str(tmp_path))
+    assert len(other.get("s")) == 7
+    upsert(other, "s", [item("A3")])
+    assert ShipmentDatasets(baseline, str(tmp_path)).get("s").items() == other.get("s").items()
+
+
+def test_failed_or_oversized_writes_leave_the_previous_version(tmp_path, baseline):
+    datasets = ShipmentDatasets(baseline, str(tmp_path))
+    upsert(datasets, "s", [item("A1")])
+
+    def broken(store):
+        store.upsert([item("HALF")])
+        raise RuntimeError("midway")
+
+    with pytest.raises(RuntimeError):
+        datasets.write("s", broken, log={"upsert": [item("HALF")]})
+    assert datasets.get("s").row_of("HALF") is None
+
+    datasets.session_max_bytes = datasets.get("s").memory_usage() + 1000
+    with pytest.raises(DatasetTooLarge):
+        upsert(datasets, "s", [item(f"B{i}", description="z" * 100) for i in range(200)])
+    assert len(datasets.get("s")) == 6
+    assert datasets.counters["rejected_budget"] == 1
+
+
+def test_replace_resets_the_log(tmp_path, baseline):
+    datasets = ShipmentDatasets(baseline, str(tmp_path))
+    upsert(datasets, "s", [item("A1")])
+    upsert(datasets, "s", [item("A2")])
+    datasets.replace("s", ShipmentStore([item("R1")]))
+    assert not os.path.exists(datasets._path("s", ".log"))
+    assert [i["equipment_id"] for i in ShipmentDatasets(baseline, str(tmp_path)).get("s").items()] == ["R1"]
+
+
+def test_idle_and_lru_eviction_only_drop_memory(tmp_path, baseline):
+    datasets = ShipmentDatasets(baseline, str(tmp_path), idle_seconds=0.01)
+    upsert(datasets, "a", [item("A1")])
+    time.sleep(0.02)
+    upsert(datasets, "b", [item("B1")])
+    assert datasets.counters["evicted_idle"] == 1 and list(datasets._resident) == ["b"]
+    assert datasets.get("a").row_of("A1") is not None
+
+    datasets.idle_seconds = 900
+    datasets.resident_max_bytes = 1
+    datasets.get("b")
+    assert list(datasets._resident) == ["b"] and datasets.counters["evicted_lru"] >= 1
+
+
+def test_purge_skips_locked_datasets_and_keeps_the_default(tmp_path, baseline):
+    datasets = ShipmentDatasets(baseline, str(tmp_path), ttl_seconds=60)
+    for session in ("old", "busy", DEFAULT_SESSION):
+        upsert(datasets, session, [item("A1")])
+        upsert(datasets, session, [item("A2")])
+    for name in os.listdir(tmp_path):
+        os.utime(tmp_path / name, (0, 0))
+
+    with open(datasets._path("busy", ".lock"), "a") as held:
+        fcntl.flock(held.fileno(), fcntl.LOCK_SH)
+        assert datasets.purge_expired() == 1
+        fcntl.flock(held.fileno(), fcntl.LOCK_UN)
+    assert not os.path.exists(datasets._path("old"))
+    assert not os.path.exists(datasets._path("old", ".log"))
+    assert not os.path.exists(datasets._path("old", ".lock"))
+    assert os.path.exists(datasets._path("busy")) and os.path.exists(datasets._path(DEFAULT_SESSION))
+    assert datasets.get("old") is baseline
+
+    assert datasets.purge_expired() == 1
+    assert sorted(os.listdir(tmp_path)) == sorted(
+        os.path.basename(datasets._path(DEFAULT_SESSION, suffix)) for suffix in (".npz", ".log", ".lock")
+    )
+
+
+def test_a_write_after_purge_locks_the_new_lock_file(tmp_path, baseline):
+    datasets = ShipmentDatasets(baseline, str(tmp_path), ttl_seconds=60)
+    upsert(datasets, "s", [item("A1")])
+    for name in os.listdir(tmp_path):
+        os.utime(tmp_path / name, (0, 0))
+    datasets.purge_expired()
+    upsert(datasets, "s", [item("A2")])
+    assert os.path.exists(datasets._path("s", ".lock"))
+    assert len(datasets.get("s")) == 6
+
+
+def test_caches_built_by_reads_do_not_count_against_the_session_budget(tmp_path, baseline):
+    datasets = ShipmentDatasets(baseline, str(tmp_path))
+    datasets.replace("s", ShipmentStore([item(f"A{i}", description=f"part {i}") for i in range(2000)]))
+    store = datasets.get("s")
+    datasets.session_max_bytes = store.memory_usage(caches=False) + 4096
+    store.indexes()
+    assert store.memory_usage() > datasets.session_max_bytes
+    upsert(datasets, "s", [item("A1", status="delayed")])
+    assert datasets.counters["rejected_budget"] == 0
+
+
+def test_reads_see_whole_writes_from_other_threads(tmp_path, baseline):
+    datasets = ShipmentDatasets(baseline, str(tmp_path), resident_max_bytes=1)
+    seen = []
+
+    def writer(session):
+        for i in range(30):
+            upsert(datasets, session, [item(f"{session}-{i}-a"), item(f"{session}-{i}-b")])
+
+    def reader(session):
+        for _ in range(60):
+            # Items arrive two per write, so a read between the two would be odd
+            seen.append((datasets.read(session, len) - len(baseline)) % 2)
+
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        futures = [pool.submit(job, session) for session in ("a", "b", "c") for job in (writer, reader)]
+        for future in futures:
+            future.result()
+    assert not any(seen)
+    assert [datasets.read(session, len) for session in ("a", "b", "c")] == [65, 65, 65]
@@ -0,0 +1,251 @@
+import random
+from datetime import date, timedelta
+
+import pytest
+
+from agents.shipment_store import ShipmentStore
+
+COUNTRIES = ["China", "India", "Brazil", "Germany", "Japan", "USA"]
+STATUSES = ["on_time", "delayed", "at_risk", None, ""]
+
+
+def make_items(n, seed=0, prefix="E"):
+    rng = random.Random(seed)
+    items = []
+    for i in range(n):
+        original = date(2024, 1, 1) + timedelta(days=rng.randrange(200))
+        item = {
+            "equipment_id": f"{prefix}{i}",
+            "country": rng.choice(COUNTRIES),
+            "original_delivery_date": original.isoformat(),
+            "current_delivery_date": (original + timedelta(days=rng.randrange(-5, 60))).isoformat(),
+        }
+        status = rng.choice(STATUSES + ["<missing>"])
+        if status != "<missing>":
+            item["status"] = status
+        if rng.random() < 0.5:
+            item["supplier"] = f"Supplier {rng.randrange(8)}"
+        if rng.random() < 0.3:
+            item["description"] = f"Part {i}"
+        if rng.random() < 0.1:
+            item["priority"] = rng.randrange(3)
+        items.append(item)
+    return items
+
+
+def reference_risk(item):
+    """Per-item risk as SchedulerAgent computed it before the columnar store"""
+    delay = (date.fromisoformat(item["current_delivery_date"])
+             - date.fromisoformat(item["original_delivery_date"])).days
+    if item.get("status", "on_time") == "on_time":
+        level = 1
+    elif delay <= 7:
+        level = 2
+    elif delay <= 14:
+        level = 3
+    elif delay <= 30:
+        level = 4
+    else:
+        level = 5
+    factors = []
+    if delay > 0:
+        factors.append("Delivery delay")
+    if delay > 14:
+        factors.append("Extended delay")
+    if item["country"] in ["China", "India", "Brazil"]:
+        factors.append("Emerging market risks")
+    if delay > 30:
+        factors.append("Critical delay")
+    return delay, level, factors
+
+
+def assert_risks_match(store, items):
+    by_id = {item["equipment_id"]: item for item in items}
+    risks = store.schedule_risks()
+    assert sorted(risk.equipment_id for risk in risks) == sorted(by_id)
+    for risk in risks:
+        delay, level, factors = reference_risk(by_id[risk.equipment_id])
+        assert (risk.delay_days, risk.risk_level, risk.risk_factors) == (delay, level, factors), risk.equipment_id
+
+
+def normalized(items):
+    """Items as the store returns them: a missing status reads back as on_time"""
+    return sorted(({"status": "on_time", **item} for item in items), key=lambda item: item["equipment_id"])
+
+
+def test_risks_match_the_per_item_computation():
+    items = make_items(500)
+    store = ShipmentStore(items)
+    assert_risks_match(store, items)
+
+
+def test_risk_records_and_country_summary_match_the_models():
+    store = ShipmentStore(make_items(500, seed=4))
+    store.delete([f"E{i}" for i in range(0, 500, 7)])
+    models = store.schedule_risks()
+    assert store.risk_records() == [risk.model_dump() for risk in models]
+    rows = [9, 3, 40]
+    assert store.risk_records(rows) == [models[row].model_dump() for row in rows]
+
+    expected = {}
+    for risk in models:
+        level, factors = expected.setdefault(risk.country, (0, []))
+        factors.extend(risk.risk_factors)
+        expected[risk.country] = (max(level, risk.risk_level), factors)
+    assert store.risks_by_country() == expected
+    assert ShipmentStore().risks_by_country() == {}
+
+
+def test_items_round_trip():
+    items = make_items(300, seed=1)
+    store = ShipmentStore(items)
+    assert normalized(store.items()) == normalized(items)
+
+
+def test_explicit_none_or_empty_status_is_not_on_time():
+    base = {"country": "Germany", "original_delivery_date": "2024-01-01", "current_delivery_date": "2024-01-20"}
+    store = ShipmentStore([
+        {**base, "equipment_id": "none", "status": None},
+        {**base, "equipment_id": "empty", "status": ""},
+        {**base, "equipment_id": "missing"},
+    ])
+    levels = {risk.equipment_id: risk.risk_level for risk in store.schedule_risks()}
+    assert levels == {"none": 4, "empty": 4, "missing": 1}
+
+    # Before any row is on time the on_time code lookup misses; None rows must not match it
+    store = ShipmentStore([{**base, "equipment_id": "none", "status": None}])
+    assert store.schedule_risks()[0].risk_level == 4
+
+
+def test_extend_rejects_a_bad_batch_without_storing_any_of_it():
+    store = ShipmentStore(make_items(3))
+    bad = make_items(2, prefix="B")
+    bad[1]["current_delivery_date"] = "2024-13-45"
+    with pytest.raises(ValueError, match="Item 4"):
+        store.extend(bad)
+    assert len(store) == 3
+
+
+def apply_to_dicts(state, upserts=(), deletes=()):
+    """The same changes on a plain dict of items, the way upsert/delete document them"""
+    for item in upserts:
+        key = item["equipment_id"]
+        state[key] = {**state.get(key, {}), **item}
+    for key in deletes:
+        state.pop(key, None)
+
+
+def test_upserts_and_deletes_match_a_rebuild():
+    rng = random.Random(2)
+    items = make_items(400, seed=2)
+    store = ShipmentStore(items)
+    store.indexes()  # kept in step from here on
+    state = {item["equipment_id"]: dict(item) for item in items}
+    fresh = make_items(200, seed=3, prefix="N")
+
+    for step in range(30):
+        ids = list(state)
+        upserts = [{"equipment_id": rng.choice(ids), "status": rng.choice(["on_time", "delayed"]),
+                    "current_delivery_date": f"2024-08-{rng.randrange(1, 29):02d}"} for _ in range(10)]
+        upserts += fresh[step * 5:(step + 1) * 5]
+        deletes = rng.sample(ids, 5) + ["no-such-id"]
+
+        result = store.upsert(upserts)
+        assert result["rejected"] == []
+        deleted = store.delete(deletes)
+        assert deleted["missing"] == ["no-such-id"]
+        apply_to_dicts(state, upserts, deletes)
+
+    assert len(store) == len(state)
+    assert normalized(store.items()) == normalized(state.values())
+    assert_risks_match(store, list(state.values()))
+    assert normalized(ShipmentStore(list(state.values())).items()) == normalized(store.items())
+
+
+def test_upsert_rejects_items_individually():
+    store = ShipmentStore(make_items(5))
+    result = store.upsert([
+        {"equipment_id": "E1", "status": "delayed"},
+        {"equipment_id": "NEW"},  # new ids need every required field
+        {"status": "delayed"},
+        {"equipment_id": "E2", "current_delivery_date": "not a date"},
+    ])
+    assert result["updated"] == 1 and result["inserted"] == 0
+    assert sorted(index for index, _ in result["rejected"]) == [1, 2, 3]
+    assert store.items([store.row_of("E1")])[0]["status"] == "delayed"
+    assert store.row_of("NEW") is None
+
+
+def test_repeated_ids_in_one_batch_apply_in_order():
+    store = ShipmentStore(make_items(2))
+    store.upsert([{"equipment_id": "E0", "status": "delayed"}, {"equipment_id": "E0", "supplier": "Acme"}])
+    item = store.items([store.row_of("E0")])[0]
+    assert (item["status"], item["supplier"]) == ("delayed", "Acme")
+
+
+def brute_force_rows(store, country=None, status=None, min_level=None, max_delay=None):
+    items = store.items()
+    risks = store.schedule_risks()
+    return [
+        row for row, (item, risk) in enumerate(zip(items, risks))
+        if (country is None or item["country"] == country)
+        and (status is None or item.get("status") == status)
+        and (min_level is None or risk.risk_level >= min_level)
+        and (max_delay is None or risk.delay_days <= max_delay)
+    ]
+
+
+def check_queries(store):
+    for country in COUNTRIES + ["Atlantis"]:
+        for status in ("delayed", "on_time", None):
+            for min_level, max_delay in ((None, None), (3, None), (None, 10), (2, 20)):
+                equals = {"country": country, **({"status": status} if status else {})}
+                ranges = {}
+                if min_level is not None:
+                    ranges["risk_level"] = (min_level, None)
+                if max_delay is not None:
+                    ranges["delay_days"] = (None, max_delay)
+                rows = store.query(equals=equals, ranges=ranges).tolist()
+                assert rows == brute_force_rows(store, country, status, min_level, max_delay)
+
+
+def test_indexed_queries_match_a_scan_and_stay_in_step_with_writes():
+    store = ShipmentStore(make_items(600, seed=4))
+    check_queries(store)
+    store.upsert([{"equipment_id": f"E{i}", "country": "Japan", "status": "delayed"} for i in range(0, 600, 7)])
+    store.delete([f"E{i}" for i in range(3, 600, 11)])
+    store.extend(make_items(50, seed=5, prefix="X"))
+    check_queries(store)
+    assert sorted(store.distinct("country")) == sorted({item["country"] for item in store.items()})
+
+
+def test_top_pages_through_the_highest_values():
+    store = ShipmentStore(make_items(300, seed=6))
+    delays = store.column("delay_days")
+    expected = sorted(range(len(store)), key=lambda row: (-delays[row], row))
+    assert store.top("delay_days", 10).tolist() == expected[:10]
+    assert store.top("delay_days", 10, offset=10).tolist() == expected[10:20]
+
+
+def test_save_load_round_trip(tmp_path):
+    items = make_items(400, seed=7)
+    items[0]["notes"] = {"nested": ["kept", 1]}
+    store = ShipmentStore(items)
+    store.delete(["E5", "E6"])
+    path = tmp_path / "store.npz"
+    with open(path, "wb") as f:
+        store.save(f)
+    with open(path, "rb") as f:
+        loaded = ShipmentStore.load(f)
+    assert loaded.items() == store.items()
+    assert [r.model_dump() for r in loaded.schedule_risks()] == [r.model_dump() for r in store.schedule_risks()]
+    loaded.upsert([{"equipment_id": "E7", "status": "delayed"}])
+    assert loaded.query(equals={"status": "delayed"}).tolist() == brute_force_rows(loaded, status="delayed")
+
+
+def test_copy_is_independent():
+    store = ShipmentStore(make_items(50))
+    copy = store.copy()
+    copy.upsert([{"equipment_id": "E1", "country": "Japan"}])
+    copy.delete(["E2"])
+    assert store.items() == ShipmentStore(make_items(50)).items()
@@ -0,0 +1,109 @@
+import csv
+import gzip
+import io
+import json
+import zlib
+
+import pytest
+
+from agents.shipment_store import ShipmentStore
+from agents.shipment_upload import ShipmentUploadParser, UploadTooLarge
+
+HEADER = "equipment_id,country,original_delivery_date,current_delivery_date,description\n"
+CSV_BODY = (
+    HEADER
+    + 'A1,China,2024-01-01,2024-01-05,5" pipe\n'
+    + 'A2,India,2024-01-01,2024-01-20,"two\nlines with ""quotes"""\n'
+    + "A3,Japan,2024-01-01,2024-01-03,plain\r\n"
+    + "\n"
+    + 'A4,Japan,2024-01-01,2024-01-09,"a, b"'
+)
+
+
+def parse(body: bytes, chunk_size: int = 7, **options) -> ShipmentUploadParser:
+    parser = ShipmentUploadParser(ShipmentStore(), **options)
+    for start in range(0, len(body), chunk_size):
+        parser.feed(body[start:start + chunk_size])
+    parser.finish()
+    return parser
+
+
+def ndjson(items) -> bytes:
+    return "".join(json.dumps(item) + "\n" for item in items).encode()
+
+
+def item(equipment_id, **fields):
+    return {"equipment_id": equipment_id, "country": "China", "original_delivery_date": "2024-01-01",
+            "current_delivery_date": "2024-01-10", **fields}
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 5, 64, 1 << 20])
+def test_csv_matches_the_csv_module_at_any_chunk_size(chunk_size):
+    parser = parse(CSV_BODY.encode(), chunk_size)
+    expected = list(csv.reader(io.StringIO(CSV_BODY)))[1:]
+    expected = [row for row in expected if row]
+    assert parser.format == "csv"
+    assert parser.rows_accepted == 4 and parser.rejects == []
+    assert [i["description"] for i in parser.store.items()] == [row[4] for row in expected]
+    assert parser.progress()["lines"] == 7
+
+
+def test_stray_quote_in_an_unquoted_field_does_not_swallow_later_records():
+    rows = "".join(f'P{i},China,2024-01-01,2024-01-02,{i}" pipe\n' for i in range(50))
+    parser = parse((HEADER + rows).encode(), 13)
+    assert parser.rows_accepted == 50
+    assert parser.store.items([parser.store.row_of("P49")])[0]["description"] == '49" pipe'
+
+
+def test_csv_rejects_report_physical_line_numbers():
+    body = HEADER + "A1,China,2024-01-01,2024-01-05,x\n" + "A2,China,2024-01-01\n" + \
+        'A3,China,2024-01-01,not-a-date,"multi\nline"\n' + "A4,China,2024-01-01,2024-01-05,y\n"
+    parser = parse(body.encode())
+    assert parser.rows_accepted == 2
+    assert [reject["line"] for reject in parser.rejects] == [3, 4]
+
+
+def test_ndjson_with_bad_lines_and_no_trailing_newline():
+    body = ndjson([item("N1"), item("N2")]) + b"{not json\n\n" + json.dumps(item("N3")).encode()
+    parser = parse(body, 3)
+    assert parser.format == "ndjson"
+    assert parser.rows_accepted == 3
+    assert [reject["line"] for reject in parser.rejects] == [3]
+    assert parser.progress()["lines"] == 5
+
+
+def test_utf8_split_across_chunks_and_bom():
+    body = "﻿".encode() + ndjson([item("Ü1", description="Zürich ✓")])
+    parser = parse(body, 1)
+    assert parser.store.items()[0]["description"] == "Zürich ✓"
+
+
+@pytest.mark.parametrize("chunk_size", [2, 3, 100, 1 << 20])
+def test_gzip_with_several_members(chunk_size):
+    first, second = ndjson([item(f"G{i}") for i in range(20)]), ndjson([item(f"H{i}") for i in range(20)])
+    body = gzip.compress(first) + gzip.compress(second) + gzip.compress(b"")
+    parser = parse(body, chunk_size)
+    assert parser.compression == "gzip"
+    assert parser.rows_accepted == 40
+
+
+def test_deflate_and_truncated_streams():
+    body = ndjson([item(f"D{i}") for i in range(10)])
+    assert parse(zlib.compress(body), 16, compression="deflate").rows_accepted == 10
+    with pytest.raises(ValueError, match="Truncated gzip"):
+        parse(gzip.compress(body)[:-8], 16)
+
+
+def test_limits():
+    body = ndjson([item(f"L{i}", description="x" * 200) for i in range(200)])
+    with pytest.raises(UploadTooLarge):
+        parse(body, 1 << 10, max_bytes=10_000)
+    with pytest.raises(UploadTooLarge):
+        parse(body, 1 << 10, batch_rows=20, max_store_bytes=20_000)
+
+
+def test_long_line_without_newlines_is_buffered_linearly():
+    description = "y" * (8 << 20)
+    body = json.dumps(item("BIG", description=description)).encode()
+    parser = parse(body, 1 << 12)
+    assert parser.store.items()[0]["description"] == description
@@ -0,0 +1,86 @@
+import asyncio
+import json
+
+from utils.snapshot_broadcaster import DELTA_EVENT, SNAPSHOT_EVENT, SnapshotBroadcaster
+
+
+def make_broadcaster(**options):
+    return SnapshotBroadcaster(list_keys={"risks": lambda r: r["id"]}, ignore_fields=("seen_at",), **options)
+
+
+def test_publish_sends_only_changes_and_ignores_timestamps():
+    broadcaster = make_broadcaster()
+    first = broadcaster.publish({"risks": [{"id": "a", "level": 1, "seen_at": 1}, {"id": "b", "level": 2}]})
+    assert first["version"] == 1 and set(first["sections"]["risks"]["upsert"]) == {"a", "b"}
+
+    assert broadcaster.publish({"risks": [{"id": "a", "level": 1, "seen_at": 2}, {"id": "b", "level": 2}]}) is None
+    assert broadcaster.version == 1
+
+    delta = broadcaster.publish({"risks": [{"id": "a", "level": 3, "seen_at": 3}]})
+    assert delta["base_version"] == 1
+    assert delta["sections"]["risks"] == {"upsert": {"a": {"id": "a", "level": 3, "seen_at": 3}}, "remove": ["b"]}
+
+
+def test_items_sharing_a_key_are_numbered_by_occurrence():
+    broadcaster = make_broadcaster()
+    broadcaster.publish({"risks": [{"id": "a", "level": 1}, {"id": "a", "level": 2}]})
+    assert broadcaster.snapshot()["data"]["risks"] == [{"id": "a", "level": 1}, {"id": "a", "level": 2}]
+
+    delta = broadcaster.publish({"risks": [{"id": "a", "level": 1}, {"id": "a", "level": 5}]})
+    assert delta["sections"]["risks"] == {"upsert": {"a#2": {"id": "a", "level": 5}}, "remove": []}
+
+
+def test_prepare_is_read_only_and_commit_rediffs_a_stale_result():
+    broadcaster = make_broadcaster()
+    broadcaster.publish({"risks": [{"id": "a", "level": 1}]})
+    stale = broadcaster.prepare({"risks": [{"id": "a", "level": 2}]})
+    assert broadcaster.version == 1
+
+    broadcaster.publish({"risks": [{"id": "a", "level": 2}]})
+    assert broadcaster.commit(stale) is None  # already published in between
+    assert broadcaster.version == 2
+
+
+def test_subscribers_get_a_snapshot_then_deltas_and_resync_when_behind():
+    broadcaster = make_broadcaster(queue_size=2)
+    broadcaster.publish({"risks": [{"id": "a", "level": 1}]})
+
+    async def scenario():
+        stream = broadcaster.subscribe()
+        event, version, data = await stream.__anext__()
+        assert (event, version) == (SNAPSHOT_EVENT, 1)
+        assert json.loads(data)["data"]["risks"] == [{"id": "a", "level": 1}]
+        assert broadcaster.subscriber_count == 1
+
+        broadcaster.publish({"risks": [{"id": "a", "level": 2}]})
+        event, version, data = await stream.__anext__()
+        assert (event, version) == (DELTA_EVENT, 2)
+
+        for level in range(3, 7):
+            broadcaster.publish({"risks": [{"id": "a", "level": level}]})
+        # 3 and 4 fill the queue; 5 overflows it, so the backlog becomes a snapshot
+        event, version, data = await stream.__anext__()
+        assert (event, version) == (SNAPSHOT_EVENT, 5)
+        assert broadcaster.metrics["resyncs"] == 1
+        event, version, data = await stream.__anext__()
+        assert (event, version) == (DELTA_EVENT, 6)
+        await stream.aclose()
+        assert broadcaster.subscriber_count == 0
+
+    asyncio.run(scenario())
+
+
+def test_reconnect_at_the_current_version_skips_the_snapshot():
+    broadcaster = make_broadcaster()
+    broadcaster.publish({"risks": [{"id": "a", "level": 1}]})
+
+    async def scenario():
+        stream = broadcaster.subscribe(last_version=1)
+        pending = asyncio.ensure_future(stream.__anext__())
+        await asyncio.sleep(0)
+        broadcaster.publish({"risks": [{"id": "a", "level": 2}]})
+        event, version, _ = await pending
+        await stream.aclose()
+        return event, version
+
+    assert asyncio.run(scenario()) == (DELTA_EVENT, 2)
@@ -0,0 +1,71 @@
+import math
+
+import numpy as np
+import pytest
+
+from data import ports
+from data.distance_matrix import EARTH_RADIUS_NM
+from data.spatial_index import PortSpatialIndex
+
+
+def haversine_nm(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * math.asin(math.sqrt(a)) * EARTH_RADIUS_NM
+
+
+def brute_force(lat, lon):
+    return sorted(
+        (haversine_nm(lat, lon, info["coordinates"]["lat"], info["coordinates"]["lon"]), name)
+        for name, info in ports.MAJOR_PORTS.items()
+    )
+
+
+@pytest.fixture
+def many_ports():
+    """Several hundred synthetic ports, so the tree is several levels deep"""
+    rng = np.random.default_rng(7)
+    names = [f"Test Port {i}" for i in range(400)]
+    for name, lat, lon in zip(names, rng.uniform(-70, 70, 400), rng.uniform(-180, 180, 400)):
+        ports.upsert_port(name, {"country": "Testland", "coordinates": {"lat": float(lat), "lon": float(lon)}})
+    yield
+    for name in names:
+        ports.remove_port(name)
+
+
+QUERIES = [(0.0, 0.0), (51.5, -0.1), (1.29, 103.85), (-33.9, 151.2), (64.1, -21.9), (0.0, 179.9)]
+
+
+@pytest.mark.parametrize("lat, lon", QUERIES)
+def test_nearest_matches_brute_force(many_ports, lat, lon):
+    index = PortSpatialIndex()
+    expected = brute_force(lat, lon)[:7]
+    results = index.nearest(lat, lon, k=7)
+    assert [r["name"] for r in results] == [name for _, name in expected]
+    assert [r["distance_nm"] for r in results] == pytest.approx([d for d, _ in expected], abs=0.01)
+
+
+@pytest.mark.parametrize("lat, lon", QUERIES)
+@pytest.mark.parametrize("radius_nm", [0, 300, 1500, 6000])
+def test_within_matches_brute_force(many_ports, lat, lon, radius_nm):
+    index = PortSpatialIndex()
+    expected = [name for distance, name in brute_force(lat, lon) if distance <= radius_nm - 1e-6]
+    names = [r["name"] for r in index.within(lat, lon, radius_nm)]
+    # Ports right on the boundary may fall either way through float rounding
+    assert set(expected) <= set(names)
+    assert all(r["distance_nm"] <= radius_nm + 0.01 for r in index.within(lat, lon, radius_nm))
+    assert index.within(lat, lon, radius_nm, limit=3) == index.within(lat, lon, radius_nm)[:3]
+
+
+def test_nearest_honours_exclusions_and_sees_port_table_changes():
+    index = PortSpatialIndex()
+    shanghai = ports.MAJOR_PORTS["Shanghai"]["coordinates"]
+    assert index.nearest(shanghai["lat"], shanghai["lon"], k=1)[0]["name"] == "Shanghai"
+    assert index.nearest(shanghai["lat"], shanghai["lon"], k=1, exclude=["Shanghai"])[0]["name"] != "Shanghai"
+
+    ports.upsert_port("Test Harbour", {"country": "Testland", "coordinates": {"lat": 10.0, "lon": 10.0}})
+    try:
+        assert index.nearest(10.0, 10.0, k=1)[0]["name"] == "Test Harbour"
+    finally:
+        ports.remove_port("Test Harbour")
+    assert index.nearest(10.0, 10.0, k=1)[0]["name"] != "Test Harbour"
@@ -0,0 +1,95 @@
+"""
+Bounded in-memory LRU cache with optional time-to-live and hit/miss counters.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Least-recently-used cache holding at most `maxsize` entries.
+    Entries older than `ttl` seconds are treated as misses (ttl=None disables expiry).
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _lookup(self, key: Hashable):
+        """(value, age) for a live entry, counting the hit or miss; _MISSING otherwise"""
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return _MISSING
+            value, stored_at = entry
+            age = time.monotonic() - stored_at
+            if self.ttl is not None and age > self.ttl:
+                del self._entries[key]
+                self.misses += 1
+                return _MISSING
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value, age
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value, or default if missing or expired"""
+        found = self._lookup(key)
+        return default if found is _MISSING else found[0]
+
+    def get_with_age(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Like get(), but returns (value, age in seconds) so callers can apply
+        their own freshness window below the hard ttl (stale-while-revalidate).
+        """
+        found = self._lookup(key)
+        return default if found is _MISSING else found
+
+    def set(self, key: Hashable, value: Any, age: float = 0.0):
+        """
+        Store a value, evicting the least recently used entry if full.
+        age backdates the entry, e.g. when restoring it from persistent storage.
+        """
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() - age)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove and return an entry"""
+        with self._lock:
+            entry = self._entries.pop(key, _MISSING)
+            return default if entry is _MISSING else entry[0]
+
+    def clear(self):
+        """Drop every entry (counters are kept)"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        """Size and hit/miss counters"""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
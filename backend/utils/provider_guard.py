@@ -0,0 +1,230 @@
+"""
+Circuit breaker and adaptive token bucket for outbound API providers.
+
+Each provider gets one ProviderGuard. Requests take a token from a bucket
+that refills evenly across the quota window, so bursts are spread out
+instead of exhausting the quota at once. Rate-limit headers (remaining
+requests and reset time) retune the refill rate to what is actually left.
+
+After `failure_threshold` consecutive failures the circuit opens and every
+request is rejected immediately until the cool-down passes; one trial
+request is then let through (half-open) and closes the circuit on success.
+Cool-downs double on repeated trips, and a Retry-After header sets it directly.
+"""
+
+import asyncio
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Mapping, Optional
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Header names checked in order; the first one present wins
+_REMAINING_HEADERS = ("X-RateLimit-Remaining", "RateLimit-Remaining", "X-Rate-Limit-Remaining")
+_RESET_HEADERS = ("X-RateLimit-Reset", "RateLimit-Reset", "X-Rate-Limit-Reset")
+# Reset values above this are Unix timestamps rather than seconds from now
+_EPOCH_THRESHOLD = 10 ** 9
+
+
+class ProviderUnavailable(Exception):
+    """Raised without making a request: the circuit is open or the bucket is empty"""
+
+    def __init__(self, provider: str, reason: str, retry_after: float):
+        super().__init__(f"{provider} unavailable ({reason}), retry in {retry_after:.1f}s")
+        self.provider = provider
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+def _header(headers: Mapping[str, str], names) -> Optional[str]:
+    for name in names:
+        value = headers.get(name)
+        if value is not None:
+            return value
+    return None
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After as seconds from now: either delta-seconds or an HTTP date"""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max((when - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+class ProviderGuard:
+    """
+    Per-provider circuit breaker plus token bucket.
+
+    Usage:
+        await guard.acquire()          # raises ProviderUnavailable instead of waiting long
+        ... make the request ...
+        guard.record_success(headers)  # or guard.record_failure(status, headers)
+    """
+
+    def __init__(self, name: str, requests_per_window: int = 30, window_seconds: float = 60.0,
+                 burst: int = 5, failure_threshold: int = 3, cooldown_seconds: float = 30.0,
+                 max_cooldown_seconds: float = 600.0, max_wait_seconds: float = 1.0):
+        self.name = name
+        self.burst = max(burst, 1)
+        self.base_rate = requests_per_window / window_seconds  # tokens per second
+        self.rate = self.base_rate
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.max_cooldown_seconds = max_cooldown_seconds
+        self.max_wait_seconds = max_wait_seconds
+
+        self.tokens = float(self.burst)
+        self._refilled_at = time.monotonic()
+        self._rate_reset_at: Optional[float] = None
+
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self._cooldown = cooldown_seconds
+        self._open_until = 0.0
+        self._trial_in_flight = False
+
+        self.counters = {
+            "requests": 0,
+            "successes": 0,
+            "failures": 0,
+            "rejected_open": 0,
+            "rejected_rate": 0,
+            "throttled": 0,
+            "trips": 0,
+        }
+        self.last_error: Optional[str] = None
+
+    def _refill(self, now: float):
+        # A rate learned from headers only holds until the provider's reset time
+        if self._rate_reset_at is not None and now >= self._rate_reset_at:
+            self.rate = self.base_rate
+            self._rate_reset_at = None
+        self.tokens = min(self.burst, self.tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+
+    async def acquire(self):
+        """
+        Take a token, waiting up to max_wait_seconds for one.
+        Raises ProviderUnavailable at once if the circuit is open, a half-open
+        trial is already running, or the next token is further away than that.
+        """
+        now = time.monotonic()
+        if self.state == OPEN:
+            if now < self._open_until:
+                self.counters["rejected_open"] += 1
+                raise ProviderUnavailable(self.name, "circuit open", self._open_until - now)
+            self.state = HALF_OPEN
+        if self.state == HALF_OPEN:
+            if self._trial_in_flight:
+                self.counters["rejected_open"] += 1
+                raise ProviderUnavailable(self.name, "circuit half-open", self._cooldown)
+            self._trial_in_flight = True
+
+        self._refill(now)
+        if self.tokens < 1:
+            wait = (1 - self.tokens) / self.rate if self.rate > 0 else float("inf")
+            if wait > self.max_wait_seconds:
+                self._trial_in_flight = False
+                self.counters["rejected_rate"] += 1
+                raise ProviderUnavailable(self.name, "rate limited", wait)
+            self.counters["throttled"] += 1
+            # Reserve the token now so concurrent callers queue behind this one
+            self.tokens -= 1
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                # Cancelled while waiting (e.g. a deadline): hand back the token and any trial slot
+                self.tokens += 1
+                self._trial_in_flight = False
+                raise
+        else:
+            self.tokens -= 1
+        self.counters["requests"] += 1
+
+    def _adapt(self, headers: Optional[Mapping[str, str]]):
+        """Retune the refill rate to spread the remaining quota until its reset"""
+        if not headers:
+            return
+        remaining = _header(headers, _REMAINING_HEADERS)
+        reset = _header(headers, _RESET_HEADERS)
+        if remaining is None or reset is None:
+            return
+        try:
+            remaining, reset = float(remaining), float(reset)
+        except ValueError:
+            return
+        if reset > _EPOCH_THRESHOLD:
+            reset -= time.time()
+        if reset <= 0:
+            return
+        now = time.monotonic()
+        self._refill(now)
+        self.rate = max(remaining, 0.0) / reset
+        self.tokens = min(self.tokens, max(remaining, 0.0))
+        self._rate_reset_at = now + reset
+
+    def record_success(self, headers: Optional[Mapping[str, str]] = None):
+        self.counters["successes"] += 1
+        self.consecutive_failures = 0
+        self._trial_in_flight = False
+        self._cooldown = self.cooldown_seconds
+        self.state = CLOSED
+        self._adapt(headers)
+
+    def record_failure(self, error: str, status: Optional[int] = None,
+                       headers: Optional[Mapping[str, str]] = None):
+        """
+        Count a failed request. A 429 or Retry-After opens the circuit for the
+        time the provider asked for; otherwise it opens after failure_threshold
+        consecutive failures, or at once if a half-open trial fails.
+        """
+        self.counters["failures"] += 1
+        self.consecutive_failures += 1
+        self.last_error = error
+        self._adapt(headers)
+        retry_after = parse_retry_after(headers.get("Retry-After")) if headers else None
+
+        if retry_after is not None or status == 429:
+            self._trip(retry_after if retry_after is not None else self._cooldown)
+        elif self.state == HALF_OPEN:
+            self._trip(min(self._cooldown * 2, self.max_cooldown_seconds))
+        elif self.consecutive_failures >= self.failure_threshold:
+            self._trip(self._cooldown)
+        self._trial_in_flight = False
+
+    def _trip(self, cooldown: float):
+        self._cooldown = min(max(cooldown, 0.0), self.max_cooldown_seconds)
+        self._open_until = time.monotonic() + self._cooldown
+        if self.state != OPEN:
+            self.counters["trips"] += 1
+        self.state = OPEN
+
+    def release(self):
+        """Give up a half-open trial that was cancelled before it finished"""
+        self._trial_in_flight = False
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        self._refill(now)
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "open_for_seconds": round(max(self._open_until - now, 0.0), 1) if self.state == OPEN else 0.0,
+            "tokens": round(self.tokens, 2),
+            "rate_per_minute": round(self.rate * 60, 2),
+            "last_error": self.last_error,
+            **self.counters,
+        }
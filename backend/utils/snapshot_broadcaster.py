@@ -0,0 +1,180 @@
+"""
+Versioned in-memory snapshot with delta fan-out to streaming subscribers.
+
+A snapshot is a dict of sections. Each section is a dict keyed by item name
+(e.g. world_risk_data by country) or a list of dicts keyed by `list_keys`.
+publish() diffs the new snapshot against the current one, bumps the version
+and queues one pre-serialized delta event for every subscriber, so the work
+per refresh is the same for one client or hundreds. The diff can also be
+run off the event loop with prepare() (it only reads the current snapshot)
+and applied on the loop with commit().
+
+Subscribers that fall behind (queue full) have their backlog dropped and get
+a full snapshot event instead of the missed deltas.
+"""
+
+import asyncio
+import json
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Optional, Tuple
+
+SNAPSHOT_EVENT = "snapshot"
+DELTA_EVENT = "delta"
+
+
+def _comparable(item: Any, ignore_fields: Tuple[str, ...]) -> Any:
+    if isinstance(item, dict) and ignore_fields:
+        return {k: v for k, v in item.items() if k not in ignore_fields}
+    return item
+
+
+class SnapshotBroadcaster:
+    """
+    Args:
+        list_keys: per list section, a function giving each item's key
+        ignore_fields: item fields that change on every refresh (timestamps)
+            and should not by themselves count as a change
+        queue_size: events buffered per subscriber before it is resynced
+    """
+
+    def __init__(self, list_keys: Optional[Dict[str, Callable[[Dict[str, Any]], str]]] = None,
+                 ignore_fields: Iterable[str] = (), queue_size: int = 16):
+        self.list_keys = list_keys or {}
+        self.ignore_fields = tuple(ignore_fields)
+        self.queue_size = queue_size
+        self.version = 0
+        self.updated_at: Optional[str] = None
+        self._sections: Dict[str, Dict[str, Any]] = {}
+        self._subscribers: set = set()
+        self._snapshot_event: Optional[str] = None
+        self.metrics = {"publishes": 0, "unchanged": 0, "resyncs": 0}
+
+    def _index(self, name: str, section: Any) -> Dict[str, Any]:
+        if isinstance(section, dict):
+            return dict(section)
+        key = self.list_keys.get(name, lambda item: json.dumps(item, sort_keys=True, default=str))
+        indexed = {}
+        for item in section:
+            item_key = base = key(item)
+            # Items sharing a key are told apart by occurrence: "key", "key#2", ...
+            occurrence = 1
+            while item_key in indexed:
+                occurrence += 1
+                item_key = f"{base}#{occurrence}"
+            indexed[item_key] = item
+        return indexed
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current sections in their published shape, with version and timestamp"""
+        data = {
+            name: items if name not in self.list_keys else list(items.values())
+            for name, items in self._sections.items()
+        }
+        return {"version": self.version, "updated_at": self.updated_at, "data": data}
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def publish(self, sections: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Replace the snapshot and push the delta to every subscriber.
+
+        Returns:
+            The delta ({"version", "base_version", "sections": {name: {"upsert",
+            "remove"}}}), or None if nothing changed (no version bump).
+        """
+        return self.commit(self.prepare(sections))
+
+    def prepare(self, sections: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Diff sections against the current snapshot without changing anything;
+        safe to run in a worker thread. Pass the result to commit().
+        """
+        changes = {}
+        indexed = {}
+        for name, section in sections.items():
+            new = self._index(name, section)
+            old = self._sections.get(name, {})
+            upsert = {
+                key: item for key, item in new.items()
+                if key not in old or _comparable(old[key], self.ignore_fields) != _comparable(item, self.ignore_fields)
+            }
+            remove = [key for key in old if key not in new]
+            if upsert or remove:
+                changes[name] = {"upsert": upsert, "remove": remove}
+            # Unchanged items keep their previous copy so ignored fields stay stable
+            indexed[name] = {key: item if key in upsert else old[key] for key, item in new.items()}
+        removed_sections = [name for name in self._sections if name not in sections]
+        for name in removed_sections:
+            changes[name] = {"upsert": {}, "remove": list(self._sections[name])}
+        return {"base_version": self.version, "sections": sections, "indexed": indexed, "changes": changes}
+
+    def commit(self, prepared: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Apply a prepare() result; see publish()"""
+        if prepared["base_version"] != self.version:
+            # Published in between: the diff is against an old snapshot
+            prepared = self.prepare(prepared["sections"])
+        changes = prepared["changes"]
+
+        self.metrics["publishes"] += 1
+        if not changes and self.version:
+            self.metrics["unchanged"] += 1
+            return None
+
+        base_version = self.version
+        self.version += 1
+        self.updated_at = datetime.utcnow().isoformat()
+        self._sections = prepared["indexed"]
+        self._snapshot_event = None
+
+        delta = {
+            "version": self.version,
+            "base_version": base_version,
+            "updated_at": self.updated_at,
+            "sections": changes
+        }
+        encoded = json.dumps(delta, default=str)
+        for queue in list(self._subscribers):
+            self._enqueue(queue, (DELTA_EVENT, self.version, encoded))
+        return delta
+
+    def _encoded_snapshot(self) -> str:
+        # Serialized once per version and shared by every (re)connecting client
+        if self._snapshot_event is None:
+            self._snapshot_event = json.dumps(self.snapshot(), default=str)
+        return self._snapshot_event
+
+    def _enqueue(self, queue: asyncio.Queue, event: tuple):
+        try:
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # A slow client skips its backlog and resyncs from the full snapshot
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait((SNAPSHOT_EVENT, self.version, self._encoded_snapshot()))
+            self.metrics["resyncs"] += 1
+
+    async def subscribe(self, last_version: Optional[int] = None) -> AsyncIterator[tuple]:
+        """
+        Yield (event, version, json data) tuples: a full snapshot first, unless
+        the client already holds the current version, then deltas as published.
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.add(queue)
+        try:
+            if self.version and last_version != self.version:
+                yield SNAPSHOT_EVENT, self.version, self._encoded_snapshot()
+            while True:
+                yield await queue.get()
+        finally:
+            self._subscribers.discard(queue)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "updated_at": self.updated_at,
+            "subscribers": self.subscriber_count,
+            "sections": {name: len(items) for name, items in self._sections.items()},
+            **self.metrics
+        }
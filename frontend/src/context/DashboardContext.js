@@ -155,7 +155,8 @@ export const DashboardProvider = ({ children }) => {
     try {
       const response = await axios.post(
         `${config.API_URL}/api/shipment/upload`,
-        { data }
+        { data },
+        { params: { session_id: sessionId } }
       );
       await loadDashboardData();
       return response.data;
@@ -168,7 +169,9 @@ export const DashboardProvider = ({ children }) => {
   const generateCombinedReport = async () => {
     try {
       const response = await axios.post(
-        `${config.API_URL}/api/report/combined`
+        `${config.API_URL}/api/report/combined`,
+        null,
+        { params: { session_id: sessionId } }
       );
       await loadReports();
       return response.data;